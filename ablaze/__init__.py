@@ -10,9 +10,11 @@ except ImportError:
 __version__ = "0.0.1"
 
 
+from .cache import CachePolicy, EntityCache
 from .client import AblazeClient
+from .cluster import ClusterLauncher
 from .constants import AuditLogEventType
-from .internal import File, GatewayClient, RESTClient, Route, Shard
+from .internal import File, GatewayClient, GatewayIntents, RESTClient, Route, Shard
 from .objects import (
     AchievementIcon,
     ApplicationAsset,
@@ -40,8 +42,12 @@ __all__ = (
     "RESTClient",
     "Route",
     "GatewayClient",
+    "GatewayIntents",
     "Shard",
     "AblazeClient",
+    "ClusterLauncher",
+    "CachePolicy",
+    "EntityCache",
     "Snowflake",
     "AchievementIcon",
     "ApplicationAsset",
@@ -0,0 +1,14 @@
+from .entities import CACHE_TYPES, EntityCache, GuildMembers
+from .members import MemberStore, MemberView
+from .policies import CachePolicy
+from .store import TypeCache
+
+__all__ = (
+    "CACHE_TYPES",
+    "CachePolicy",
+    "EntityCache",
+    "GuildMembers",
+    "MemberStore",
+    "MemberView",
+    "TypeCache",
+)
@@ -0,0 +1,538 @@
+from collections import defaultdict
+from dataclasses import replace
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Set, Tuple, Union
+
+import ablaze
+from ablaze.internal.gateway.constants import GatewayIntents
+from ablaze.internal.gateway.intents import EVENT_INTENTS
+from ablaze.internal.http.client import RESTClient
+from ablaze.objects.channel import Channel, State, channel_from_json
+from ablaze.objects.user import User
+
+from .members import MemberStore
+from .policies import CachePolicy
+from .store import TypeCache, _scope, check_key
+
+logger = getLogger("ablaze.cache")
+
+JSON = Dict[str, Any]
+Members = Union["GuildMembers", MemberStore]
+
+# Guild arrays which are cached on their own, or not at all, instead of in the guild.
+_GUILD_ARRAYS = frozenset(
+    ("members", "channels", "threads", "roles", "emojis", "presences", "voice_states")
+)
+
+
+# The entity types a policy can be given for.
+CACHE_TYPES = ("guilds", "channels", "threads", "roles", "users", "emojis", "members")
+
+# The entity types each event is cached for. Users are also cached from member events,
+# but not worth listening to member events for on their own.
+_EVENT_TYPES: Dict[str, Tuple[str, ...]] = {
+    "READY": ("users",),
+    "USER_UPDATE": ("users",),
+    "GUILD_CREATE": CACHE_TYPES,
+    "GUILD_CREATE_CHUNK": ("channels", "threads", "members"),
+    "GUILD_UPDATE": ("guilds", "roles", "emojis"),
+    "GUILD_DELETE": CACHE_TYPES,
+    "GUILD_ROLE_CREATE": ("roles",),
+    "GUILD_ROLE_UPDATE": ("roles",),
+    "GUILD_ROLE_DELETE": ("roles",),
+    "GUILD_EMOJIS_UPDATE": ("emojis",),
+    "CHANNEL_CREATE": ("channels",),
+    "CHANNEL_UPDATE": ("channels",),
+    "CHANNEL_DELETE": ("channels",),
+    "THREAD_CREATE": ("threads",),
+    "THREAD_UPDATE": ("threads",),
+    "THREAD_DELETE": ("threads",),
+    "THREAD_LIST_SYNC": ("threads",),
+    "GUILD_MEMBER_ADD": ("members",),
+    "GUILD_MEMBER_UPDATE": ("members",),
+    "GUILD_MEMBER_REMOVE": ("members",),
+    "GUILD_MEMBERS_CHUNK": ("members",),
+}
+
+
+def _without_arrays(guild: Mapping[str, Any]) -> JSON:
+    return {key: value for key, value in guild.items() if key not in _GUILD_ARRAYS}
+
+
+def _member_key(guild_id: int, user_id: int) -> int:
+    # Members of every guild share one cache, keyed by both IDs.
+    return guild_id << 64 | user_id
+
+
+class GuildMembers:
+    __slots__ = ("_cache", "guild_id")
+
+    def __init__(self, cache: "EntityCache", guild_id: int) -> None:
+        """The cached members of a guild, a view of the member cache of every guild.
+
+        :param cache: The entity cache the members are cached in.
+        :type cache: EntityCache
+        :param guild_id: The ID of the guild the members are in.
+        :type guild_id: int
+        """
+
+        self._cache = cache
+        self.guild_id = guild_id
+
+    def __repr__(self) -> str:
+        return f"<GuildMembers guild_id={self.guild_id} size={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
+    def __contains__(self, key: int) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._ids()))
+
+    def _ids(self) -> Set[int]:
+        owned = self._cache._owned.get(self.guild_id)
+        return owned.get("members", set()) if owned else set()
+
+    def get(self, key: int) -> Optional[JSON]:
+        """Get a member, or None if it is not cached."""
+
+        check_key(key)
+        return self._cache._member_cache.get(_member_key(self.guild_id, key))
+
+    def set(self, key: int, value: JSON) -> bool:
+        """Cache a member, replacing any member with the same ID.
+
+        :return: Whether the members policy allowed the member to be cached.
+        :rtype: bool
+        """
+
+        check_key(key)
+
+        if not self._cache._member_cache.set(_member_key(self.guild_id, key), value):
+            self._cache._disown(self.guild_id, "members", key)
+            return False
+
+        self._cache._own(self.guild_id, "members", key)
+        return True
+
+    def delete(self, key: int) -> Optional[JSON]:
+        """Remove a member, returning it if it was cached."""
+
+        check_key(key)
+        self._cache._disown(self.guild_id, "members", key)
+
+        return self._cache._member_cache.delete(_member_key(self.guild_id, key))
+
+
+class EntityCache:
+    def __init__(
+        self,
+        http: RESTClient,
+        policies: Mapping[str, CachePolicy] = None,
+        compact_members: bool = False,
+    ) -> None:
+        """A cache of guilds, channels, threads, roles, users, members and emojis.
+
+        Channels, threads and users are cached as objects, other entities are cached as
+        the JSON sent by Discord. Members are cached without their user, which is
+        cached in :attr:`users`. The members of every guild share one cache, so the
+        members policy's limits apply to all of them together.
+
+        Compact members are stored in a :class:`MemberStore` per guild, which takes far
+        less memory for large guilds, but does not support size or time limits.
+
+        :param http: The HTTP client cached channels use to make requests.
+        :type http: RESTClient
+        :param policies: The policy of each entity type in ``CACHE_TYPES``, defaults to caching everything
+        :type policies: Mapping[str, CachePolicy], optional
+        :param compact_members: Whether to store members in columns, defaults to False
+        :type compact_members: bool, optional
+        """
+
+        policies = dict(policies or {})
+
+        if unknown := policies.keys() - set(CACHE_TYPES):
+            raise ValueError(f"Unknown cache types: {', '.join(sorted(unknown))}")
+
+        self.policies: Dict[str, CachePolicy] = {
+            kind: policies.get(kind) or CachePolicy() for kind in CACHE_TYPES
+        }
+
+        member_policy = self.policies["members"]
+
+        if compact_members and (member_policy.max_size or member_policy.ttl):
+            raise ValueError("Compact members can't have a maximum size or a TTL.")
+
+        self.compact_members = compact_members
+
+        self.state = State(http, self)
+
+        self.guilds: TypeCache[JSON] = self._type_cache("guilds", "guild_id")
+        self.channels: TypeCache[Channel] = self._type_cache("channels", "channel_id")
+        self.threads: TypeCache[Channel] = self._type_cache("threads", "channel_id")
+        self.roles: TypeCache[JSON] = self._type_cache("roles")
+        self.users: TypeCache[User] = self._type_cache("users")
+        self.emojis: TypeCache[JSON] = self._type_cache("emojis")
+
+        # The guild allowlist is checked before a member is cached, by guild.
+        self._member_cache: TypeCache[JSON] = TypeCache(
+            "members",
+            replace(member_policy, guild_ids=None, channel_ids=None),
+            on_evict=self._member_evicted,
+        )
+        self._member_stores: Dict[int, MemberStore] = {}
+        self._rejected_members = 0
+
+        # What each guild owns, so it can all be removed along with the guild.
+        self._owned: Dict[int, Dict[str, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+
+        self._handlers: Dict[str, Callable[[JSON], None]] = {
+            "READY": self._ready,
+            "USER_UPDATE": self._add_user,
+            "GUILD_CREATE": self._guild_create,
+            "GUILD_CREATE_CHUNK": self._guild_create_chunk,
+            "GUILD_UPDATE": self._guild_update,
+            "GUILD_DELETE": self._guild_delete,
+            "GUILD_ROLE_CREATE": self._role_update,
+            "GUILD_ROLE_UPDATE": self._role_update,
+            "GUILD_ROLE_DELETE": self._role_delete,
+            "GUILD_EMOJIS_UPDATE": self._emojis_update,
+            "CHANNEL_CREATE": self._channel_update,
+            "CHANNEL_UPDATE": self._channel_update,
+            "CHANNEL_DELETE": self._channel_delete,
+            "THREAD_CREATE": self._thread_update,
+            "THREAD_UPDATE": self._thread_update,
+            "THREAD_DELETE": self._thread_delete,
+            "THREAD_LIST_SYNC": self._thread_list_sync,
+            "GUILD_MEMBER_ADD": self._member_update,
+            "GUILD_MEMBER_UPDATE": self._member_update,
+            "GUILD_MEMBER_REMOVE": self._member_remove,
+            "GUILD_MEMBERS_CHUNK": self._members_chunk,
+        }
+
+    def _type_cache(self, kind: str, key_field: str = None) -> TypeCache:
+        def evicted(key: int, value: Any) -> None:
+            self._disown(_scope(value, "guild_id"), kind, key)
+
+        return TypeCache(
+            kind, self.policies[kind], key_field=key_field, on_evict=evicted
+        )
+
+    def _member_evicted(self, key: int, value: JSON) -> None:
+        self._disown(key >> 64, "members", value["id"])
+
+    def get_guild(self, id: int) -> Optional[JSON]:
+        return self.guilds.get(id)
+
+    def get_channel(self, id: int) -> Optional[Channel]:
+        """Get a channel or thread."""
+
+        return self.channels.get(id) or self.threads.get(id)
+
+    def get_thread(self, id: int) -> Optional[Channel]:
+        return self.threads.get(id)
+
+    def get_role(self, id: int) -> Optional[JSON]:
+        return self.roles.get(id)
+
+    def get_user(self, id: int) -> Optional[User]:
+        return self.users.get(id)
+
+    def get_emoji(self, id: int) -> Optional[JSON]:
+        return self.emojis.get(id)
+
+    def _admits_members(self, guild_id: int) -> bool:
+        policy = self.policies["members"]
+
+        if not policy.enabled:
+            return False
+
+        return not policy.scoped or guild_id in (policy.guild_ids or ())
+
+    def members(self, guild_id: int) -> Optional[Members]:
+        """Get the cached members of a guild, or None if its members aren't cached."""
+
+        check_key(guild_id)
+
+        if not self._admits_members(guild_id):
+            return None
+
+        if not self.compact_members:
+            return GuildMembers(self, guild_id)
+
+        if guild_id not in self._member_stores:
+            self._member_stores[guild_id] = MemberStore(
+                guild_id, self.policies["members"]
+            )
+
+        return self._member_stores[guild_id]
+
+    def get_member(self, guild_id: int, user_id: int) -> Optional[Mapping[str, Any]]:
+        check_key(guild_id)
+        check_key(user_id)
+
+        if not self.compact_members:
+            return self._member_cache.get(_member_key(guild_id, user_id))
+
+        if (store := self._member_stores.get(guild_id)) is None:
+            return None
+
+        return store.get(user_id)
+
+    def stats(self) -> Dict[str, dict]:
+        """Get the size, hit, miss and eviction statistics of each entity type.
+
+        The statistics of every guild's member store are added together.
+        """
+
+        stats = {
+            kind: getattr(self, kind).stats()
+            for kind in CACHE_TYPES
+            if kind != "members"
+        }
+
+        if self.compact_members:
+            members: Dict[str, float] = defaultdict(int)
+
+            for store in self._member_stores.values():
+                for key, value in store.stats().items():
+                    members[key] += value
+
+            stats["members"] = dict(members)
+        else:
+            stats["members"] = self._member_cache.stats()
+
+        stats["members"]["rejected"] += self._rejected_members
+        return stats
+
+    def listen(self, gateway: "ablaze.GatewayClient") -> None:
+        """Keep the cache up to date with a gateway client's events.
+
+        Events which the client's intents don't deliver, or which only update entity
+        types whose policies are disabled, are not listened for, so the cache doesn't
+        count towards the client's required intents for them.
+
+        :param gateway: The gateway client to cache events from.
+        :type gateway: ablaze.GatewayClient
+        """
+
+        for event in self._handlers:
+            if not any(self.policies[kind].enabled for kind in _EVENT_TYPES[event]):
+                continue
+
+            needed = EVENT_INTENTS.get(event, 0) & ~GatewayIntents.MESSAGE_CONTENT
+
+            if needed and not gateway._intents & needed:
+                continue
+
+            gateway.add_listener(event, self.handle)
+
+    async def handle(self, shard: "ablaze.Shard", event: Mapping[str, Any]) -> None:
+        """Update the cache from a gateway event."""
+
+        if handler := self._handlers.get(event["t"]):
+            handler(event["d"])
+
+    def _own(self, guild_id: Optional[int], kind: str, id: int) -> None:
+        if guild_id is not None:
+            self._owned[guild_id][kind].add(id)
+
+    def _disown(self, guild_id: Optional[int], kind: str, id: int) -> None:
+        if guild_id in self._owned:
+            self._owned[guild_id][kind].discard(id)
+
+    def _add_user(self, data: JSON) -> None:
+        try:
+            user = User.from_json(data)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Could not cache user {data.get('id')}: {e!r}")
+            return
+
+        self.users.set(user.id, user)
+
+    def _add_channel(self, guild_id: Optional[int], data: JSON, kind: str) -> None:
+        if guild_id is not None:
+            data = {**data, "guild_id": guild_id}
+
+        cache: TypeCache[Channel] = getattr(self, kind)
+
+        try:
+            channel = channel_from_json(self.state, data)
+        except (KeyError, TypeError, ValueError) as e:
+            # Don't keep serving a stale channel which can no longer be parsed.
+            cache.delete(int(data["id"]))
+            logger.debug(f"Could not cache channel {data['id']}: {e!r}")
+            return
+
+        if cache.set(channel.id, channel):
+            self._own(guild_id, kind, channel.id)
+
+    def _add_role(self, guild_id: int, data: JSON) -> None:
+        role_id = int(data["id"])
+
+        if self.roles.set(role_id, {**data, "guild_id": guild_id}):
+            self._own(guild_id, "roles", role_id)
+
+    def _add_emoji(self, guild_id: int, data: JSON) -> None:
+        if not data.get("id"):
+            return
+
+        emoji_id = int(data["id"])
+
+        if self.emojis.set(emoji_id, {**data, "guild_id": guild_id}):
+            self._own(guild_id, "emojis", emoji_id)
+
+    def _add_member(self, guild_id: int, data: JSON) -> None:
+        user = data.get("user")
+
+        if not user:
+            return
+
+        self._add_user(user)
+
+        if (members := self.members(guild_id)) is None:
+            self._rejected_members += 1
+            return
+
+        user_id = int(user["id"])
+
+        member = {**(members.get(user_id) or {}), **data, "id": user_id}
+        del member["user"]
+
+        members.set(user_id, member)
+
+    def _ready(self, data: JSON) -> None:
+        self._add_user(data["user"])
+
+    def _guild_create(self, data: JSON) -> None:
+        guild_id = int(data["id"])
+
+        self.guilds.set(guild_id, _without_arrays(data))
+
+        for role in data.get("roles", ()):
+            self._add_role(guild_id, role)
+
+        for emoji in data.get("emojis", ()):
+            self._add_emoji(guild_id, emoji)
+
+        for channel in data.get("channels", ()):
+            self._add_channel(guild_id, channel, "channels")
+
+        for thread in data.get("threads", ()):
+            self._add_channel(guild_id, thread, "threads")
+
+        for member in data.get("members", ()):
+            self._add_member(guild_id, member)
+
+    def _guild_create_chunk(self, data: JSON) -> None:
+        guild_id = int(data["guild_id"])
+        kind = data["type"]
+
+        for item in data["items"]:
+            if kind == "members":
+                self._add_member(guild_id, item)
+            elif kind in ("channels", "threads"):
+                self._add_channel(guild_id, item, kind)
+
+    def _guild_update(self, data: JSON) -> None:
+        guild_id = int(data["id"])
+
+        self.guilds.set(
+            guild_id, {**(self.guilds.get(guild_id) or {}), **_without_arrays(data)}
+        )
+
+        for role in data.get("roles", ()):
+            self._add_role(guild_id, role)
+
+        if "emojis" in data:
+            self._emojis_update({"guild_id": guild_id, "emojis": data["emojis"]})
+
+    def _guild_delete(self, data: JSON) -> None:
+        guild_id = int(data["id"])
+
+        if data.get("unavailable"):
+            # An outage, the guild comes back with a GUILD_CREATE.
+            if guild := self.guilds.get(guild_id):
+                self.guilds.set(guild_id, {**guild, "unavailable": True})
+
+            return
+
+        self.guilds.delete(guild_id)
+        self._member_stores.pop(guild_id, None)
+
+        for kind, ids in self._owned.pop(guild_id, {}).items():
+            if kind == "members":
+                for id in ids:
+                    self._member_cache.delete(_member_key(guild_id, id))
+            else:
+                cache: TypeCache = getattr(self, kind)
+
+                for id in ids:
+                    cache.delete(id)
+
+    def _role_update(self, data: JSON) -> None:
+        self._add_role(int(data["guild_id"]), data["role"])
+
+    def _role_delete(self, data: JSON) -> None:
+        role_id = int(data["role_id"])
+
+        self.roles.delete(role_id)
+        self._disown(int(data["guild_id"]), "roles", role_id)
+
+    def _emojis_update(self, data: JSON) -> None:
+        guild_id = int(data["guild_id"])
+
+        for emoji_id in self._owned[guild_id].pop("emojis", set()):
+            self.emojis.delete(emoji_id)
+
+        for emoji in data["emojis"]:
+            self._add_emoji(guild_id, emoji)
+
+    def _channel_update(self, data: JSON) -> None:
+        guild_id = data.get("guild_id")
+        self._add_channel(guild_id and int(guild_id), data, "channels")
+
+    def _channel_delete(self, data: JSON) -> None:
+        channel_id = int(data["id"])
+        guild_id = data.get("guild_id")
+
+        self.channels.delete(channel_id)
+        self._disown(guild_id and int(guild_id), "channels", channel_id)
+
+    def _thread_update(self, data: JSON) -> None:
+        self._add_channel(int(data["guild_id"]), data, "threads")
+
+    def _thread_delete(self, data: JSON) -> None:
+        thread_id = int(data["id"])
+
+        self.threads.delete(thread_id)
+        self._disown(int(data["guild_id"]), "threads", thread_id)
+
+    def _thread_list_sync(self, data: JSON) -> None:
+        guild_id = int(data["guild_id"])
+
+        for thread in data["threads"]:
+            self._add_channel(guild_id, thread, "threads")
+
+    def _member_update(self, data: JSON) -> None:
+        self._add_member(int(data["guild_id"]), data)
+
+    def _member_remove(self, data: JSON) -> None:
+        guild_id = int(data["guild_id"])
+        user_id = int(data["user"]["id"])
+
+        if self.compact_members:
+            if (store := self._member_stores.get(guild_id)) is not None:
+                store.delete(user_id)
+        else:
+            GuildMembers(self, guild_id).delete(user_id)
+
+    def _members_chunk(self, data: JSON) -> None:
+        guild_id = int(data["guild_id"])
+
+        for member in data["members"]:
+            self._add_member(guild_id, member)
@@ -0,0 +1,453 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from .policies import CachePolicy
+from .store import check_key
+
+JSON = Dict[str, Any]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Stored in timestamp columns for missing timestamps.
+_NO_TIME = -(2**63)
+
+_BOOLEANS = {"deaf": 1, "mute": 2, "pending": 4}
+_TIMES = ("joined_at", "premium_since")
+_COLUMNS = ("id", "roles", "nick", "flags", *_BOOLEANS, *_TIMES)
+
+# Fields which are never stored, the user is cached on its own and the guild is the store's.
+_DROPPED = frozenset(("user", "guild_id"))
+
+# Unused role slots are only reclaimed once there are at least this many.
+_MIN_COMPACT = 4096
+
+_EMPTY = -1
+_MIN_INDEX_BITS = 3
+
+# Fibonacci hashing, which spreads out snowflakes that only differ in their high bits.
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+
+def _parse_time(value: str) -> int:
+    return (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+
+
+def _format_time(value: int) -> Optional[str]:
+    if value == _NO_TIME:
+        return None
+
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+class MemberView(Mapping[str, Any]):
+    """A member in a :class:`MemberStore`, read from the store's columns on access.
+
+    Views read the JSON sent by Discord through the mapping interface, and typed values
+    through their properties. Views are live, they see updates to the member, and raise
+    a KeyError once it is removed from the store.
+    """
+
+    __slots__ = ("_store", "id")
+
+    def __init__(self, store: "MemberStore", id: int) -> None:
+        self._store = store
+        self.id = id
+
+    def __repr__(self) -> str:
+        return f"<MemberView id={self.id} guild_id={self._store.guild_id}>"
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store._field(self._store._row(self.id), key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._keys(self._store._row(self.id)))
+
+    def __len__(self) -> int:
+        return len(self._store._keys(self._store._row(self.id)))
+
+    @property
+    def guild_id(self) -> int:
+        return self._store.guild_id
+
+    @property
+    def roles(self) -> List[int]:
+        return self._store._roles(self._store._row(self.id))
+
+    @property
+    def joined_at(self) -> Optional[datetime]:
+        value = self._store._joined_at[self._store._row(self.id)]
+        return None if value == _NO_TIME else _EPOCH + value * _MICROSECOND
+
+    @property
+    def premium_since(self) -> Optional[datetime]:
+        value = self._store._premium_since[self._store._row(self.id)]
+        return None if value == _NO_TIME else _EPOCH + value * _MICROSECOND
+
+    @property
+    def nick(self) -> Optional[str]:
+        return self["nick"]
+
+    @property
+    def avatar(self) -> Optional[str]:
+        return self.get("avatar")
+
+    @property
+    def flags(self) -> int:
+        return self._store._flags[self._store._row(self.id)]
+
+    @property
+    def deaf(self) -> bool:
+        return self["deaf"]
+
+    @property
+    def mute(self) -> bool:
+        return self["mute"]
+
+    @property
+    def pending(self) -> bool:
+        return self["pending"]
+
+
+class MemberStore:
+    def __init__(self, guild_id: int, policy: CachePolicy = None) -> None:
+        """A guild's members, stored in arrays with one column per field.
+
+        IDs, role IDs, timestamps and flags are stored as machine integers instead of
+        Python objects, which takes a fraction of the memory of a dict per member.
+        Members are found through an open addressing index of row numbers, also stored
+        in an array. Fields which are usually missing, such as avatars, are kept per
+        member only when they are set, and null fields are left out. Members are read
+        through :class:`MemberView`.
+
+        Size and time limits are not supported, the policy can disable the store or
+        only allow some guilds.
+
+        :param guild_id: The ID of the guild the members are in.
+        :type guild_id: int
+        :param policy: Whether to cache the guild's members, defaults to caching them
+        :type policy: CachePolicy, optional
+        """
+
+        self.name = "members"
+        self.guild_id = guild_id
+        self.policy = policy or CachePolicy()
+
+        if self.policy.max_size is not None or self.policy.ttl is not None:
+            raise ValueError("Member stores can't have a maximum size or a TTL.")
+
+        self._ids = array("Q")
+        self._flags = array("I")
+        self._booleans = array("B")
+        self._joined_at = array("q")
+        self._premium_since = array("q")
+        self._nicks: List[Optional[str]] = []
+
+        # Each member's role IDs are a slice of one shared column.
+        self._role_ids = array("Q")
+        self._role_starts = array("I")
+        self._role_counts = array("H")
+        self._unused_roles = 0
+
+        self._extra: Dict[int, JSON] = {}
+
+        self._index_bits = _MIN_INDEX_BITS
+        self._index = array("i", [_EMPTY]) * (1 << _MIN_INDEX_BITS)
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def __repr__(self) -> str:
+        return f"<MemberStore guild_id={self.guild_id} size={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: int) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids.tolist())
+
+    def _home(self, key: int) -> int:
+        return ((key * _GOLDEN) & _MASK_64) >> (64 - self._index_bits)
+
+    def _slot(self, key: int) -> int:
+        """Get the index slot of a key, or the empty slot it would be inserted in."""
+
+        index, ids = self._index, self._ids
+        mask = len(index) - 1
+        slot = self._home(key)
+
+        while (row := index[slot]) != _EMPTY and ids[row] != key:
+            slot = (slot + 1) & mask
+
+        return slot
+
+    def _find(self, key: int) -> Optional[int]:
+        row = self._index[self._slot(key)]
+        return None if row == _EMPTY else row
+
+    def _row(self, key: int) -> int:
+        if (row := self._find(key)) is None:
+            raise KeyError(f"Member {key} is not in the store")
+
+        return row
+
+    def _grow(self) -> None:
+        self._index_bits += 1
+        self._index = index = array("i", [_EMPTY]) * (1 << self._index_bits)
+
+        # Every key is new to the index, so only empty slots need to be probed for.
+        mask = len(index) - 1
+        shift = 64 - self._index_bits
+
+        for row, key in enumerate(self._ids):
+            slot = ((key * _GOLDEN) & _MASK_64) >> shift
+
+            while index[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+
+            index[slot] = row
+
+    def _unindex(self, slot: int) -> None:
+        # Shift later entries of the probe sequence back, so lookups never stop early.
+        index, ids = self._index, self._ids
+        mask = len(index) - 1
+        following = slot
+
+        while True:
+            following = (following + 1) & mask
+            row = index[following]
+
+            if row == _EMPTY:
+                break
+
+            home = self._home(ids[row])
+
+            if (following - home) & mask >= (following - slot) & mask:
+                index[slot] = row
+                slot = following
+
+        index[slot] = _EMPTY
+
+    def _roles(self, row: int) -> List[int]:
+        start = self._role_starts[row]
+        return self._role_ids[start : start + self._role_counts[row]].tolist()
+
+    def _keys(self, row: int) -> List[str]:
+        return [*_COLUMNS, *self._extra.get(row, ())]
+
+    def _field(self, row: int, key: str) -> Any:
+        if key == "id":
+            return self._ids[row]
+        if key == "roles":
+            return [str(role) for role in self._roles(row)]
+        if key == "nick":
+            return self._nicks[row]
+        if key == "flags":
+            return self._flags[row]
+        if key in _BOOLEANS:
+            return bool(self._booleans[row] & _BOOLEANS[key])
+
+        extra = self._extra.get(row, {})
+
+        if key in _TIMES:
+            column = self._joined_at if key == "joined_at" else self._premium_since
+            return extra[key] if key in extra else _format_time(column[row])
+
+        return extra[key]
+
+    def get(self, key: int) -> Optional[MemberView]:
+        """Get a view of a member, or None if it is not cached."""
+
+        check_key(key)
+
+        if self._find(key) is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return MemberView(self, key)
+
+    def _admits(self) -> bool:
+        if not self.policy.enabled:
+            return False
+
+        return not self.policy.scoped or self.guild_id in (self.policy.guild_ids or ())
+
+    def set(self, key: int, value: Mapping[str, Any]) -> bool:
+        """Cache a member from its JSON, replacing any member with the same ID.
+
+        :return: Whether the store's policy allowed the member to be cached.
+        :rtype: bool
+        """
+
+        check_key(key)
+
+        if not self._admits():
+            self.rejected += 1
+            self.delete(key)
+            return False
+
+        if (row := self._find(key)) is None:
+            # Keep the index at most half full, so probe sequences stay short.
+            if (len(self._ids) + 1) * 2 > len(self._index):
+                self._grow()
+
+            row = len(self._ids)
+            self._index[self._slot(key)] = row
+
+            self._ids.append(key)
+            self._flags.append(0)
+            self._booleans.append(0)
+            self._joined_at.append(_NO_TIME)
+            self._premium_since.append(_NO_TIME)
+            self._nicks.append(None)
+            self._role_starts.append(len(self._role_ids))
+            self._role_counts.append(0)
+
+        extra: JSON = {}
+        roles: List[int] = []
+        flags = 0
+        booleans = 0
+        times = dict.fromkeys(_TIMES, _NO_TIME)
+
+        for field, data in value.items():
+            if field in _DROPPED or field in ("id", "nick"):
+                continue
+
+            if field == "roles":
+                roles = [int(role) for role in data]
+            elif field == "flags":
+                flags = data or 0
+            elif field in _BOOLEANS:
+                booleans |= _BOOLEANS[field] if data else 0
+            elif data is None:
+                continue
+            elif field in _TIMES:
+                try:
+                    times[field] = _parse_time(data)
+                except (TypeError, ValueError):
+                    extra[field] = data
+            else:
+                extra[field] = data
+
+        self._set_roles(row, roles)
+        self._nicks[row] = value.get("nick")
+        self._flags[row] = flags
+        self._booleans[row] = booleans
+        self._joined_at[row] = times["joined_at"]
+        self._premium_since[row] = times["premium_since"]
+
+        if extra:
+            self._extra[row] = extra
+        else:
+            self._extra.pop(row, None)
+
+        return True
+
+    def _set_roles(self, row: int, roles: List[int]) -> None:
+        count = self._role_counts[row]
+
+        if len(roles) <= count:
+            # The new roles fit in the old slice.
+            start = self._role_starts[row]
+            self._role_ids[start : start + len(roles)] = array("Q", roles)
+            self._unused_roles += count - len(roles)
+        else:
+            self._role_starts[row] = len(self._role_ids)
+            self._role_ids.extend(roles)
+            self._unused_roles += count
+
+        self._role_counts[row] = len(roles)
+
+        if self._unused_roles > _MIN_COMPACT and self._unused_roles * 2 > len(
+            self._role_ids
+        ):
+            self._compact_roles()
+
+    def _compact_roles(self) -> None:
+        role_ids = array("Q")
+
+        for row in range(len(self._ids)):
+            start = self._role_starts[row]
+            self._role_starts[row] = len(role_ids)
+            role_ids.extend(self._role_ids[start : start + self._role_counts[row]])
+
+        self._role_ids = role_ids
+        self._unused_roles = 0
+
+    def delete(self, key: int) -> Optional[JSON]:
+        """Remove a member, returning its JSON if it was cached."""
+
+        check_key(key)
+
+        slot = self._slot(key)
+
+        if (row := self._index[slot]) == _EMPTY:
+            return None
+
+        member = {field: self._field(row, field) for field in self._keys(row)}
+
+        self._unused_roles += self._role_counts[row]
+        self._unindex(slot)
+
+        # Move the last member into the removed member's row, so rows stay contiguous.
+        last = len(self._ids) - 1
+
+        if row != last:
+            self._index[self._slot(self._ids[last])] = row
+
+            for column in self._columns():
+                column[row] = column[last]
+
+            if last in self._extra:
+                self._extra[row] = self._extra.pop(last)
+            else:
+                self._extra.pop(row, None)
+        else:
+            self._extra.pop(row, None)
+
+        for column in self._columns():
+            column.pop()
+
+        return member
+
+    def _columns(self) -> List[Any]:
+        return [
+            self._ids,
+            self._flags,
+            self._booleans,
+            self._joined_at,
+            self._premium_since,
+            self._nicks,
+            self._role_starts,
+            self._role_counts,
+        ]
+
+    def clear(self) -> None:
+        self._extra.clear()
+
+        for column in (*self._columns(), self._role_ids):
+            del column[:]
+
+        self._unused_roles = 0
+        self._index_bits = _MIN_INDEX_BITS
+        self._index = array("i", [_EMPTY]) * (1 << _MIN_INDEX_BITS)
+
+    def stats(self) -> dict:
+        """Get the store's size, hit and miss counts, in the same form as TypeCache."""
+
+        return {
+            "size": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": 0,
+            "expired": 0,
+            "rejected": self.rejected,
+            "evictions_per_second": 0.0,
+        }
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """What a cache keeps, and for how long.
+
+    Limits can be combined, for example an LRU cache whose entries also expire. An
+    allowlist admits entries whose guild or channel is listed in either set.
+    """
+
+    enabled: bool = True
+    max_size: Optional[int] = None
+    ttl: Optional[float] = None
+    guild_ids: Optional[FrozenSet[int]] = None
+    channel_ids: Optional[FrozenSet[int]] = None
+
+    @classmethod
+    def disabled(cls) -> "CachePolicy":
+        """Cache nothing."""
+
+        return cls(enabled=False)
+
+    @classmethod
+    def unbounded(cls) -> "CachePolicy":
+        """Cache everything, forever."""
+
+        return cls()
+
+    @classmethod
+    def lru(cls, max_size: int) -> "CachePolicy":
+        """Keep at most ``max_size`` entries, evicting the least recently used."""
+
+        return cls(max_size=max_size)
+
+    @classmethod
+    def expiring(cls, ttl: float, max_size: int = None) -> "CachePolicy":
+        """Forget entries ``ttl`` seconds after they were last set."""
+
+        return cls(max_size=max_size, ttl=ttl)
+
+    @classmethod
+    def allowlist(
+        cls, guild_ids: Iterable[int] = None, channel_ids: Iterable[int] = None
+    ) -> "CachePolicy":
+        """Only cache entries belonging to these guilds or channels."""
+
+        return cls(
+            guild_ids=frozenset(guild_ids or ()),
+            channel_ids=frozenset(channel_ids or ()),
+        )
+
+    @property
+    def scoped(self) -> bool:
+        return self.guild_ids is not None or self.channel_ids is not None
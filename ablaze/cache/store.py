@@ -0,0 +1,229 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Generic, Iterator, Mapping, Optional, TypeVar
+
+from .policies import CachePolicy
+
+_T = TypeVar("_T")
+
+# The most expired entries removed by a single set, so sweeps never stall the loop.
+_SWEEP_LIMIT = 64
+
+
+def check_key(key: int) -> None:
+    """Raise a TypeError for cache keys which are not integers."""
+
+    if not isinstance(key, int) or isinstance(key, bool):
+        raise TypeError(f"Cache keys must be int, not {key.__class__.__qualname__}")
+
+
+def _scope(value: Any, field: str) -> Optional[int]:
+    if isinstance(value, Mapping):
+        scope = value.get(field)
+    else:
+        scope = getattr(value, field, None)
+
+    return None if scope is None else int(scope)
+
+
+class TypeCache(Generic[_T]):
+    def __init__(
+        self,
+        name: str,
+        policy: CachePolicy = None,
+        key_field: str = None,
+        on_evict: Callable[[int, Any], None] = None,
+    ) -> None:
+        """An integer keyed cache for a single type of entity.
+
+        :param name: The name of the entity type, used in statistics.
+        :type name: str
+        :param policy: What the cache keeps, and for how long, defaults to everything forever
+        :type policy: CachePolicy, optional
+        :param key_field: The allowlist field the keys are IDs of, such as "guild_id" for guilds, defaults to None
+        :type key_field: str, optional
+        :param on_evict: A function called with the key and value of each entry which is evicted or expires, defaults to None
+        :type on_evict: Callable[[int, Any], None], optional
+        """
+
+        self.name = name
+        self.policy = policy or CachePolicy()
+        self.key_field = key_field
+        self.on_evict = on_evict
+
+        # Entries are kept in recency order for LRU caches, including expiring ones, and
+        # in expiry order for other expiring caches, so the entry to evict is always the
+        # first one. Expired entries behind a recently used one are dropped when read.
+        self._items: "OrderedDict[int, Any]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+        self.rejected = 0
+
+        self._created = monotonic()
+
+    def __repr__(self) -> str:
+        return f"<TypeCache name={self.name} size={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: int) -> bool:
+        # Unlike get(), this leaves the statistics, recency order and expired entries be.
+        check_key(key)
+
+        if key not in self._items:
+            return False
+
+        return self.policy.ttl is None or self._items[key][0] > monotonic()
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._items))
+
+    def get(self, key: int) -> Optional[_T]:
+        """Get an item, or None if it is not cached."""
+
+        check_key(key)
+
+        if key not in self._items:
+            self.misses += 1
+            return None
+
+        value = self._items[key]
+
+        if self.policy.ttl is not None:
+            expires_at, value = value
+
+            if expires_at <= monotonic():
+                del self._items[key]
+
+                self.expired += 1
+                self.misses += 1
+                self._evicted(key, value)
+                return None
+
+        if self.policy.max_size is not None:
+            self._items.move_to_end(key)
+
+        self.hits += 1
+        return value
+
+    def _admits(self, key: int, value: _T) -> bool:
+        policy = self.policy
+
+        if not policy.enabled:
+            return False
+
+        if not policy.scoped:
+            return True
+
+        for field, allowed in (
+            ("guild_id", policy.guild_ids),
+            ("channel_id", policy.channel_ids),
+        ):
+            if not allowed:
+                continue
+
+            if field == self.key_field:
+                scope: Optional[int] = key
+            else:
+                scope = _scope(value, field)
+
+            if scope in allowed:
+                return True
+
+        return False
+
+    def set(self, key: int, value: _T) -> bool:
+        """Cache an item, replacing any item with the same key.
+
+        :return: Whether the cache's policy allowed the item to be cached.
+        :rtype: bool
+        """
+
+        check_key(key)
+
+        if not self._admits(key, value):
+            self.rejected += 1
+
+            if key in self._items:
+                previous = self._items.pop(key)
+                self._evicted(
+                    key, previous[1] if self.policy.ttl is not None else previous
+                )
+
+            return False
+
+        if self.policy.ttl is not None:
+            now = monotonic()
+
+            self._items.pop(key, None)
+            self._items[key] = (now + self.policy.ttl, value)
+
+            self._sweep(now)
+        else:
+            self._items[key] = value
+            self._items.move_to_end(key)
+
+        max_size = self.policy.max_size
+
+        while max_size is not None and len(self._items) > max_size:
+            evicted_key, evicted = self._items.popitem(last=False)
+            self.evicted += 1
+
+            if self.policy.ttl is not None:
+                evicted = evicted[1]
+
+            self._evicted(evicted_key, evicted)
+
+        return True
+
+    def _evicted(self, key: int, value: _T) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(_SWEEP_LIMIT):
+            if not self._items:
+                return
+
+            key, (expires_at, value) = next(iter(self._items.items()))
+
+            if expires_at > now:
+                return
+
+            del self._items[key]
+            self.expired += 1
+            self._evicted(key, value)
+
+    def delete(self, key: int) -> Optional[_T]:
+        """Remove an item, returning it if it was cached."""
+
+        check_key(key)
+
+        value = self._items.pop(key, None)
+
+        if value is not None and self.policy.ttl is not None:
+            return value[1]
+
+        return value
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> dict:
+        """Get the cache's size, hit, miss and eviction counts, and eviction rate."""
+
+        elapsed = max(monotonic() - self._created, 1e-9)
+
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "evictions_per_second": (self.evicted + self.expired) / elapsed,
+        }
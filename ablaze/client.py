@@ -1,17 +1,52 @@
 from asyncio import get_event_loop
 from asyncio.events import get_event_loop
+from typing import Mapping
 
+from .cache import CachePolicy, EntityCache
 from .internal import GatewayClient, RESTClient
 
 
 class AblazeClient:
     def __init__(
-        self, token: str, intents: int, shard_count: int = None, shard_ids: list = None
+        self,
+        token: str,
+        intents: int,
+        shard_count: int = None,
+        shard_ids: list = None,
+        http: RESTClient = None,
+        cache: EntityCache = None,
+        cache_policies: Mapping[str, CachePolicy] = None,
+        **options,
     ) -> None:
+        """A Discord bot client.
+
+        :param token: The bot token to use.
+        :type token: str
+        :param intents: The gateway intents to connect with.
+        :type intents: int
+        :param shard_count: The number of shards to use, defaults to None
+        :type shard_count: int, optional
+        :param shard_ids: The shard IDs to run in this client, defaults to None
+        :type shard_ids: list, optional
+        :param http: The HTTP client to use, defaults to a new RESTClient
+        :type http: RESTClient, optional
+        :param cache: The entity cache to keep up to date from gateway events, defaults to a new EntityCache
+        :type cache: EntityCache, optional
+        :param cache_policies: The policy of each entity type in a new cache, defaults to caching everything
+        :type cache_policies: Mapping[str, CachePolicy], optional
+
+        Any other keyword arguments are passed to the GatewayClient.
+        """
+
         self._loop = get_event_loop()
 
-        self._http = RESTClient(token)
-        self._gateway = GatewayClient(self._http, intents, shard_ids, shard_count)
+        self._http = http or RESTClient(token)
+        self._gateway = GatewayClient(
+            self._http, intents, shard_ids, shard_count, **options
+        )
+
+        self.cache = cache or EntityCache(self._http, cache_policies)
+        self.cache.listen(self._gateway)
 
     def run(self) -> None:
         """Make a blocking call to start the bot."""
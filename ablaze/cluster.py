@@ -0,0 +1,373 @@
+from asyncio import Lock, get_running_loop, run, sleep
+from logging import getLogger
+from multiprocessing import get_context
+from time import monotonic
+from time import sleep as blocking_sleep
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zlib import crc32
+
+from .client import AblazeClient
+from .errors import Unauthorized
+from .internal import RESTClient
+from .internal.gateway.identify import IDENTIFY_INTERVAL, IdentifyScheduler
+from .internal.http.ratelimiting import BucketLock, RateLimitManager
+from .internal.http.resources import gateway
+
+logger = getLogger("ablaze.cluster")
+
+_context = get_context("spawn")
+
+# The exit code of a cluster which failed in a way restarting can't fix, such as a bad
+# token, so it is not restarted.
+FATAL_EXIT_CODE = 78
+
+# Ratelimit buckets are shared through a fixed number of slots. Buckets which share a
+# slot wait for each other's resets, which is slower but never exceeds a limit.
+BUCKET_SLOTS = 4096
+
+
+class SharedState:
+    def __init__(self, max_concurrency: int, session_start_limit: dict) -> None:
+        """Identify and ratelimit state shared between every cluster process.
+
+        :param max_concurrency: The number of identify buckets.
+        :type max_concurrency: int
+        :param session_start_limit: The session start limit from ``GET /gateway/bot``.
+        :type session_start_limit: dict
+        """
+
+        self.max_concurrency = max(max_concurrency, 1)
+
+        # The locks of every shared value are only held to read and update it, never
+        # across an await, so a killed process can't leave one held for long. The
+        # contended identify locks are only taken in executor threads.
+
+        # Each bucket's next identify slot.
+        self.next_identify = [
+            _context.Value("d", 0.0) for _ in range(self.max_concurrency)
+        ]
+
+        self.budget_lock = _context.Lock()
+        self.remaining = _context.Value(
+            "i", session_start_limit["remaining"], lock=False
+        )
+        self.total = session_start_limit["total"]
+        self.reset_at = _context.Value(
+            "d", time() + session_start_limit["reset_after"] / 1000, lock=False
+        )
+
+        self.global_ratelimit = _context.Value("d", 0.0)
+
+        # When each REST ratelimit bucket slot can next be requested, in epoch time.
+        self.bucket_resets = _context.Array("d", BUCKET_SLOTS)
+
+
+class SharedIdentifyScheduler(IdentifyScheduler):
+    def __init__(self, state: SharedState) -> None:
+        """An identify scheduler whose buckets and budget are shared between processes.
+
+        :param state: The state shared between cluster processes.
+        :type state: SharedState
+        """
+
+        super().__init__(state.max_concurrency, 0, 0, state.total)
+
+        self._state = state
+
+    def _take_session(self) -> float:
+        # Blocking, returns how long to wait for the budget to reset, or 0 once taken.
+        state = self._state
+
+        with state.budget_lock:
+            now = time()
+
+            if now >= state.reset_at.value:
+                state.remaining.value = state.total
+                state.reset_at.value = now + 24 * 60 * 60
+
+            if state.remaining.value > 0:
+                state.remaining.value -= 1
+                self.remaining = state.remaining.value
+                return 0
+
+            return state.reset_at.value - now
+
+    def _take_slot(self, bucket: int) -> Tuple[float, float]:
+        # Blocking, returns the current time and the identify slot reserved in it.
+        next_identify = self._state.next_identify[bucket]
+
+        with next_identify.get_lock():
+            now = time()
+            slot = max(now, next_identify.value)
+            next_identify.value = slot + IDENTIFY_INTERVAL
+
+        return now, slot
+
+    async def _reserve_session(self) -> None:
+        loop = get_running_loop()
+
+        while delay := await loop.run_in_executor(None, self._take_session):
+            await sleep(delay)
+
+    async def acquire(self, shard_id: int) -> None:
+        bucket = self.bucket(shard_id)
+
+        await self._reserve_session()
+
+        now, slot = await get_running_loop().run_in_executor(
+            None, self._take_slot, bucket
+        )
+
+        self._next[bucket] = monotonic() + slot + IDENTIFY_INTERVAL - now
+
+        if slot > now:
+            await sleep(slot - now)
+
+        self._pending.discard(shard_id)
+
+
+class SharedBucketLock(BucketLock):
+    def __init__(self, lock: Lock, state: SharedState, bucket: str) -> None:
+        """A bucket lock which also waits for, and shares, the bucket's reset time.
+
+        :param lock: The lock to manage.
+        :type lock: Lock
+        :param state: The state shared between cluster processes.
+        :type state: SharedState
+        :param bucket: The ratelimit bucket the lock is for.
+        :type bucket: str
+        """
+
+        super().__init__(lock)
+
+        self._resets = state.bucket_resets
+        # crc32, as str hashes differ between processes.
+        self._slot = crc32(bucket.encode()) % len(self._resets)
+
+    async def __aenter__(self):
+        await super().__aenter__()
+
+        # Another process may have used up the bucket while this one waited.
+        while (delay := self._resets[self._slot] - time()) > 0:
+            await sleep(delay)
+
+    def defer(self, time: float) -> None:
+        self._share(time)
+        super().defer(time)
+
+    def _share(self, wait: float) -> None:
+        with self._resets.get_lock():
+            self._resets[self._slot] = max(self._resets[self._slot], time() + wait)
+
+
+class SharedRateLimitManager(RateLimitManager):
+    def __init__(self, state: SharedState) -> None:
+        """A ratelimit manager which shares the global and bucket ratelimits between processes.
+
+        :param state: The state shared between cluster processes.
+        :type state: SharedState
+        """
+
+        super().__init__()
+
+        self._state = state
+
+    async def get_lock(self, bucket: str) -> BucketLock:
+        delay = self._state.global_ratelimit.value - time()
+
+        if delay > 0:
+            await sleep(delay)
+
+        await self._global.wait()
+
+        if lock := self._buckets.get(bucket):
+            return lock
+
+        self._buckets[bucket] = SharedBucketLock(Lock(), self._state, bucket)
+        return self._buckets[bucket]
+
+    def clear_global(self, wait: float) -> None:
+        with self._state.global_ratelimit.get_lock():
+            self._state.global_ratelimit.value = max(
+                self._state.global_ratelimit.value, time() + wait
+            )
+
+        super().clear_global(wait)
+
+
+def _run_cluster(
+    cluster_id: int,
+    token: str,
+    intents: int,
+    shard_ids: List[int],
+    shard_count: int,
+    setup: Callable[[AblazeClient, int], None],
+    state: SharedState,
+    options: Dict[str, Any],
+) -> None:
+    client = AblazeClient(
+        token,
+        intents,
+        shard_count,
+        shard_ids,
+        http=RESTClient(token, SharedRateLimitManager(state)),
+        identify_scheduler=SharedIdentifyScheduler(state),
+        **options,
+    )
+
+    setup(client, cluster_id)
+
+    try:
+        client.run()
+    except (SystemExit, Unauthorized) as e:
+        # The gateway exits with a message on close codes reconnecting can't fix.
+        if isinstance(e, SystemExit) and not isinstance(e.code, str):
+            raise
+
+        logger.critical(f"Cluster {cluster_id} failed and won't be restarted: {e}")
+        raise SystemExit(FATAL_EXIT_CODE) from e
+
+
+class ClusterLauncher:
+    def __init__(
+        self,
+        token: str,
+        intents: int,
+        setup: Callable[[AblazeClient, int], None],
+        clusters: int,
+        shard_count: int = None,
+        restart_delay: float = 5,
+        max_restarts: int = None,
+        **options,
+    ) -> None:
+        """Run a bot's shards across several processes, restarting them if they crash.
+
+        :param token: The bot token to use.
+        :type token: str
+        :param intents: The gateway intents to connect with.
+        :type intents: int
+        :param setup: A module level function called with each cluster's client and cluster ID, to add listeners.
+        :type setup: Callable[[AblazeClient, int], None]
+        :param clusters: The number of processes to split shards between.
+        :type clusters: int
+        :param shard_count: The total number of shards, defaults to Discord's recommendation
+        :type shard_count: int, optional
+        :param restart_delay: How long to wait before restarting a crashed cluster, defaults to 5
+        :type restart_delay: float, optional
+        :param max_restarts: The most times to restart each cluster, defaults to None (no limit)
+        :type max_restarts: int, optional
+
+        Clusters which exit with ``FATAL_EXIT_CODE``, such as after an authentication
+        failure, are never restarted.
+
+        Any other keyword arguments are passed to each cluster's GatewayClient.
+        """
+
+        self._token = token
+        self._intents = intents
+        self._setup = setup
+        self._clusters = clusters
+        self._shard_count = shard_count
+        self._restart_delay = restart_delay
+        self._max_restarts = max_restarts
+        self._options = options
+
+        self.shard_groups: List[List[int]] = []
+        self.processes: Dict[int, Any] = {}
+        self.restarts: Dict[int, int] = {}
+
+        self._restart_at: Dict[int, float] = {}
+
+        self._state: Optional[SharedState] = None
+
+    async def _fetch_gateway(self) -> dict:
+        http = RESTClient(self._token)
+
+        try:
+            return await gateway.get_gateway_bot(http)
+        finally:
+            await http.session.close()
+
+    def _spawn(self, cluster_id: int) -> None:
+        process = _context.Process(
+            target=_run_cluster,
+            name=f"ablaze-cluster-{cluster_id}",
+            args=(
+                cluster_id,
+                self._token,
+                self._intents,
+                self.shard_groups[cluster_id],
+                self._shard_count,
+                self._setup,
+                self._state,
+                self._options,
+            ),
+            daemon=True,
+        )
+        process.start()
+
+        self.processes[cluster_id] = process
+
+    def run(self) -> None:
+        """Make a blocking call to start and supervise every cluster."""
+
+        gw = run(self._fetch_gateway())
+        limit = gw["session_start_limit"]
+
+        self._shard_count = self._shard_count or gw["shards"]
+        self._state = SharedState(limit["max_concurrency"], limit)
+
+        shard_ids = list(range(self._shard_count))
+        size = -(-len(shard_ids) // self._clusters)
+
+        self.shard_groups = [
+            shard_ids[i : i + size] for i in range(0, len(shard_ids), size)
+        ]
+
+        for cluster_id in range(len(self.shard_groups)):
+            self._spawn(cluster_id)
+
+        try:
+            self._supervise()
+        finally:
+            for process in self.processes.values():
+                if process.is_alive():
+                    process.terminate()
+
+    def _supervise(self) -> None:
+        while self.processes:
+            blocking_sleep(1)
+
+            for cluster_id, process in list(self.processes.items()):
+                if process.is_alive():
+                    continue
+
+                if process.exitcode == 0:
+                    del self.processes[cluster_id]
+                    continue
+
+                if process.exitcode == FATAL_EXIT_CODE or (
+                    self._max_restarts is not None
+                    and self.restarts.get(cluster_id, 0) >= self._max_restarts
+                ):
+                    logger.error(
+                        f"Cluster {cluster_id} exited with code {process.exitcode}, not restarting"
+                    )
+
+                    del self.processes[cluster_id]
+                    continue
+
+                if cluster_id not in self._restart_at:
+                    logger.warning(
+                        f"Cluster {cluster_id} exited with code {process.exitcode}, restarting in {self._restart_delay}s"
+                    )
+
+                    self._restart_at[cluster_id] = time() + self._restart_delay
+                    continue
+
+                if time() >= self._restart_at[cluster_id]:
+                    del self._restart_at[cluster_id]
+
+                    self.restarts[cluster_id] = self.restarts.get(cluster_id, 0) + 1
+                    self._spawn(cluster_id)
@@ -1,10 +1,13 @@
-from .gateway import GatewayClient, Shard
+from .decoding import Decoder
+from .gateway import GatewayClient, GatewayIntents, Shard
 from .http import File, RESTClient, Route
 
 __all__ = (
+    "Decoder",
     "File",
     "RESTClient",
     "Route",
     "GatewayClient",
+    "GatewayIntents",
     "Shard",
 )
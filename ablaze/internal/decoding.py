@@ -0,0 +1,41 @@
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from json import loads
+from typing import Any, Optional, Union
+
+
+class Decoder:
+    def __init__(
+        self,
+        threshold: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """Decodes JSON, optionally handing large payloads to an executor.
+
+        Payloads are decoded on the event loop unless a threshold is given. The standard
+        library decoder holds the GIL, so decoding in a thread pool stalls the loop just
+        as long. A ``ProcessPoolExecutor`` decodes in parallel, but the result is still
+        unpickled on the loop, which only shortens stalls for payloads of several MiB.
+        ``benchmarks/decode_lag.py`` measures the stalls, measure before offloading.
+
+        :param threshold: The size above which payloads are offloaded, defaults to None (never)
+        :type threshold: int, optional
+        :param executor: The executor to decode in, defaults to the event loop's default executor
+        :type executor: Executor, optional
+        """
+
+        self.threshold = threshold
+        self.executor = executor
+
+    def offloads(self, raw: Union[str, bytes]) -> bool:
+        """Check whether a payload is large enough to be decoded in the executor."""
+
+        return self.threshold is not None and len(raw) > self.threshold
+
+    async def loads(self, raw: Union[str, bytes]) -> Any:
+        """Decode a JSON payload, in the executor if it is over the threshold."""
+
+        if not self.offloads(raw):
+            return loads(raw)
+
+        return await get_running_loop().run_in_executor(self.executor, loads, raw)
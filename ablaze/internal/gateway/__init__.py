@@ -1,7 +1,52 @@
+from .bus import EventBusServer, RemoteShard, WorkerClient
+from .chunking import MemberChunker, MemberRequest
+from .constants import GatewayIntents
 from .gateway import GatewayClient
+from .handoff import HandoffClient, HandoffServer
+from .identify import IdentifyScheduler
+from .listeners import Listener
+from .metrics import LatencyHistogram, ShardMetrics
+from .partitions import EventPartitioner
+from .payload import LazyPayload
+from .ratelimiter import PriorityRatelimiter, SendPriority
+from .sessions import (
+    FileSessionStore,
+    MemorySessionStore,
+    SessionState,
+    SessionStore,
+)
 from .shard import Shard
+from .shedding import SheddingPolicy
+from .streaming import GuildCreateStream
+from .supervisor import Backoff, ShardState
+from .threads import ShardThread
 
 __all__ = (
+    "Backoff",
+    "EventBusServer",
+    "EventPartitioner",
+    "FileSessionStore",
     "GatewayClient",
+    "GatewayIntents",
+    "HandoffClient",
+    "GuildCreateStream",
+    "HandoffServer",
+    "IdentifyScheduler",
+    "LazyPayload",
+    "MemberChunker",
+    "MemberRequest",
+    "LatencyHistogram",
+    "Listener",
+    "MemorySessionStore",
+    "PriorityRatelimiter",
+    "RemoteShard",
+    "SendPriority",
+    "SessionState",
+    "SessionStore",
     "Shard",
+    "ShardMetrics",
+    "ShardState",
+    "ShardThread",
+    "SheddingPolicy",
+    "WorkerClient",
 )
@@ -0,0 +1,313 @@
+from asyncio import (
+    AbstractEventLoop,
+    Queue,
+    QueueFull,
+    StreamReader,
+    StreamWriter,
+    Task,
+    get_event_loop,
+    open_unix_connection,
+    sleep,
+    start_unix_server,
+)
+from collections import defaultdict
+from json import dumps, loads
+from logging import getLogger
+from typing import Any, Dict, List, Mapping, Optional
+
+import ablaze
+
+from .listeners import Listener, ListenerIndex, routing_keys
+from .partitions import partition_key
+
+logger = getLogger("ablaze.gateway")
+
+# Events are newline delimited JSON, so frames can be read with readline.
+_LINE_LIMIT = 2**27
+
+
+def _encode(frame: dict) -> bytes:
+    return dumps(frame, separators=(",", ":")).encode() + b"\n"
+
+
+class _Worker:
+    def __init__(self, writer: StreamWriter, queue_size: int) -> None:
+        # Frames are written by a task of their own, so a slow worker never holds up
+        # the shard which received the event.
+        self.writer = writer
+        self.queue: "Queue[bytes]" = Queue(queue_size)
+        self.task: Task = get_event_loop().create_task(self._write())
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                self.writer.write(await self.queue.get())
+                await self.writer.drain()
+        except ConnectionError as e:
+            logger.warning(f"Disconnecting event bus worker after a write error: {e!r}")
+            self.writer.close()
+
+    def close(self) -> None:
+        self.task.cancel()
+        self.writer.close()
+
+
+class EventBusServer:
+    def __init__(
+        self, gateway: "ablaze.GatewayClient", path: str, queue_size: int = 10000
+    ) -> None:
+        """Forwards gateway events to worker processes over a unix socket.
+
+        Events are spread across connected workers by guild, so each guild's events
+        stay ordered on a single worker. Workers send gateway commands back through the
+        shard which owns them.
+
+        Which worker a guild goes to depends on the number of connected workers, so
+        when a worker connects or disconnects most guilds move to another worker. Events
+        sent around that time can be processed out of order, and workers should not
+        keep per-guild state across it.
+
+        Each worker has a queue of events waiting to be written. A worker whose queue
+        fills up is too slow to keep up, so it is disconnected instead of slowing down
+        the gateway.
+
+        :param gateway: The gateway client to forward events from.
+        :type gateway: ablaze.GatewayClient
+        :param path: The path of the unix socket to listen on.
+        :type path: str
+        :param queue_size: The most events waiting to be written to each worker, defaults to 10000
+        :type queue_size: int, optional
+        """
+
+        self.gateway = gateway
+        self.path = path
+        self.queue_size = queue_size
+
+        self.workers: List[_Worker] = []
+        self.dropped = 0
+
+        self._server = None
+
+    async def start(self) -> None:
+        """Start listening for workers and forwarding events."""
+
+        self._server = await start_unix_server(
+            self._handle_worker, self.path, limit=_LINE_LIMIT
+        )
+
+        if self not in self.gateway._event_buses:
+            self.gateway._event_buses.append(self)
+
+    async def close(self) -> None:
+        """Stop forwarding events and disconnect every worker."""
+
+        if self in self.gateway._event_buses:
+            self.gateway._event_buses.remove(self)
+
+        for worker in self.workers:
+            worker.close()
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def publish(self, shard: "ablaze.Shard", event: Mapping[str, Any]) -> None:
+        """Forward an event to the worker responsible for it.
+
+        :param shard: The shard the event came from.
+        :type shard: ablaze.Shard
+        :param event: The event to forward.
+        :type event: Mapping[str, Any]
+        """
+
+        if not self.workers:
+            self.dropped += 1
+            return
+
+        worker = self.workers[partition_key(shard, event) % len(self.workers)]
+
+        try:
+            worker.queue.put_nowait(
+                _encode({"shard_id": shard.id, "event": dict(event)})
+            )
+        except QueueFull:
+            logger.warning(
+                f"Disconnecting event bus worker with {worker.queue.qsize()} events waiting"
+            )
+
+            self.dropped += 1
+            self.workers.remove(worker)
+            worker.close()
+
+    async def _handle_worker(self, reader: StreamReader, writer: StreamWriter) -> None:
+        worker = _Worker(writer, self.queue_size)
+        self.workers.append(worker)
+
+        try:
+            while line := await reader.readline():
+                command = loads(line)
+                shard = self._find_shard(command["shard_id"])
+
+                if shard is None:
+                    logger.warning(
+                        f"Worker sent a command for unknown shard: {command}"
+                    )
+                    continue
+
+                try:
+                    await shard.send(command["payload"])
+                except ConnectionError as e:
+                    # The shard is reconnecting, which the worker's connection outlives.
+                    logger.warning(
+                        f"Could not send worker command through shard {shard.id}: {e!r}"
+                    )
+        except ConnectionError:
+            pass
+        finally:
+            if worker in self.workers:
+                self.workers.remove(worker)
+
+            worker.close()
+
+    def _find_shard(self, shard_id: int) -> Optional["ablaze.Shard"]:
+        for shard in self.gateway.shards:
+            if shard.id == shard_id:
+                return shard
+
+        return None
+
+
+class RemoteShard:
+    def __init__(self, id: int, worker: "WorkerClient") -> None:
+        """A handle to a shard owned by the gateway process.
+
+        :param id: The shard's ID.
+        :type id: int
+        :param worker: The worker client connected to the gateway process.
+        :type worker: WorkerClient
+        """
+
+        self.id = id
+        self._worker = worker
+
+    def __repr__(self) -> str:
+        return f"<RemoteShard id={self.id}>"
+
+    async def send(self, data: dict) -> None:
+        """Send data to the gateway through the shard that owns it."""
+
+        await self._worker.send(self.id, data)
+
+
+class WorkerClient:
+    def __init__(
+        self,
+        path: str,
+        reconnect_delay: float = 1,
+        loop: Optional[AbstractEventLoop] = None,
+    ) -> None:
+        """Receives gateway events from an event bus server in another process.
+
+        :param path: The path of the unix socket the server listens on.
+        :type path: str
+        :param reconnect_delay: How long to wait before reconnecting to the server, defaults to 1
+        :type reconnect_delay: float, optional
+        :param loop: The event loop to use, defaults to None
+        :type loop: AbstractEventLoop, optional
+        """
+
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+
+        self._loop = loop or get_event_loop()
+
+        self._listeners: Dict[str, ListenerIndex] = defaultdict(ListenerIndex)
+        self._shards: Dict[int, RemoteShard] = {}
+        self._writer: Optional[StreamWriter] = None
+
+    def add_listener(self, event: str, listener: Any, **options) -> Listener:
+        """Add a listener for a gateway event.
+
+        Accepts the same options as :meth:`ablaze.GatewayClient.add_listener`.
+        """
+
+        filters = {
+            name: options.pop(name)
+            for name in ("guild_id", "channel_id", "author_id")
+            if options.get(name) is not None
+        }
+
+        wrapped = Listener(listener, loop=self._loop, filters=filters, **options)
+        self._listeners[event.upper()].add(wrapped)
+
+        return wrapped
+
+    def shard(self, shard_id: int) -> RemoteShard:
+        """Get a handle to a shard owned by the gateway process."""
+
+        if shard_id not in self._shards:
+            self._shards[shard_id] = RemoteShard(shard_id, self)
+
+        return self._shards[shard_id]
+
+    async def send(self, shard_id: int, data: dict) -> None:
+        """Send data to the gateway through a shard.
+
+        :param shard_id: The ID of the shard to send through.
+        :type shard_id: int
+        :param data: The data to send.
+        :type data: dict
+        """
+
+        if not self._writer:
+            raise ConnectionError("The worker is not connected to an event bus.")
+
+        self._writer.write(_encode({"shard_id": shard_id, "payload": data}))
+        await self._writer.drain()
+
+    async def run(self) -> None:
+        """Receive events from the server, reconnecting whenever the connection drops."""
+
+        while True:
+            try:
+                reader, self._writer = await open_unix_connection(
+                    self.path, limit=_LINE_LIMIT
+                )
+            except (ConnectionError, FileNotFoundError):
+                await sleep(self.reconnect_delay)
+                continue
+
+            try:
+                while line := await reader.readline():
+                    frame = loads(line)
+                    await self.dispatch(self.shard(frame["shard_id"]), frame["event"])
+            except ConnectionError:
+                pass
+            except (KeyError, ValueError) as e:
+                # Oversized lines raise ValueError, as do frames which aren't JSON.
+                logger.error(
+                    f"Reconnecting after a bad frame from the event bus: {e!r}"
+                )
+            finally:
+                self._writer.close()
+                self._writer = None
+
+            await sleep(self.reconnect_delay)
+
+    async def dispatch(self, shard: RemoteShard, event: dict) -> None:
+        name = event.get("t") or f"OP_{event['op']}"
+
+        indexes = (
+            self._listeners[name],
+            self._listeners["GATEWAY_RECEIVE"],
+            self._listeners["*"],
+        )
+
+        keys = None
+
+        if any(index.indexed for index in indexes):
+            keys = routing_keys(event)
+
+        for index in indexes:
+            for listener in index.match(keys):
+                await listener.submit(shard, event)
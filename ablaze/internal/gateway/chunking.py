@@ -0,0 +1,283 @@
+from asyncio import (
+    Queue,
+    Semaphore,
+    TimeoutError,
+    TimerHandle,
+    get_running_loop,
+    wait_for,
+)
+from itertools import count
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import ablaze
+
+from .constants import GatewayOps
+
+
+def shard_id_for(guild_id: int, shard_count: int) -> int:
+    """Get the ID of the shard which receives a guild's events."""
+
+    return (guild_id >> 22) % shard_count
+
+
+class MemberRequest:
+    def __init__(
+        self,
+        guild_id: int,
+        nonce: str,
+        timeout: float,
+        discard: Callable[[str], Any],
+    ) -> None:
+        """The stream of members returned for a single REQUEST_GUILD_MEMBERS.
+
+        Iterating yields each member as its chunk arrives, and can only be done once.
+        The request is discarded when a chunk takes longer than the timeout to arrive,
+        whether or not it is being iterated.
+
+        :param guild_id: The ID of the guild members were requested for.
+        :type guild_id: int
+        :param nonce: The nonce identifying the request's chunks.
+        :type nonce: str
+        :param timeout: How long to wait for each chunk before raising TimeoutError.
+        :type timeout: float
+        :param discard: Called with the nonce when chunks stop arriving in time.
+        :type discard: Callable[[str], Any]
+        """
+
+        self.guild_id = guild_id
+        self.nonce = nonce
+        self.timeout = timeout
+        self._discard = discard
+
+        self.chunk_count: Optional[int] = None
+        self.received = 0
+
+        self.not_found: List[int] = []
+        self.presences: List[Mapping[str, Any]] = []
+
+        self._chunks: Queue = Queue()
+        self._expiry: Optional[TimerHandle] = None
+
+    def _expire_later(self) -> None:
+        self._cancel_expiry()
+        self._expiry = get_running_loop().call_later(
+            self.timeout, self._discard, self.nonce
+        )
+
+    def _cancel_expiry(self) -> None:
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+
+    @property
+    def done(self) -> bool:
+        return self.chunk_count is not None and self.received >= self.chunk_count
+
+    def feed(self, chunk: Mapping[str, Any]) -> None:
+        self.chunk_count = chunk["chunk_count"]
+        self.received += 1
+
+        self.not_found.extend(int(id) for id in chunk.get("not_found", ()))
+        self.presences.extend(chunk.get("presences", ()))
+
+        self._chunks.put_nowait(chunk)
+
+        if self.done:
+            self._cancel_expiry()
+        else:
+            self._expire_later()
+
+    async def __aiter__(self) -> AsyncIterator[Mapping[str, Any]]:
+        yielded = 0
+
+        while yielded < (self.chunk_count or 1):
+            try:
+                chunk = await wait_for(self._chunks.get(), self.timeout)
+            except TimeoutError:
+                self._discard(self.nonce)
+                raise
+
+            yielded += 1
+
+            for member in chunk["members"]:
+                yield member
+
+    async def collect(self) -> List[Mapping[str, Any]]:
+        """Wait for every chunk and return all of the members."""
+
+        return [member async for member in self]
+
+
+class MemberChunker:
+    def __init__(self, gateway: "ablaze.GatewayClient") -> None:
+        """Requests guild members over the gateway and assembles their chunks.
+
+        Requests are sent through the shard which owns each guild, so they share its
+        send ratelimit with everything else the shard sends.
+
+        :param gateway: The gateway client whose shards to request members through.
+        :type gateway: ablaze.GatewayClient
+        """
+
+        self.gateway = gateway
+
+        self._requests: Dict[str, MemberRequest] = {}
+        self._nonces = count()
+
+    def consume(self, presences: bool = False) -> None:
+        """Keep the intents member requests need, for clients with ``auto_intents``.
+
+        Call this before the client starts, as intents are only left out then.
+
+        :param presences: Whether members will be requested with their presences, defaults to False
+        :type presences: bool, optional
+        """
+
+        self.gateway.consume("GUILD_MEMBERS_CHUNK")
+
+        if presences:
+            self.gateway.consume("PRESENCE_UPDATE")
+
+    def shard_for(self, guild_id: int) -> "ablaze.Shard":
+        """Get the shard which receives a guild's events.
+
+        :raises ValueError: The guild's shard is not run by this gateway client.
+        """
+
+        shard_id = shard_id_for(guild_id, self.gateway._shard_count)
+
+        for shard in self.gateway.shards:
+            if shard.id == shard_id:
+                return shard
+
+        raise ValueError(f"Shard {shard_id} for guild {guild_id} is not run here.")
+
+    async def request(
+        self,
+        guild_id: int,
+        *,
+        query: str = "",
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: List[int] = None,
+        timeout: float = 30,
+    ) -> MemberRequest:
+        """Request a guild's members.
+
+        :param guild_id: The ID of the guild.
+        :type guild_id: int
+        :param query: Only request members whose username starts with this, defaults to ""
+        :type query: str, optional
+        :param limit: The maximum number of members to return, defaults to 0 (all)
+        :type limit: int, optional
+        :param presences: Whether to also request the members' presences, defaults to False
+        :type presences: bool, optional
+        :param user_ids: Only request these members, defaults to None
+        :type user_ids: List[int], optional
+        :param timeout: How long to wait for each chunk, defaults to 30
+        :type timeout: float, optional
+        :return: The request, which can be iterated for its members.
+        :rtype: MemberRequest
+        """
+
+        shard = self.shard_for(guild_id)
+        nonce = str(next(self._nonces))
+
+        self.consume(presences)
+
+        d: Dict[str, Any] = {
+            "guild_id": str(guild_id),
+            "presences": presences,
+            "nonce": nonce,
+        }
+
+        if user_ids is not None:
+            d["user_ids"] = [str(id) for id in user_ids]
+        else:
+            d["query"] = query
+            d["limit"] = limit
+
+        request = MemberRequest(guild_id, nonce, timeout, self._discard)
+        self._requests[nonce] = request
+
+        try:
+            await shard.send({"op": GatewayOps.REQUEST_GUILD_MEMBERS, "d": d})
+        except BaseException:
+            del self._requests[nonce]
+            raise
+
+        request._expire_later()
+
+        return request
+
+    async def fetch(
+        self, guild_ids: Iterable[int], per_shard: int = 1, **options
+    ) -> AsyncIterator[Tuple[int, List[Mapping[str, Any]]]]:
+        """Fetch the members of many guilds, a few requests per shard at a time.
+
+        Guilds whose chunks time out are skipped. Accepts the same options as
+        :meth:`request`.
+
+        :param guild_ids: The IDs of the guilds.
+        :type guild_ids: Iterable[int]
+        :param per_shard: The number of requests in flight on each shard, defaults to 1
+        :type per_shard: int, optional
+        :return: Each guild's ID and members, as they finish.
+        :rtype: AsyncIterator[Tuple[int, List[Mapping[str, Any]]]]
+        """
+
+        loop = self.gateway._loop
+        results: Queue = Queue()
+
+        # Checked up front, so a guild on another process' shard fails fast.
+        shards = {guild_id: self.shard_for(guild_id).id for guild_id in guild_ids}
+        slots = {shard_id: Semaphore(per_shard) for shard_id in shards.values()}
+
+        async def fetch_one(guild_id: int) -> None:
+            try:
+                async with slots[shards[guild_id]]:
+                    request = await self.request(guild_id, **options)
+                    members = await request.collect()
+
+                await results.put((guild_id, members))
+            except (TimeoutError, ConnectionError):
+                await results.put((guild_id, None))
+
+        tasks = [loop.create_task(fetch_one(guild_id)) for guild_id in shards]
+
+        try:
+            for _ in range(len(tasks)):
+                guild_id, members = await results.get()
+
+                if members is not None:
+                    yield guild_id, members
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _discard(self, nonce: str) -> None:
+        if request := self._requests.pop(nonce, None):
+            request._cancel_expiry()
+
+    def feed(self, chunk: Mapping[str, Any]) -> None:
+        """Pass a GUILD_MEMBERS_CHUNK to the request it belongs to."""
+
+        request = self._requests.get(chunk.get("nonce"))  # type: ignore
+
+        if request is None:
+            return
+
+        request.feed(chunk)
+
+        if request.done:
+            del self._requests[request.nonce]
@@ -1,12 +1,46 @@
-from asyncio import get_event_loop, sleep
+from asyncio import (
+    AbstractEventLoop,
+    get_event_loop,
+    run_coroutine_threadsafe,
+    sleep,
+    wait_for,
+)
 from collections import defaultdict
-from typing import Coroutine
+from logging import getLogger
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+from warnings import warn
 
 import ablaze
+from ablaze.internal.decoding import Decoder
 from ablaze.internal.http.resources import gateway
 
-from .ratelimiter import Ratelimiter
+if TYPE_CHECKING:
+    from .bus import EventBusServer
+
+from .chunking import MemberChunker
+from .constants import GatewayIntents, GatewayOps
+from .identify import IdentifyScheduler
+from .intents import EVENT_INTENTS, intent_names, required_intents
+from .listeners import Listener, ListenerIndex, OverflowPolicy, routing_keys
+from .partitions import EventPartitioner
+from .sessions import SessionStore
 from .shard import Shard
+from .shedding import SheddingPolicy
+from .threads import ShardThread
+from .waiters import Check, Waiter, WaiterIndex
+
+logger = getLogger("ablaze.gateway")
 
 
 class GatewayClient:
@@ -16,6 +50,19 @@ class GatewayClient:
         intents: int,
         shard_ids: list = None,
         shard_count: int = None,
+        lazy_payloads: bool = False,
+        workers: int = None,
+        worker_queue_size: int = 0,
+        shedding: SheddingPolicy = None,
+        session_store: SessionStore = None,
+        identify_scheduler: IdentifyScheduler = None,
+        shard_threads: int = None,
+        stall_timeout: float = None,
+        stream_threshold: int = None,
+        stream_batch_size: int = 1000,
+        decoder: Decoder = None,
+        auto_intents: bool = False,
+        loop: AbstractEventLoop = None,
     ) -> None:
         """A client to connect to the Discord gateway.
 
@@ -27,51 +74,458 @@ class GatewayClient:
         :type shard_ids: list, optional
         :param shard_count: The number of shards to use, defaults to None
         :type shard_count: int, optional
+        :param lazy_payloads: Whether to dispatch events whose data is only decoded when read, defaults to False
+        :type lazy_payloads: bool, optional
+        :param workers: The number of ordered worker partitions to process events with, defaults to None
+        :type workers: int, optional
+        :param worker_queue_size: The maximum backlog of each worker partition, defaults to 0 (unbounded)
+        :type worker_queue_size: int, optional
+        :param shedding: The policy used to shed low priority events under backpressure, defaults to None
+        :type shedding: SheddingPolicy, optional
+        :param session_store: The store used to persist sessions across restarts, defaults to None
+        :type session_store: SessionStore, optional
+        :param identify_scheduler: The scheduler used to space out identifies, defaults to one built from the session start limit
+        :type identify_scheduler: IdentifyScheduler, optional
+        :param shard_threads: The number of threads to spread shards across, each with its own event loop, defaults to None
+        :type shard_threads: int, optional
+        :param stall_timeout: Reconnect a ready shard which receives no events for this many seconds, defaults to None
+        :type stall_timeout: float, optional
+        :param stream_threshold: Decode GUILD_CREATE frames larger than this many characters piecewise, defaults to None
+        :type stream_threshold: int, optional
+        :param stream_batch_size: The number of items in each GUILD_CREATE_CHUNK of a streamed frame, defaults to 1000
+        :type stream_batch_size: int, optional
+        :param decoder: The decoder for gateway frames, defaults to the HTTP client's decoder
+        :type decoder: Decoder, optional
+        :param auto_intents: Leave out intents which only deliver events nothing listens for, defaults to False
+        :type auto_intents: bool, optional
+        :param loop: The event loop to dispatch events on, defaults to the current event loop
+        :type loop: AbstractEventLoop, optional
         """
 
         self._http = http
         self._intents = intents
+        self._auto_intents = auto_intents
+
+        self._gateway_url: Optional[str] = None
+        self._consumed: Set[str] = set()
 
         self._shard_count = shard_count or 1
         self._shard_ids = shard_ids or list(range(self._shard_count))
 
-        self._loop = get_event_loop()
+        self._lazy_payloads = lazy_payloads
+        self._session_store = session_store
+        self._stall_timeout = stall_timeout
+
+        self._stream_threshold = stream_threshold
+        self._stream_batch_size = stream_batch_size
+
+        self._decoder = decoder or http.decoder
+
+        self._loop = loop or get_event_loop()
+
+        self._threads: List[ShardThread] = []
+        self.shards = self._create_shards(self._shard_ids, shard_threads)
+
+        self._listeners: Dict[str, ListenerIndex] = defaultdict(ListenerIndex)
+
+        self._partitioner = (
+            EventPartitioner(workers, worker_queue_size, self._loop)
+            if workers
+            else None
+        )
+
+        self._shedding = shedding
+        self._backlog = defaultdict(int)
+
+        self._waiters = WaiterIndex()
+
+        self.chunker = MemberChunker(self)
+
+        self._event_buses: List["EventBusServer"] = []
+
+        self._identify_scheduler: Optional[IdentifyScheduler] = identify_scheduler
+
+    def _create_shards(self, shard_ids: List[int], threads: int = None) -> List[Shard]:
+        if not threads:
+            return [Shard(id, self, self._loop) for id in shard_ids]
 
-        self.shards = [Shard(id, self) for id in self._shard_ids]
+        self._threads = [ShardThread(i) for i in range(min(threads, len(shard_ids)))]
+        shards = []
 
-        self._listeners = defaultdict(list)
+        for thread in self._threads:
+            thread.start()
+
+        for i, id in enumerate(shard_ids):
+            thread = self._threads[i % len(self._threads)]
+            shards.append(thread.call(Shard, id, self, thread.loop, thread.session))
+
+        return shards
+
+    def add_listener(
+        self,
+        event: str,
+        listener: Coroutine,
+        *,
+        max_concurrency: int = None,
+        queue_size: int = 0,
+        overflow: OverflowPolicy = "block",
+        guild_id: int = None,
+        channel_id: int = None,
+        author_id: int = None,
+    ) -> Listener:
+        """Add a listener for a gateway event.
+
+        :param event: The name of the event to listen for.
+        :type event: str
+        :param listener: The coroutine function to call with each event.
+        :type listener: Coroutine
+        :param max_concurrency: The maximum number of concurrent calls, defaults to None (unbounded)
+        :type max_concurrency: int, optional
+        :param queue_size: The maximum number of events waiting for a free slot, defaults to 0 (unbounded)
+        :type queue_size: int, optional
+        :param overflow: What to do with events when the queue is full, defaults to "block"
+        :type overflow: OverflowPolicy, optional
+        :param guild_id: Only receive events from this guild, defaults to None
+        :type guild_id: int, optional
+        :param channel_id: Only receive events from this channel, defaults to None
+        :type channel_id: int, optional
+        :param author_id: Only receive events from this author or user, defaults to None
+        :type author_id: int, optional
+        :return: The registered listener.
+        :rtype: Listener
+        """
+
+        filters = {
+            name: value
+            for name, value in (
+                ("guild_id", guild_id),
+                ("channel_id", channel_id),
+                ("author_id", author_id),
+            )
+            if value is not None
+        }
+
+        wrapped = Listener(
+            listener, max_concurrency, queue_size, overflow, self._loop, filters
+        )
+        self._listeners[event.upper()].add(wrapped)
+
+        return wrapped
+
+    async def wait_for(
+        self,
+        event: str,
+        *,
+        check: Check = None,
+        timeout: float = None,
+        channel_id: int = None,
+        user_id: int = None,
+    ) -> Mapping[str, Any]:
+        """Wait for a single gateway event.
+
+        The event counts towards :meth:`required_intents` from then on, but intents are
+        chosen when the client starts, so events only waited for afterwards should be
+        passed to :meth:`consume` beforehand to keep the intents which deliver them.
+
+        :param event: The name of the event to wait for.
+        :type event: str
+        :param check: A predicate the event must pass, defaults to None
+        :type check: Check, optional
+        :param timeout: How long to wait before raising TimeoutError, defaults to None
+        :type timeout: float, optional
+        :param channel_id: Only match events from this channel, defaults to None
+        :type channel_id: int, optional
+        :param user_id: Only match events from this author or user, defaults to None
+        :type user_id: int, optional
+        :return: The matching event.
+        :rtype: Mapping[str, Any]
+        """
 
-    def add_listener(self, event: str, listener: Coroutine) -> None:
-        self._listeners[event.upper()].append(listener)
+        name = event.upper()
+        filters = {}
+
+        self._consumed.add(name)
+
+        if channel_id is not None:
+            filters["channel_id"] = channel_id
+        if user_id is not None:
+            filters["author_id"] = user_id
+
+        waiter = Waiter(self._loop.create_future(), check, filters)
+        self._waiters.add(name, waiter)
+
+        try:
+            return await wait_for(waiter.future, timeout)
+        finally:
+            self._waiters.remove(name, waiter)
+
+    async def update_presence(
+        self, presence: dict, shard_ids: Iterable[int] = None
+    ) -> None:
+        """Update the bot's presence, coalescing updates which are still waiting to be sent.
+
+        :param presence: The presence, as sent in a PRESENCE_UPDATE.
+        :type presence: dict
+        :param shard_ids: The shards to update the presence on, defaults to every shard
+        :type shard_ids: Iterable[int], optional
+        """
+
+        selected = None if shard_ids is None else set(shard_ids)
+
+        for shard in self.shards:
+            if selected is None or shard.id in selected:
+                await shard.update_presence(presence)
+
+    def consume(self, *events: str) -> None:
+        """Mark events as used without a listener, so their intents are kept.
+
+        :param events: The names of the events.
+        :type events: str
+        """
+
+        self._consumed.update(event.upper() for event in events)
+
+    def _consumed_events(self) -> Set[str]:
+        listened = {
+            name
+            for name, index in self._listeners.items()
+            if next(iter(index), None) is not None
+        }
+
+        return listened | self._consumed
+
+    def required_intents(self) -> GatewayIntents:
+        """Get the intents needed for the events listened for, waited for or consumed so far.
+
+        :return: Every intent which delivers one of the events.
+        :rtype: GatewayIntents
+        """
+
+        return required_intents(self._consumed_events())
+
+    def _advise_intents(self) -> None:
+        events = self._consumed_events()
+        required = required_intents(events)
+
+        if unused := self._intents & ~required:
+            if self._auto_intents:
+                logger.info(f"Leaving out unused intents: {intent_names(unused)}")
+                self._intents &= required
+            else:
+                warn(
+                    f"These intents only deliver events nothing listens for: {intent_names(unused)}. "
+                    "Pass auto_intents=True to leave them out."
+                )
+
+        for event in sorted(events):
+            needed = EVENT_INTENTS.get(event, 0) & ~GatewayIntents.MESSAGE_CONTENT
+
+            if needed and not self._intents & needed:
+                warn(
+                    f"{event} is listened for, but needs one of these intents: {intent_names(needed)}"
+                )
 
     async def panic(self, code) -> None:
         raise SystemExit(f"Shard error code: {code}")
 
+    def partition_metrics(self) -> List[dict]:
+        """Get the backlog and latency statistics of each worker partition.
+
+        :return: The statistics of each worker, empty when partitions are not in use.
+        :rtype: List[dict]
+        """
+
+        if not self._partitioner:
+            return []
+
+        return self._partitioner.metrics()
+
+    def metrics(self) -> dict:
+        """Take a snapshot of the gateway's shard, partition and shedding statistics.
+
+        :return: Each shard's health, traffic, timings and send queue wait times,
+            alongside the worker partition statistics and shed event counts.
+        :rtype: dict
+        """
+
+        return {
+            "shards": {
+                shard.id: {
+                    **shard.health(),
+                    **shard.metrics.to_dict(),
+                    "send_wait": shard.send_wait_times(),
+                }
+                for shard in self.shards
+            },
+            "partitions": self.partition_metrics(),
+            "shed": self.shed_counts(),
+        }
+
+    def health(self) -> Dict[int, dict]:
+        """Get the connection state and health of each shard.
+
+        :return: The health of each shard, keyed by shard ID.
+        :rtype: Dict[int, dict]
+        """
+
+        return {shard.id: shard.health() for shard in self.shards}
+
+    def send_wait_times(self) -> Dict[int, dict]:
+        """Get how long sends have waited in each shard's send queue, by priority.
+
+        :return: The send queue wait time statistics, keyed by shard ID.
+        :rtype: Dict[int, dict]
+        """
+
+        return {shard.id: shard.send_wait_times() for shard in self.shards}
+
+    def backlog(self, shard_id: int) -> int:
+        """Get the number of events from a shard which are still being processed.
+
+        :param shard_id: The ID of the shard.
+        :type shard_id: int
+        :return: The shard's event backlog.
+        :rtype: int
+        """
+
+        return self._backlog[shard_id]
+
+    def shed_counts(self) -> Dict[str, int]:
+        """Get the number of events shed under backpressure, by event name.
+
+        :return: The shed event counts.
+        :rtype: Dict[str, int]
+        """
+
+        if not self._shedding:
+            return {}
+
+        return dict(self._shedding.shed)
+
+    def _track(self, shard: Shard, pending: int) -> Callable[..., None]:
+        self._backlog[shard.id] += 1
+
+        def done(*_) -> None:
+            nonlocal pending
+            pending -= 1
+
+            if pending <= 0:
+                self._backlog[shard.id] -= 1
+
+        return done
+
     async def start(self) -> None:
+        if self._partitioner:
+            self._partitioner.start()
+
         gw = await gateway.get_gateway_bot(self._http)
-        limit = gw["session_start_limit"]
+        self._gateway_url = gw["url"]
 
-        limiter = Ratelimiter(limit["max_concurrency"], 5)
+        if not self._identify_scheduler:
+            self._identify_scheduler = IdentifyScheduler.from_gateway(
+                gw["session_start_limit"], self._loop
+            )
 
         if not self.shards:
-            self.shards = [Shard(id, self) for id in range(gw["shards"])]
+            self.shards = self._create_shards(list(range(gw["shards"])))
 
+        # Shards resuming a stored session don't wait for a turn to identify.
         for shard in self.shards:
-            await limiter.wait()
-            self._loop.create_task(shard.connect())
+            await shard.restore_session()
+
+        self._identify_scheduler.register(
+            shard.id for shard in self.shards if not shard._session
+        )
+
+        self._advise_intents()
+
+        for shard in self.shards:
+            if shard._loop is self._loop:
+                self._loop.create_task(shard.connect())
+            else:
+                run_coroutine_threadsafe(shard.connect(), shard._loop)
+
+    def expected_ready_in(self) -> float:
+        """Estimate how long until every shard has been allowed to identify.
+
+        :return: The estimated time in seconds, 0 if the client has not started.
+        :rtype: float
+        """
+
+        if not self._identify_scheduler:
+            return 0.0
+
+        return self._identify_scheduler.expected_ready_in()
+
+    async def close(self) -> None:
+        """Close every shard and wait for in-flight events to be processed."""
+
+        for shard in self.shards:
+            await shard.close(keep_session=self._session_store is not None)
+
+        if self._session_store:
+            await self._session_store.flush()
+
+        for thread in self._threads:
+            await thread.stop()
+
+        if self._partitioner:
+            await self._partitioner.close()
+
+        for listeners in list(self._listeners.values()):
+            for listener in listeners:
+                await listener.drain()
 
     async def dispatch(self, shard: Shard, direction: str, event: dict) -> None:
         name = event.get("t") or f"OP_{event['op']}"
 
-        all_listeners = [
-            *self._listeners[name],
-            *(
+        if (
+            self._shedding
+            and direction == "inbound"
+            and event.get("op") == GatewayOps.DISPATCH
+            and self._shedding.should_shed(name, self._backlog[shard.id])
+        ):
+            return
+
+        if direction == "inbound":
+            for bus in self._event_buses:
+                await bus.publish(shard, event)
+
+        indexes = (
+            self._listeners[name],
+            (
                 self._listeners["GATEWAY_SEND"]
                 if direction == "outbound"
                 else self._listeners["GATEWAY_RECEIVE"]
             ),
-            *self._listeners["*"],
+            self._listeners["*"],
+        )
+
+        if direction == "inbound" and name == "GUILD_MEMBERS_CHUNK":
+            self.chunker.feed(event["d"])
+
+        keys = None
+
+        if direction == "inbound" and self._waiters.pending(name):
+            keys = routing_keys(event)
+            self._waiters.resolve(name, keys, event)
+
+        if keys is None and any(index.indexed for index in indexes):
+            keys = routing_keys(event)
+
+        all_listeners = [
+            listener for index in indexes for listener in index.match(keys)
         ]
 
+        if not all_listeners:
+            return
+
+        if self._partitioner:
+            done = self._track(shard, 1)
+            await self._partitioner.put(shard, event, all_listeners, done)
+            return
+
+        done = self._track(shard, len(all_listeners))
+
         for listener in all_listeners:
-            self._loop.create_task(listener(shard, event))
+            await listener.submit(shard, event, done)
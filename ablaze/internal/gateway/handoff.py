@@ -0,0 +1,315 @@
+from asyncio import (
+    StreamReader,
+    StreamWriter,
+    Task,
+    TimeoutError,
+    get_event_loop,
+    open_unix_connection,
+    run_coroutine_threadsafe,
+    start_unix_server,
+    wait_for,
+)
+from json import dumps, loads
+from logging import getLogger
+from typing import Any, Dict, List, Mapping, Optional
+
+import ablaze
+
+from .constants import GatewayOps
+from .supervisor import ShardState
+
+logger = getLogger("ablaze.gateway")
+
+
+def _encode(frame: dict) -> bytes:
+    return dumps(frame, separators=(",", ":")).encode() + b"\n"
+
+
+class HandoffServer:
+    def __init__(self, gateway: "ablaze.GatewayClient", path: str) -> None:
+        """Hands this process' shards over to a new process without an event gap.
+
+        The new process is given each shard's session to resume. This process keeps
+        dispatching until the new shard is live, then stops and reports the last
+        sequence it dispatched so the new process can skip duplicates. Once a shard's
+        session is given out it no longer reconnects, as resuming the session again
+        would disconnect the new process, unless the new process goes away first.
+
+        :param gateway: The gateway client whose shards can be handed off.
+        :type gateway: ablaze.GatewayClient
+        :param path: The path of the unix socket to listen on.
+        :type path: str
+        """
+
+        self.gateway = gateway
+        self.path = path
+
+        self._server = None
+
+    async def start(self) -> None:
+        """Start accepting handoff requests."""
+
+        self._server = await start_unix_server(self._handle, self.path)
+
+    async def close(self) -> None:
+        """Stop accepting handoff requests."""
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _find_shard(self, shard_id: int) -> Optional["ablaze.Shard"]:
+        for shard in self.gateway.shards:
+            if shard.id == shard_id:
+                return shard
+
+        return None
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        # Shards whose session was given out on this connection, but not yet stopped.
+        handing_off: List["ablaze.Shard"] = []
+
+        try:
+            while line := await reader.readline():
+                request = loads(line)
+                shard = self._find_shard(request["shard_id"])
+
+                if request["op"] == "request":
+                    if shard and shard._session:
+                        shard._handing_off = True
+                        handing_off.append(shard)
+
+                    writer.write(
+                        _encode(
+                            {
+                                "op": "session",
+                                "shard_id": request["shard_id"],
+                                "session_id": shard and shard._session,
+                                "seq": shard and shard._seq,
+                                "resume_url": shard and shard._resume_url,
+                            }
+                        )
+                    )
+                elif request["op"] == "live":
+                    seq = None
+                    session_id = None
+
+                    if shard:
+                        seq, session_id = await self._stop_shard(shard)
+
+                        if shard in handing_off:
+                            handing_off.remove(shard)
+
+                    writer.write(
+                        _encode(
+                            {
+                                "op": "stopped",
+                                "shard_id": request["shard_id"],
+                                "session_id": session_id,
+                                "seq": seq,
+                            }
+                        )
+                    )
+
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Handoff connection failed: {e!r}")
+        finally:
+            writer.close()
+
+            for shard in handing_off:
+                self._cancel_handoff(shard)
+
+    def _cancel_handoff(self, shard: "ablaze.Shard") -> None:
+        # The new process went away before going live, so this process keeps the shard.
+        shard._handing_off = False
+
+        if shard.state is not ShardState.CLOSED or shard._handed_off:
+            return
+
+        logger.warning(f"Handoff of shard {shard.id} was abandoned, reconnecting")
+
+        if shard._loop is self.gateway._loop:
+            self.gateway._loop.create_task(shard.connect())
+        else:
+            run_coroutine_threadsafe(shard.connect(), shard._loop)
+
+    async def _stop_shard(self, shard: "ablaze.Shard") -> tuple:
+        shard._handed_off = True
+
+        seq, session_id = shard._dispatched_seq, shard._session
+
+        await shard.close(keep_session=True)
+
+        return seq, session_id
+
+
+class _PendingHandoff:
+    def __init__(self, session_id: Optional[str]) -> None:
+        self.session_id = session_id
+        self.held: List[Mapping[str, Any]] = []
+        self.live = False
+
+
+class HandoffClient:
+    def __init__(
+        self, gateway: "ablaze.GatewayClient", path: str, max_held: int = 10000
+    ) -> None:
+        """Takes over shards from an old process running a :class:`HandoffServer`.
+
+        Events are held back while the old process is still dispatching them. A shard
+        holding more than ``max_held`` events stops waiting for the old process, and
+        dispatches them without skipping duplicates.
+
+        :param gateway: The gateway client taking over the shards.
+        :type gateway: ablaze.GatewayClient
+        :param path: The path of the old process' handoff socket.
+        :type path: str
+        :param max_held: The most events held back for each shard, defaults to 10000
+        :type max_held: int, optional
+        """
+
+        self.gateway = gateway
+        self.path = path
+        self.max_held = max_held
+
+        self._pending: Dict[int, _PendingHandoff] = {}
+        self._writer: Optional[StreamWriter] = None
+        self._reader_task: Optional[Task] = None
+
+    async def prepare(self, timeout: float = 10) -> bool:
+        """Fetch the old process' sessions, call this before starting the gateway.
+
+        Shards without a session to resume identify as normal, and are still only
+        dispatched once the old process has stopped dispatching for them.
+
+        :param timeout: How long to wait for the old process, defaults to 10
+        :type timeout: float, optional
+        :return: Whether the old process could be reached.
+        :rtype: bool
+        """
+
+        try:
+            reader, self._writer = await wait_for(
+                open_unix_connection(self.path), timeout
+            )
+        except (ConnectionError, FileNotFoundError, TimeoutError):
+            logger.warning("Could not reach the old process, starting without handoff")
+            return False
+
+        try:
+            for shard in self.gateway.shards:
+                self._writer.write(_encode({"op": "request", "shard_id": shard.id}))
+                await self._writer.drain()
+
+                if not (line := await wait_for(reader.readline(), timeout)):
+                    raise ConnectionError("The old process closed the connection.")
+
+                session = loads(line)
+
+                if session["session_id"]:
+                    shard._session = session["session_id"]
+                    shard._seq = session["seq"]
+                    shard._resume_url = session["resume_url"]
+                    shard._restored = True
+
+                self._pending[shard.id] = _PendingHandoff(session["session_id"])
+                shard._handoff = self
+        except (ConnectionError, TimeoutError, ValueError) as e:
+            logger.warning(f"Handoff failed, starting without it: {e!r}")
+            self._abort()
+            return False
+
+        self._reader_task = get_event_loop().create_task(self._read(reader))
+
+        return True
+
+    def _abort(self) -> None:
+        # The old process keeps its sessions once this connection closes.
+        for shard_id, pending in self._pending.items():
+            if (shard := self._find_shard(shard_id)) is None:
+                continue
+
+            shard._handoff = None
+
+            if pending.session_id:
+                shard._session = shard._seq = shard._resume_url = None
+                shard._restored = False
+
+        self._pending.clear()
+        self._writer.close()  # type: ignore
+
+    async def handle(self, shard: "ablaze.Shard", data: Mapping[str, Any]) -> None:
+        """Receive an event for a shard which is still being handed off.
+
+        :param shard: The shard the event came from.
+        :type shard: ablaze.Shard
+        :param data: The event.
+        :type data: Mapping[str, Any]
+        """
+
+        pending = self._pending.get(shard.id)
+
+        if pending is None or data["op"] != GatewayOps.DISPATCH:
+            await shard._forward(data)
+            return
+
+        pending.held.append(data)
+
+        if not pending.live and data["t"] in ("READY", "RESUMED"):
+            pending.live = True
+
+            self._writer.write(_encode({"op": "live", "shard_id": shard.id}))  # type: ignore
+            await self._writer.drain()  # type: ignore
+
+        if len(pending.held) > self.max_held:
+            logger.warning(
+                f"Shard {shard.id} held {len(pending.held)} events for the old process, dispatching them"
+            )
+
+            await self._flush({"shard_id": shard.id, "session_id": None, "seq": None})
+
+    async def _read(self, reader: StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                reply = loads(line)
+
+                if reply["op"] == "stopped":
+                    await self._flush(reply)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Lost the connection to the old process: {e!r}")
+
+        # The old process is gone, nothing else can be deduplicated.
+        for shard_id in list(self._pending):
+            await self._flush({"shard_id": shard_id, "session_id": None, "seq": None})
+
+    async def _flush(self, reply: dict) -> None:
+        pending = self._pending.get(reply["shard_id"])
+        shard = self._find_shard(reply["shard_id"])
+
+        if pending is None or shard is None:
+            return
+
+        stopped_seq = reply["seq"]
+        same_session = stopped_seq is not None and reply["session_id"] == shard._session
+
+        while pending.held:
+            data = pending.held.pop(0)
+
+            if same_session and data.get("s") and data["s"] <= stopped_seq:
+                continue
+
+            await shard._forward(data)
+
+        del self._pending[shard.id]
+        shard._handoff = None
+
+        if not self._pending and self._writer:
+            self._writer.close()
+
+    def _find_shard(self, shard_id: int) -> Optional["ablaze.Shard"]:
+        for shard in self.gateway.shards:
+            if shard.id == shard_id:
+                return shard
+
+        return None
@@ -0,0 +1,162 @@
+from asyncio import AbstractEventLoop, Lock, get_event_loop, sleep
+from time import monotonic
+from typing import Dict, Iterable, Optional, Set
+
+IDENTIFY_INTERVAL = 5
+
+
+class IdentifyScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        remaining: int,
+        reset_after: float,
+        total: int,
+        loop: Optional[AbstractEventLoop] = None,
+    ) -> None:
+        """Schedules shard identifies within Discord's session start limits.
+
+        Shards are grouped into buckets by ``shard_id % max_concurrency``. Every bucket
+        may identify once every 5 seconds, and all buckets run in parallel.
+
+        :param max_concurrency: The number of identify buckets.
+        :type max_concurrency: int
+        :param remaining: The number of session starts left in the current window.
+        :type remaining: int
+        :param reset_after: How long until the session start window resets, in milliseconds.
+        :type reset_after: float
+        :param total: The number of session starts available in each window.
+        :type total: int
+        :param loop: The event loop to use, defaults to None
+        :type loop: AbstractEventLoop, optional
+        """
+
+        self.max_concurrency = max(max_concurrency, 1)
+        self.remaining = remaining
+        self.total = total
+
+        self._loop = loop or get_event_loop()
+        self._reset_at = monotonic() + reset_after / 1000
+
+        self._locks: Dict[int, Lock] = {}
+        self._next: Dict[int, float] = {}
+        self._pending: Set[int] = set()
+
+    @classmethod
+    def from_gateway(
+        cls, session_start_limit: dict, loop: Optional[AbstractEventLoop] = None
+    ) -> "IdentifyScheduler":
+        """Create a scheduler from the session start limit of ``GET /gateway/bot``."""
+
+        return cls(
+            session_start_limit["max_concurrency"],
+            session_start_limit["remaining"],
+            session_start_limit["reset_after"],
+            session_start_limit["total"],
+            loop,
+        )
+
+    def bucket(self, shard_id: int) -> int:
+        """Get the identify bucket of a shard."""
+
+        return shard_id % self.max_concurrency
+
+    def register(self, shard_ids: Iterable[int]) -> None:
+        """Mark shards as waiting to identify, for estimating startup time."""
+
+        self._pending.update(shard_ids)
+
+    def discard(self, shard_id: int) -> None:
+        """Stop waiting for a shard which resumes its session instead of identifying."""
+
+        self._pending.discard(shard_id)
+
+    async def _reserve_session(self) -> None:
+        while True:
+            now = monotonic()
+
+            if now >= self._reset_at:
+                self.remaining = self.total
+                self._reset_at = now + 24 * 60 * 60
+
+            if self.remaining > 0:
+                self.remaining -= 1
+                return
+
+            await sleep(self._reset_at - now)
+
+    async def acquire(self, shard_id: int) -> None:
+        """Wait until a shard is allowed to identify.
+
+        :param shard_id: The ID of the shard about to identify.
+        :type shard_id: int
+        """
+
+        bucket = self.bucket(shard_id)
+        lock = self._locks.setdefault(bucket, Lock())
+
+        async with lock:
+            await self._reserve_session()
+
+            delay = self._next.get(bucket, 0) - monotonic()
+
+            if delay > 0:
+                await sleep(delay)
+
+            self._next[bucket] = monotonic() + IDENTIFY_INTERVAL
+
+        self._pending.discard(shard_id)
+
+    def expected_turn_in(self, shard_id: int) -> float:
+        """Estimate how long until a shard is allowed to identify.
+
+        Shards waiting in the same bucket are assumed to go in order of their IDs.
+
+        :param shard_id: The shard's ID.
+        :type shard_id: int
+        :return: The estimated time in seconds.
+        :rtype: float
+        """
+
+        bucket = self.bucket(shard_id)
+        ahead = sum(
+            1
+            # Copied first, shard threads may call this while the set changes.
+            for other in list(self._pending)
+            if other < shard_id and self.bucket(other) == bucket
+        )
+
+        return (
+            max(self._next.get(bucket, 0) - monotonic(), 0) + ahead * IDENTIFY_INTERVAL
+        )
+
+    def expected_ready_in(self, shard_ids: Optional[Iterable[int]] = None) -> float:
+        """Estimate how long until shards have all been allowed to identify.
+
+        :param shard_ids: The shards to estimate for, defaults to every registered shard still waiting
+        :type shard_ids: Iterable[int], optional
+        :return: The estimated time in seconds.
+        :rtype: float
+        """
+
+        shard_ids = self._pending if shard_ids is None else set(shard_ids)
+
+        if not shard_ids:
+            return 0.0
+
+        now = monotonic()
+        counts: Dict[int, int] = {}
+
+        for shard_id in shard_ids:
+            bucket = self.bucket(shard_id)
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+        estimate = max(
+            max(self._next.get(bucket, 0) - now, 0) + (count - 1) * IDENTIFY_INTERVAL
+            for bucket, count in counts.items()
+        )
+
+        if len(shard_ids) > self.remaining:
+            estimate = max(estimate, self._reset_at - now)
+
+        return estimate
@@ -0,0 +1,120 @@
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, Tuple
+
+from .constants import GatewayIntents as Intents
+
+# Listeners for these receive every event, so no intent can be left out for them.
+WILDCARD_EVENTS = frozenset(("*", "GATEWAY_RECEIVE"))
+
+_MESSAGES = Intents.GUILD_MESSAGES | Intents.DIRECT_MESSAGES
+
+# Message content is not an event of its own, it fills in the content of messages.
+_MESSAGE_CONTENT = _MESSAGES | Intents.MESSAGE_CONTENT
+
+_EVENTS: Tuple[Tuple[Intents, Tuple[str, ...]], ...] = (
+    (
+        Intents.GUILDS,
+        (
+            "GUILD_CREATE",
+            "GUILD_UPDATE",
+            "GUILD_DELETE",
+            "GUILD_ROLE_CREATE",
+            "GUILD_ROLE_UPDATE",
+            "GUILD_ROLE_DELETE",
+            "CHANNEL_CREATE",
+            "CHANNEL_UPDATE",
+            "CHANNEL_DELETE",
+            "CHANNEL_PINS_UPDATE",
+            "THREAD_CREATE",
+            "THREAD_UPDATE",
+            "THREAD_DELETE",
+            "THREAD_LIST_SYNC",
+            "THREAD_MEMBER_UPDATE",
+            "THREAD_MEMBERS_UPDATE",
+            "STAGE_INSTANCE_CREATE",
+            "STAGE_INSTANCE_UPDATE",
+            "STAGE_INSTANCE_DELETE",
+        ),
+    ),
+    (
+        Intents.GUILD_MEMBERS,
+        (
+            "GUILD_MEMBER_ADD",
+            "GUILD_MEMBER_UPDATE",
+            "GUILD_MEMBER_REMOVE",
+            "GUILD_MEMBERS_CHUNK",
+        ),
+    ),
+    (Intents.GUILD_BANS, ("GUILD_BAN_ADD", "GUILD_BAN_REMOVE")),
+    (
+        Intents.GUILD_EMOJIS_AND_STICKERS,
+        ("GUILD_EMOJIS_UPDATE", "GUILD_STICKERS_UPDATE"),
+    ),
+    (
+        Intents.GUILD_INTEGRATIONS,
+        (
+            "GUILD_INTEGRATIONS_UPDATE",
+            "INTEGRATION_CREATE",
+            "INTEGRATION_UPDATE",
+            "INTEGRATION_DELETE",
+        ),
+    ),
+    (Intents.GUILD_WEBHOOKS, ("WEBHOOKS_UPDATE",)),
+    (Intents.GUILD_INVITES, ("INVITE_CREATE", "INVITE_DELETE")),
+    (Intents.GUILD_VOICE_STATES, ("VOICE_STATE_UPDATE",)),
+    (Intents.GUILD_PRESENCES, ("PRESENCE_UPDATE",)),
+    (_MESSAGE_CONTENT, ("MESSAGE_CREATE", "MESSAGE_UPDATE")),
+    (_MESSAGES, ("MESSAGE_DELETE", "CHANNEL_PINS_UPDATE")),
+    (Intents.GUILD_MESSAGES, ("MESSAGE_DELETE_BULK",)),
+    (
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS,
+        (
+            "MESSAGE_REACTION_ADD",
+            "MESSAGE_REACTION_REMOVE",
+            "MESSAGE_REACTION_REMOVE_ALL",
+            "MESSAGE_REACTION_REMOVE_EMOJI",
+        ),
+    ),
+    (
+        Intents.GUILD_MESSAGE_TYPING | Intents.DIRECT_MESSAGE_TYPING,
+        ("TYPING_START",),
+    ),
+    (
+        Intents.GUILD_SCHEDULED_EVENTS,
+        (
+            "GUILD_SCHEDULED_EVENT_CREATE",
+            "GUILD_SCHEDULED_EVENT_UPDATE",
+            "GUILD_SCHEDULED_EVENT_DELETE",
+            "GUILD_SCHEDULED_EVENT_USER_ADD",
+            "GUILD_SCHEDULED_EVENT_USER_REMOVE",
+        ),
+    ),
+)
+
+# The intents which deliver each event. Events missing from here need no intents.
+EVENT_INTENTS: Dict[str, Intents] = {}
+
+for _intents, _names in _EVENTS:
+    for _name in _names:
+        EVENT_INTENTS[_name] = EVENT_INTENTS.get(_name, Intents(0)) | _intents
+
+ALL_INTENTS = reduce(or_, Intents)
+
+
+def required_intents(events: Iterable[str]) -> Intents:
+    """Get every intent which delivers at least one of the events."""
+
+    required = Intents(0)
+
+    for event in events:
+        if event in WILDCARD_EVENTS:
+            return ALL_INTENTS
+
+        required |= EVENT_INTENTS.get(event, Intents(0))
+
+    return required
+
+
+def intent_names(intents: int) -> str:
+    return ", ".join(intent.name for intent in Intents if intent & intents)  # type: ignore
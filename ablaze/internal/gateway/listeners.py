@@ -0,0 +1,233 @@
+from asyncio import AbstractEventLoop, Event, Task, gather, get_event_loop
+from collections import defaultdict, deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import ablaze
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest"]
+
+_Done = Optional[Callable[[], None]]
+
+# Ordered from most to least selective, listeners are indexed by the first one they set.
+FILTER_KEYS = ("author_id", "channel_id", "guild_id")
+
+
+def routing_keys(event: Mapping[str, Any]) -> Dict[str, int]:
+    """Get the guild, channel and author IDs of an event, where it has them."""
+
+    data = event.get("d")
+    keys = {}
+
+    if not isinstance(data, Mapping):
+        return keys
+
+    if guild_id := data.get("guild_id"):
+        keys["guild_id"] = int(guild_id)
+
+    if channel_id := data.get("channel_id"):
+        keys["channel_id"] = int(channel_id)
+
+    author = data.get("author")
+
+    if isinstance(author, Mapping) and author.get("id"):
+        keys["author_id"] = int(author["id"])
+    elif user_id := data.get("user_id"):
+        keys["author_id"] = int(user_id)
+
+    return keys
+
+
+class Listener:
+    def __init__(
+        self,
+        callback: Callable,
+        max_concurrency: int = None,
+        queue_size: int = 0,
+        overflow: OverflowPolicy = "block",
+        loop: Optional[AbstractEventLoop] = None,
+        filters: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """A gateway event listener with bounded concurrency.
+
+        :param callback: The coroutine function to call with each event.
+        :type callback: Callable
+        :param max_concurrency: The maximum number of concurrent calls, defaults to None (unbounded)
+        :type max_concurrency: int, optional
+        :param queue_size: The maximum number of events waiting for a free slot, defaults to 0 (unbounded)
+        :type queue_size: int, optional
+        :param overflow: What to do with events when the queue is full, defaults to "block"
+        :type overflow: OverflowPolicy, optional
+        :param loop: The event loop to run calls on, defaults to None
+        :type loop: AbstractEventLoop, optional
+        :param filters: The guild, channel or author IDs events must match, defaults to None
+        :type filters: Dict[str, int], optional
+        """
+
+        if overflow not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+
+        self.callback = callback
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.filters = filters or {}
+
+        self._loop = loop or get_event_loop()
+
+        self.tasks: Set[Task] = set()
+        self.dropped = 0
+
+        self._queue: Deque[Tuple["ablaze.Shard", Mapping[str, Any], _Done]] = deque()
+        self._space = Event()
+
+    def __repr__(self) -> str:
+        return f"<Listener callback={self.callback!r} running={len(self.tasks)} queued={len(self._queue)}>"
+
+    async def __call__(self, shard: "ablaze.Shard", event: Mapping[str, Any]) -> None:
+        await self.callback(shard, event)
+
+    def matches(self, keys: Mapping[str, int]) -> bool:
+        """Check whether an event's routing keys match this listener's filters."""
+
+        return all(keys.get(name) == value for name, value in self.filters.items())
+
+    @property
+    def queued(self) -> int:
+        """The number of events waiting for a free slot."""
+
+        return len(self._queue)
+
+    def _full(self) -> bool:
+        return bool(self.queue_size) and len(self._queue) >= self.queue_size
+
+    async def submit(
+        self,
+        shard: "ablaze.Shard",
+        event: Mapping[str, Any],
+        done: _Done = None,
+    ) -> None:
+        """Run the listener for an event, or queue it if the listener is busy.
+
+        :param shard: The shard the event belongs to.
+        :type shard: ablaze.Shard
+        :param event: The event to pass to the listener.
+        :type event: Mapping[str, Any]
+        :param done: A function to call once the event is handled or dropped, defaults to None
+        :type done: Callable[[], None], optional
+        """
+
+        if self.max_concurrency is None or len(self.tasks) < self.max_concurrency:
+            self._run(shard, event, done)
+            return
+
+        if self._full():
+            if self.overflow == "drop_newest":
+                self._drop(done)
+                return
+
+            if self.overflow == "drop_oldest":
+                *_, oldest_done = self._queue.popleft()
+                self._drop(oldest_done)
+            else:
+                while self._full():
+                    self._space.clear()
+                    await self._space.wait()
+
+                if len(self.tasks) < self.max_concurrency:
+                    self._run(shard, event, done)
+                    return
+
+        self._queue.append((shard, event, done))
+
+    def _drop(self, done: _Done) -> None:
+        self.dropped += 1
+
+        if done:
+            done()
+
+    def _run(
+        self, shard: "ablaze.Shard", event: Mapping[str, Any], done: _Done
+    ) -> None:
+        task = self._loop.create_task(self.callback(shard, event))
+        self.tasks.add(task)
+
+        def finished(task: Task) -> None:
+            self.tasks.discard(task)
+
+            if done:
+                done()
+
+            if self._queue and (
+                self.max_concurrency is None or len(self.tasks) < self.max_concurrency
+            ):
+                self._run(*self._queue.popleft())
+                self._space.set()
+
+        task.add_done_callback(finished)
+
+    async def drain(self) -> None:
+        """Wait for every running and queued call of this listener to finish."""
+
+        while self.tasks:
+            await gather(*self.tasks, return_exceptions=True)
+
+
+class ListenerIndex:
+    def __init__(self) -> None:
+        """The listeners for a single event, indexed by their filters."""
+
+        self.unfiltered: List[Listener] = []
+        self.indexed: Dict[Tuple[str, int], List[Listener]] = defaultdict(list)
+
+    def __iter__(self) -> Iterator[Listener]:
+        yield from self.unfiltered
+
+        for listeners in self.indexed.values():
+            yield from listeners
+
+    def add(self, listener: Listener) -> None:
+        """Add a listener to the index.
+
+        :param listener: The listener to add.
+        :type listener: Listener
+        """
+
+        for name in FILTER_KEYS:
+            if name in listener.filters:
+                self.indexed[(name, listener.filters[name])].append(listener)
+                return
+
+        self.unfiltered.append(listener)
+
+    def match(self, keys: Optional[Mapping[str, int]]) -> List[Listener]:
+        """Get the listeners which should receive an event.
+
+        :param keys: The routing keys of the event, if there are filtered listeners.
+        :type keys: Mapping[str, int], optional
+        :return: The matching listeners.
+        :rtype: List[Listener]
+        """
+
+        if not keys or not self.indexed:
+            return self.unfiltered
+
+        matched = list(self.unfiltered)
+
+        for name, value in keys.items():
+            for listener in self.indexed.get((name, value), ()):
+                if listener.matches(keys):
+                    matched.append(listener)
+
+        return matched
@@ -0,0 +1,128 @@
+from bisect import bisect_left
+from collections import Counter, deque
+from time import monotonic
+from typing import Deque, Dict, List, Sequence, Tuple
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LatencyHistogram:
+    def __init__(
+        self, window: int = 100, buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        """A histogram of the most recent latency samples.
+
+        :param window: The number of recent samples to keep, defaults to 100
+        :type window: int, optional
+        :param buckets: The upper bounds of each bucket, defaults to LATENCY_BUCKETS
+        :type buckets: Sequence[float], optional
+        """
+
+        self.buckets = tuple(buckets)
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, value: float) -> None:
+        self.samples.append(value)
+
+    def percentile(self, percent: float) -> float:
+        return self._percentile(sorted(self.samples), percent)
+
+    @staticmethod
+    def _percentile(ordered: List[float], percent: float) -> float:
+        if not ordered:
+            return 0.0
+
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def to_dict(self) -> dict:
+        # Shards on other threads keep recording, so work from a copy of the samples.
+        ordered = sorted(self.samples)
+        counts = [0] * (len(self.buckets) + 1)
+
+        for sample in ordered:
+            counts[bisect_left(self.buckets, sample)] += 1
+
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+
+        return {
+            "count": len(ordered),
+            "p50": self._percentile(ordered, 50),
+            "p90": self._percentile(ordered, 90),
+            "p99": self._percentile(ordered, 99),
+            "max": ordered[-1] if ordered else 0.0,
+            "buckets": dict(zip(labels, counts)),
+        }
+
+
+class EventRate:
+    def __init__(self, window: int = 60) -> None:
+        """Counts events by name over a rolling window of whole seconds.
+
+        :param window: The length of the window in seconds, defaults to 60
+        :type window: int, optional
+        """
+
+        self.window = window
+        self._seconds: Deque[Tuple[int, Counter]] = deque()
+
+    def record(self, name: str) -> None:
+        now = int(monotonic())
+
+        if not self._seconds or self._seconds[-1][0] != now:
+            self._seconds.append((now, Counter()))
+            self._prune(now)
+
+        self._seconds[-1][1][name] += 1
+
+    def _prune(self, now: int) -> None:
+        while self._seconds and self._seconds[0][0] <= now - self.window:
+            self._seconds.popleft()
+
+    def per_second(self) -> Dict[str, float]:
+        # Shards on other threads keep recording, so only read copies of the counts,
+        # and leave pruning to record.
+        now = int(monotonic())
+        totals: Counter = Counter()
+
+        for second, counts in list(self._seconds):
+            if second > now - self.window:
+                totals.update(dict(counts))
+
+        return {name: count / self.window for name, count in totals.items()}
+
+
+class ShardMetrics:
+    def __init__(self) -> None:
+        """Connection, traffic and timing statistics for a single shard."""
+
+        self.latency = LatencyHistogram()
+        self.events = EventRate()
+
+        self.counters = {"reconnects": 0, "resumes": 0, "identifies": 0}
+
+        # Frames are counted as decoded text, not as the bytes sent over the socket.
+        self.chars_in = 0
+        self.chars_out = 0
+
+        self.decode_time = 0.0
+        self.dispatch_time = 0.0
+        self.frames = 0
+
+    def frame(self, size: int, decode_time: float, dispatch_time: float) -> None:
+        self.frames += 1
+        self.chars_in += size
+        self.decode_time += decode_time
+        self.dispatch_time += dispatch_time
+
+    def to_dict(self) -> dict:
+        return {
+            "latency_histogram": self.latency.to_dict(),
+            "events_per_second": self.events.per_second(),
+            **self.counters,
+            "frames": self.frames,
+            "chars_in": self.chars_in,
+            "chars_out": self.chars_out,
+            "decode_time": self.decode_time,
+            "dispatch_time": self.dispatch_time,
+        }
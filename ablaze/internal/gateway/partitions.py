@@ -0,0 +1,163 @@
+from asyncio import AbstractEventLoop, Queue, Task, get_event_loop
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Callable, List, Mapping, Optional, Sequence
+
+import ablaze
+
+logger = getLogger("ablaze.gateway")
+
+
+def partition_key(shard: "ablaze.Shard", event: Mapping[str, Any]) -> int:
+    """Get the key used to order an event, from its guild ID or channel ID for DMs.
+
+    Events which belong to neither fall back to the ID of the shard they came from.
+    """
+
+    data = event.get("d")
+
+    if isinstance(data, Mapping):
+        key = data.get("guild_id") or data.get("channel_id")
+
+        if key:
+            # The low 22 bits of a snowflake hold Discord's worker and process IDs,
+            # shared by many snowflakes, and an increment which is usually zero. The
+            # timestamp above them is what spreads keys evenly across partitions.
+            return int(key) >> 22
+
+    return shard.id
+
+
+class WorkerStats:
+    def __init__(self) -> None:
+        """Latency and throughput statistics for a single partition worker."""
+
+        self.processed = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        if not self.processed:
+            return 0.0
+
+        return self.total_latency / self.processed
+
+    def record(self, latency: float) -> None:
+        self.processed += 1
+        self.last_latency = latency
+        self.total_latency += latency
+
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+
+class EventPartitioner:
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int = 0,
+        loop: Optional[AbstractEventLoop] = None,
+    ) -> None:
+        """Process events in order per guild, with guilds spread across workers.
+
+        :param workers: The number of worker queues to use.
+        :type workers: int
+        :param queue_size: The maximum backlog of each worker, defaults to 0 (unbounded)
+        :type queue_size: int, optional
+        :param loop: The event loop to run the workers on, defaults to None
+        :type loop: AbstractEventLoop, optional
+        """
+
+        if workers < 1:
+            raise ValueError("An event partitioner needs at least one worker.")
+
+        self._loop = loop or get_event_loop()
+
+        self.queues: List[Queue] = [Queue(queue_size) for _ in range(workers)]
+        self.stats = [WorkerStats() for _ in range(workers)]
+
+        self._tasks: List[Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks if they are not already running."""
+
+        if self._tasks:
+            return
+
+        self._tasks = [
+            self._loop.create_task(self._worker(queue, stats))
+            for queue, stats in zip(self.queues, self.stats)
+        ]
+
+    async def close(self) -> None:
+        """Wait for every queued event to be processed, then stop the workers."""
+
+        for queue in self.queues:
+            await queue.join()
+
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+
+    def partition(self, shard: "ablaze.Shard", event: Mapping[str, Any]) -> int:
+        """Get the index of the worker an event is processed by."""
+
+        return partition_key(shard, event) % len(self.queues)
+
+    async def put(
+        self,
+        shard: "ablaze.Shard",
+        event: Mapping[str, Any],
+        listeners: Sequence[Callable],
+        callback: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Queue an event to be passed to its listeners in order.
+
+        :param shard: The shard the event belongs to.
+        :type shard: ablaze.Shard
+        :param event: The event to process.
+        :type event: Mapping[str, Any]
+        :param listeners: The listeners to call, one after another.
+        :type listeners: Sequence[Callable]
+        :param callback: A function to call once the event is processed, defaults to None
+        :type callback: Callable[[], None], optional
+        """
+
+        queue = self.queues[self.partition(shard, event)]
+
+        await queue.put((perf_counter(), shard, event, listeners, callback))
+
+    async def _worker(self, queue: Queue, stats: WorkerStats) -> None:
+        while True:
+            queued_at, shard, event, listeners, callback = await queue.get()
+
+            for listener in listeners:
+                try:
+                    await listener(shard, event)
+                except Exception:
+                    logger.exception(f"Error in listener {listener!r}")
+
+            stats.record(perf_counter() - queued_at)
+
+            if callback:
+                callback()
+
+            queue.task_done()
+
+    def metrics(self) -> List[dict]:
+        """Get the backlog and latency statistics of every worker."""
+
+        return [
+            {
+                "worker": index,
+                "backlog": queue.qsize(),
+                "processed": stats.processed,
+                "last_latency": stats.last_latency,
+                "mean_latency": stats.mean_latency,
+                "max_latency": stats.max_latency,
+            }
+            for index, (queue, stats) in enumerate(zip(self.queues, self.stats))
+        ]
@@ -0,0 +1,104 @@
+from json import JSONDecoder, loads
+from re import compile
+from typing import Any, Iterator, Mapping, Optional
+
+_DECODER = JSONDecoder()
+
+# Discord sends the envelope fields before the event data, so in almost all cases the
+# header can be read without touching the (potentially huge) event data at all.
+_HEADER = compile(
+    r'\{\s*"t"\s*:\s*(null|"[A-Z0-9_]*")\s*,'
+    r'\s*"s"\s*:\s*(null|\d+)\s*,'
+    r'\s*"op"\s*:\s*(\d+)\s*,'
+    r'\s*"d"\s*:\s*'
+)
+_KEYS = ("t", "s", "op", "d")
+
+
+class LazyPayload(Mapping[str, Any]):
+    __slots__ = ("_raw", "_t", "_s", "_op", "_offset", "_payload")
+
+    def __init__(self, raw: str) -> None:
+        """A gateway payload which only decodes its event data when it is accessed.
+
+        The envelope fields (``t``, ``s`` and ``op``) are read straight from the
+        frame, and ``d`` is decoded the first time it is looked up. Only this top level
+        decode is deferred: ``d`` is decoded whole, nested objects included, as the
+        standard library decoder can't skip over a value without decoding it.
+
+        Anything that reads ``d`` decodes it, including indexed listener filters,
+        worker partitions, event buses and the entity cache, so this only saves time
+        for events whose data nothing reads.
+
+        :param raw: The raw text of the gateway frame.
+        :type raw: str
+        """
+
+        self._raw = raw
+        self._payload: Optional[dict] = None
+
+        header = _HEADER.match(raw)
+
+        if header is None:
+            self._payload = loads(raw)
+            return
+
+        t, s, op = header.groups()
+
+        self._t = None if t == "null" else t[1:-1]
+        self._s = None if s == "null" else int(s)
+        self._op = int(op)
+        self._offset = header.end()
+
+    def __repr__(self) -> str:
+        return f"<LazyPayload t={self.get('t')} op={self.get('op')} decoded={self.decoded}>"
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the event data has been decoded yet."""
+
+        return self._payload is not None
+
+    def _decode(self) -> dict:
+        if self._payload is not None:
+            return self._payload
+
+        data, end = _DECODER.raw_decode(self._raw, self._offset)
+
+        if self._raw[end:].strip() == "}":
+            self._payload = {"t": self._t, "s": self._s, "op": self._op, "d": data}
+        else:
+            # There are fields after the event data, fall back to a full decode.
+            self._payload = loads(self._raw)
+
+        self._raw = None
+        return self._payload
+
+    def __getitem__(self, key: str) -> Any:
+        if self._payload is None:
+            if key == "t":
+                return self._t
+            if key == "s":
+                return self._s
+            if key == "op":
+                return self._op
+
+        return self._decode()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._payload is None:
+            return iter(_KEYS)
+
+        return iter(self._payload)
+
+    def __len__(self) -> int:
+        if self._payload is None:
+            return len(_KEYS)
+
+        return len(self._payload)
+
+    def __contains__(self, key: object) -> bool:
+        if self._payload is None and key in _KEYS:
+            return True
+
+        return key in self._decode()
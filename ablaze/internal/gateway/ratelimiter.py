@@ -1,18 +1,34 @@
-from asyncio import Semaphore, get_event_loop
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Future,
+    Semaphore,
+    TimerHandle,
+    get_event_loop,
+)
+from enum import IntEnum
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
 
 
 class Ratelimiter:
-    def __init__(self, rate: int, per: int) -> None:
+    def __init__(
+        self, rate: int, per: int, loop: Optional[AbstractEventLoop] = None
+    ) -> None:
         """A gateway send ratelimiter.
 
         :param rate: The rate at which requests can be made.
         :type rate: int
         :param per: How often the bucket is refilled.
         :type per: int
+        :param loop: The event loop to use, defaults to None
+        :type loop: AbstractEventLoop, optional
         """
 
         self.per = per
-        self.loop = get_event_loop()
+        self.loop = loop or get_event_loop()
 
         self.lock = Semaphore(rate)
 
@@ -20,3 +36,157 @@ class Ratelimiter:
         await self.lock.acquire()
 
         self.loop.call_later(self.per, self.lock.release)
+
+
+class SendPriority(IntEnum):
+    CRITICAL = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class WaitStats:
+    def __init__(self) -> None:
+        """Time spent waiting in the send queue for a single priority."""
+
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total += wait
+        self.last = wait
+
+        if wait > self.max:
+            self.max = wait
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "last": self.last,
+            "max": self.max,
+        }
+
+
+class PriorityRatelimiter:
+    def __init__(
+        self,
+        rate: int,
+        per: int,
+        reserved: int = 5,
+        loop: Optional[AbstractEventLoop] = None,
+    ) -> None:
+        """A gateway send ratelimiter which lets critical sends jump the queue.
+
+        The last ``reserved`` slots of every window can only be used by critical sends,
+        such as heartbeats and resumes, so other sends can never starve them. Low
+        priority sends leave twice as many slots free, for normal sends to burst into.
+
+        :param rate: The rate at which requests can be made.
+        :type rate: int
+        :param per: How often the bucket is refilled.
+        :type per: int
+        :param reserved: The number of slots reserved for critical sends, defaults to 5
+        :type reserved: int, optional
+        :param loop: The event loop to use, defaults to None
+        :type loop: AbstractEventLoop, optional
+        :raises ValueError: The rate leaves no slots for low priority sends.
+        """
+
+        if rate <= reserved * 2:
+            raise ValueError(
+                f"A rate of {rate} leaves no slots for low priority sends, it must be over {reserved * 2}."
+            )
+
+        self.per = per
+        self.reserved = reserved
+        self.loop = loop or get_event_loop()
+
+        self.tokens = rate
+
+        self._waiters: List[Tuple[int, int, Future, float]] = []
+        self._counter = count()
+
+        self.stats = {priority: WaitStats() for priority in SendPriority}
+
+    @property
+    def queued(self) -> int:
+        """The number of sends waiting for a slot."""
+
+        return sum(1 for *_, future, _ in self._waiters if not future.done())
+
+    def _allowed(self, priority: int) -> bool:
+        if priority == SendPriority.CRITICAL:
+            return self.tokens > 0
+        if priority == SendPriority.LOW:
+            return self.tokens > self.reserved * 2
+
+        return self.tokens > self.reserved
+
+    def _take(self) -> TimerHandle:
+        self.tokens -= 1
+        return self.loop.call_later(self.per, self._release)
+
+    def _release(self) -> None:
+        self.tokens += 1
+        self._wake()
+
+    def _prune(self) -> None:
+        # Cancelled sends stay queued until they reach the front.
+        while self._waiters and self._waiters[0][2].done():
+            heappop(self._waiters)
+
+    def _wake(self) -> None:
+        while True:
+            self._prune()
+
+            if not self._waiters:
+                return
+
+            priority, _, future, queued_at = self._waiters[0]
+
+            if not self._allowed(priority):
+                return
+
+            heappop(self._waiters)
+
+            self.stats[SendPriority(priority)].record(monotonic() - queued_at)
+            future.set_result(self._take())
+
+    async def wait(self, priority: SendPriority = SendPriority.NORMAL) -> None:
+        """Wait for a slot to send in.
+
+        :param priority: The priority of the send, defaults to SendPriority.NORMAL
+        :type priority: SendPriority, optional
+        """
+
+        self._prune()
+        ahead = self._waiters and self._waiters[0][0] <= priority
+
+        if not ahead and self._allowed(priority):
+            self._take()
+            self.stats[priority].record(0.0)
+            return
+
+        future = self.loop.create_future()
+        heappush(self._waiters, (priority, next(self._counter), future, monotonic()))
+
+        try:
+            await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                # The send was given a slot it won't use, so hand the slot on.
+                future.result().cancel()
+                self._release()
+
+            raise
+
+    def wait_times(self) -> Dict[str, dict]:
+        """Get the send queue wait time statistics of each priority."""
+
+        return {
+            priority.name.lower(): stats.to_dict()
+            for priority, stats in self.stats.items()
+        }
@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+from asyncio import Lock, Task, current_task, get_running_loop, sleep
+from dataclasses import asdict, dataclass
+from json import dumps, loads
+from logging import getLogger
+from os import getpid, replace
+from os.path import exists
+from time import monotonic
+from typing import Dict, Optional
+
+import aiofiles
+
+try:
+    from fcntl import LOCK_EX, flock
+except ImportError:
+    flock = None  # type: ignore
+
+logger = getLogger("ablaze.gateway")
+
+
+@dataclass
+class SessionState:
+    """The state needed to resume a shard's gateway session."""
+
+    session_id: str
+    seq: Optional[int]
+    resume_url: Optional[str]
+
+
+class SessionStore(ABC):
+    """A store for shard sessions, so they can be resumed after a restart."""
+
+    @abstractmethod
+    async def get(self, shard_id: int) -> Optional[SessionState]:
+        ...
+
+    @abstractmethod
+    async def set(self, shard_id: int, state: SessionState) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, shard_id: int) -> None:
+        ...
+
+    async def flush(self) -> None:
+        """Persist any changes which are still waiting to be written."""
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self) -> None:
+        """A session store which only lives as long as the process."""
+
+        self._sessions: Dict[int, SessionState] = {}
+
+    async def get(self, shard_id: int) -> Optional[SessionState]:
+        return self._sessions.get(shard_id)
+
+    async def set(self, shard_id: int, state: SessionState) -> None:
+        self._sessions[shard_id] = state
+
+    async def delete(self, shard_id: int) -> None:
+        self._sessions.pop(shard_id, None)
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, path: str, interval: float = 5) -> None:
+        """A session store which persists sessions to a JSON file.
+
+        Sessions are saved after every event, so the file is written at most once per
+        interval, with the latest state of every changed session. A session whose
+        sequence number is a little behind can still be resumed.
+
+        Each write re-reads the file and only replaces the sessions which changed, under
+        a lock on POSIX systems, so processes running different shards can share a file.
+
+        :param path: The path of the file to store sessions in.
+        :type path: str
+        :param interval: The shortest time between writes, in seconds, defaults to 5
+        :type interval: float, optional
+        """
+
+        self.path = path
+        self.interval = interval
+
+        self._sessions: Optional[Dict[int, SessionState]] = None
+        self._lock = Lock()
+
+        # Sessions changed since the last write, None for deleted sessions.
+        self._changes: Dict[int, Optional[SessionState]] = {}
+        self._saved_at = float("-inf")
+        self._flush_task: Optional[Task] = None
+
+    async def _load(self) -> Dict[int, SessionState]:
+        if self._sessions is not None:
+            return self._sessions
+
+        self._sessions = {}
+
+        if exists(self.path):
+            async with aiofiles.open(self.path) as f:
+                data = loads(await f.read() or "{}")
+
+            self._sessions = {
+                int(shard_id): SessionState(**state) for shard_id, state in data.items()
+            }
+
+        return self._sessions
+
+    def _merge(self, changes: Dict[int, Optional[SessionState]]) -> None:
+        # Blocking, the file lock has to be waited for in a thread anyway.
+        with open(self.path + ".lock", "a") as lock:
+            if flock is not None:
+                # Released when the lock file is closed.
+                flock(lock.fileno(), LOCK_EX)
+
+            data = {}
+
+            if exists(self.path):
+                with open(self.path) as f:
+                    data = loads(f.read() or "{}")
+
+            for shard_id, state in changes.items():
+                if state is None:
+                    data.pop(str(shard_id), None)
+                else:
+                    data[str(shard_id)] = asdict(state)
+
+            tmp = f"{self.path}.{getpid()}.tmp"
+
+            with open(tmp, "w") as f:
+                f.write(dumps(data))
+
+            replace(tmp, self.path)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await sleep(self._saved_at + self.interval - monotonic())
+
+        try:
+            await self.flush()
+        except OSError as e:
+            logger.error(f"Could not save sessions to {self.path}: {e!r}")
+
+    async def flush(self) -> None:
+        if self._flush_task is not None and self._flush_task is not current_task():
+            self._flush_task.cancel()
+
+        async with self._lock:
+            if not self._changes:
+                return
+
+            changes, self._changes = self._changes, {}
+            self._saved_at = monotonic()
+
+            try:
+                await get_running_loop().run_in_executor(None, self._merge, changes)
+            except BaseException:
+                # Keep the changes, unless newer ones replaced them in the meantime.
+                self._changes = {**changes, **self._changes}
+                raise
+
+    async def get(self, shard_id: int) -> Optional[SessionState]:
+        async with self._lock:
+            return (await self._load()).get(shard_id)
+
+    async def set(self, shard_id: int, state: SessionState) -> None:
+        async with self._lock:
+            (await self._load())[shard_id] = state
+            self._changes[shard_id] = state
+
+        self._schedule_flush()
+
+    async def delete(self, shard_id: int) -> None:
+        async with self._lock:
+            if (await self._load()).pop(shard_id, None):
+                self._changes[shard_id] = None
+                self._schedule_flush()
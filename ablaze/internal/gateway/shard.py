@@ -1,119 +1,378 @@
-from asyncio import Task, get_event_loop, sleep
+from asyncio import (
+    AbstractEventLoop,
+    Task,
+    TimeoutError,
+    current_task,
+    get_event_loop,
+    get_running_loop,
+    sleep,
+)
+from json import dumps
+from logging import getLogger
 from sys import platform
-from time import time
-from typing import Optional
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Awaitable, Mapping, Optional, TypeVar
 
-from aiohttp import WSMessage, WSMsgType
+from aiohttp import ClientError, ClientSession, WSCloseCode, WSMessage, WSMsgType
 
 import ablaze
 from ablaze.internal.http.resources import gateway
 
 from .constants import GatewayCloseCodes as CloseCodes
 from .constants import GatewayOps
-from .ratelimiter import Ratelimiter
+from .metrics import ShardMetrics
+from .payload import LazyPayload
+from .ratelimiter import PriorityRatelimiter, SendPriority
+from .sessions import SessionState
+from .streaming import GuildCreateStream
+from .supervisor import Backoff, ShardState
+from .threads import run_on
+
+if TYPE_CHECKING:
+    from .handoff import HandoffClient
+
+_T = TypeVar("_T")
+
+logger = getLogger("ablaze.gateway")
+
+# How long before a shard's identify slot to open a connection to the gateway host.
+PREWARM_LEAD = 2
 
 
 class Shard:
-    def __init__(self, id: int, parent: "ablaze.GatewayClient") -> None:
+    def __init__(
+        self,
+        id: int,
+        parent: "ablaze.GatewayClient",
+        loop: Optional[AbstractEventLoop] = None,
+        ws_session: Optional[ClientSession] = None,
+    ) -> None:
         """A single gateway shard to receive and send events.
 
         :param id: The shard's ID.
         :type id: int
         :param parent: The shard's parent gateway client.
         :type parent: ablaze.GatewayClient
-        :param loop: The even loop to use.
-        :type loop: AbstractEventLoop
+        :param loop: The event loop to use, defaults to None
+        :type loop: AbstractEventLoop, optional
+        :param ws_session: The session to open the websocket with, defaults to the HTTP client's session
+        :type ws_session: ClientSession, optional
         """
 
         self.id = id
         self._parent = parent
-        self._loop = get_event_loop()
+        self._loop = loop or get_event_loop()
+        self._ws_session = ws_session
 
         self._url = None
+        self._resume_url = None
         self._ws = None
 
         self._session = None
         self._seq = None
-        self._ws_seq = None
+        self._restored = False
+
+        self._dispatched_seq = None
+        self._handoff: Optional["HandoffClient"] = None
+        self._handed_off = False
+        # Set once the session has been given to another process, which resumes it.
+        self._handing_off = False
+
+        self.state = ShardState.CONNECTING
+        self._backoff = Backoff()
 
         self._heartbeat_task = None
         self._last_heartbeat_send = None
         self._recieved_ack = True
+        self._last_ack: Optional[float] = None
+        self._last_event: Optional[float] = None
         self.latency = None
 
+        self.metrics = ShardMetrics()
+
         self._pacemaker: Optional[Task] = None
 
-        self._send_limiter = Ratelimiter(120, 60)
+        self._send_limiter = PriorityRatelimiter(120, 60, loop=self._loop)
+
+        self.presence: Optional[dict] = None
+        self._presence_pending = False
+        self._presence_task: Optional[Task] = None
 
     def __repr__(self) -> str:
         return f"<Shard id={self.id} seq={self._seq}>"
 
+    async def _gateway_url(self) -> str:
+        if not self._url:
+            # Shared from the parent's GET /gateway/bot, so shards don't each fetch it.
+            self._url = (
+                self._parent._gateway_url
+                or (await self._call_parent(gateway.get_gateway(self._parent._http)))[
+                    "url"
+                ]
+            )
+
+        return self._url  # type: ignore
+
     async def spawn_ws(self) -> None:
         """Spawn the websocket connection to the gateway."""
 
-        if not self._url:
-            self._url = (await gateway.get_gateway(self._parent._http))["url"]
+        url = await self._gateway_url()
 
-        self._ws = await self._parent._http.spawn_ws(self._url)
+        if self._session and self._resume_url:
+            url = self._resume_url
 
-    async def connect(self) -> None:
-        """Create a connection to the Discord gateway."""
+        self._ws = await self._parent._http.spawn_ws(url, self._ws_session)
 
-        while True:
-            await self.spawn_ws()
+    async def _prewarm(self, delay: float) -> None:
+        """Warm DNS and TLS to the gateway host shortly before the shard's identify slot."""
 
-            if self._session:
-                await self.resume()
+        await sleep(max(delay - PREWARM_LEAD, 0))
+
+        try:
+            await self._parent._http.prewarm(
+                await self._gateway_url(), self._ws_session
+            )
+        except (ClientError, OSError, TimeoutError) as e:
+            logger.debug(f"Shard {self.id} could not prewarm its connection: {e!r}")
+
+    async def _call_parent(self, coro: Awaitable[_T]) -> _T:
+        """Await a coroutine on the parent's event loop, which may be another thread's."""
+
+        return await run_on(self._parent._loop, coro)
+
+    async def restore_session(self) -> None:
+        """Load a previous session from the session store, so it can be resumed."""
+
+        self._restored = True
+        store = self._parent._session_store
+
+        if not store or self._session:
+            return
+
+        if state := await self._call_parent(store.get(self.id)):
+            self._session = state.session_id
+            self._seq = state.seq
+            self._resume_url = state.resume_url
+
+    async def save_session(self) -> None:
+        """Persist the current session to the session store."""
+
+        store = self._parent._session_store
+
+        # Once handed off, the session belongs to the process that took it over.
+        if not store or self._handed_off or self._handing_off:
+            return
 
-            await self.start_reader()
+        if self._session:
+            state = SessionState(self._session, self._seq, self._resume_url)
+            await self._call_parent(store.set(self.id, state))
+        else:
+            await self._call_parent(store.delete(self.id))
+
+    async def invalidate_session(self) -> None:
+        """Forget the current session, so the next connection identifies."""
+
+        self._session = None
+        self._seq = None
+        self._resume_url = None
 
-    async def close(self) -> None:
-        """Gracefully close the connection."""
+        await self.save_session()
 
+    async def connect(self) -> None:
+        """Create a connection to the Discord gateway, reconnecting until closed."""
+
+        if not self._restored:
+            await self.restore_session()
+
+        while self.state is not ShardState.CLOSED:
+            self.state = ShardState.CONNECTING
+            scheduler = self._parent._identify_scheduler
+
+            try:
+                if not self._session and scheduler:
+                    prewarm = self._loop.create_task(
+                        self._prewarm(scheduler.expected_turn_in(self.id))
+                    )
+
+                    try:
+                        await self._call_parent(scheduler.acquire(self.id))
+                    finally:
+                        prewarm.cancel()
+                elif scheduler:
+                    # Resuming doesn't wait for a turn, so don't hold up the estimates.
+                    scheduler.discard(self.id)
+
+                await self.spawn_ws()
+                await self.start_reader()
+            except (ClientError, OSError, TimeoutError) as e:
+                logger.warning(f"Shard {self.id} lost its connection: {e!r}")
+                await self._disconnect()
+
+            if self.state is ShardState.CLOSED:
+                return
+
+            if self._handing_off:
+                # Another process resumed the session, reconnecting would kick it off.
+                logger.info(f"Shard {self.id} was taken over by another process")
+                self.state = ShardState.CLOSED
+                return
+
+            # Jittered backoff keeps an outage from turning into a reconnect storm.
+            self.state = ShardState.BACKOFF
+            self.metrics.counters["reconnects"] += 1
+            await sleep(self._backoff.next())
+
+    async def close(self, keep_session: bool = False) -> None:
+        """Gracefully close the connection for good.
+        Args:
+            keep_session (bool): Whether the session should stay resumable by another connection.
+        """
+
+        if get_running_loop() is not self._loop:
+            return await run_on(self._loop, self.close(keep_session))
+
+        self.state = ShardState.CLOSED
         self.failed_heartbeats = 0
 
+        await self.save_session()
+        await self._disconnect(keep_session)
+
+    async def _disconnect(self, keep_session: bool = True) -> None:
+        """Close the websocket, letting `connect` reconnect unless the shard is closed."""
+
+        # Discord invalidates the session when closing with a normal close code.
+        code = CloseCodes.UNKNOWN_ERROR if keep_session else WSCloseCode.OK
+
         if self._ws and not self._ws.closed:
-            await self._ws.close()
+            await self._ws.close(code=code)
 
-        if self._pacemaker and not self._pacemaker.cancelled():
+        if self._pacemaker and self._pacemaker is not current_task():
             self._pacemaker.cancel()
 
-    async def send(self, data: dict) -> None:
+    def health(self) -> dict:
+        """Get the shard's connection state and how recently it heard from the gateway."""
+
+        now = time()
+
+        return {
+            "state": self.state.value,
+            "latency": self.latency,
+            "seq": self._seq,
+            "since_ack": now - self._last_ack if self._last_ack else None,
+            "since_event": now - self._last_event if self._last_event else None,
+            "reconnect_attempts": self._backoff.attempts,
+        }
+
+    async def send(
+        self, data: dict, priority: SendPriority = SendPriority.NORMAL
+    ) -> None:
         """Send data to the gateway.
         Args:
             data (dict): The data to send.
+            priority (SendPriority): The priority of the send in the send queue.
         """
 
-        await self._send_limiter.wait()
+        if get_running_loop() is not self._loop:
+            return await run_on(self._loop, self.send(data, priority))
+
+        if not self._ws or self._ws.closed:
+            raise ConnectionError(f"Shard {self.id} is not connected.")
+
+        await self._send_limiter.wait(priority)
+        await self._send_now(data)
+
+    async def _send_now(self, data: dict) -> None:
+        """Send data which has already waited for the send ratelimiter."""
+
+        self._loop.create_task(
+            self._call_parent(self._parent.dispatch(self, "outbound", data))
+        )
+        payload = dumps(data)
+        self.metrics.chars_out += len(payload)
 
-        self._loop.create_task(self._parent.dispatch(self, "outbound", data))
         try:
-            await self._ws.send_json(data)  # type: ignore
+            await self._ws.send_str(payload)
         except ConnectionResetError:
-            exit(1)
+            logger.warning(f"Shard {self.id} could not send, reconnecting")
+            await self._disconnect()
+            raise
+
+    async def update_presence(self, presence: dict) -> None:
+        """Update the bot's presence on this shard.
+
+        Updates are sent at low priority, and an update made while another is still
+        waiting to be sent replaces it, so only the latest is sent.
+        Args:
+            presence (dict): The presence, as sent in a PRESENCE_UPDATE.
+        """
+
+        if get_running_loop() is not self._loop:
+            return await run_on(self._loop, self.update_presence(presence))
+
+        self.presence = presence
+        self._presence_pending = True
+
+        self._schedule_presence()
+
+    def _schedule_presence(self) -> None:
+        if self._presence_task is None or self._presence_task.done():
+            self._presence_task = self._loop.create_task(self._flush_presence())
+
+    async def _flush_presence(self) -> None:
+        # Updates made while a presence is being sent are flushed by this same task,
+        # since it is still running when they try to schedule it.
+        while self._presence_pending:
+            if self.state is not ShardState.READY:
+                # Sent once the shard is ready again, or as part of its next identify.
+                return
+
+            await self._send_limiter.wait(SendPriority.LOW)
+
+            if not self._presence_pending:
+                return
+
+            self._presence_pending = False
+
+            try:
+                await self._send_now(
+                    {"op": GatewayOps.PRESENCE_UPDATE, "d": self.presence}
+                )
+            except ConnectionError:
+                self._presence_pending = True
+                return
+
+    def send_wait_times(self) -> dict:
+        """Get how long sends have waited in this shard's send queue, by priority."""
+
+        return self._send_limiter.wait_times()
 
     async def identify(self) -> None:
         """Sends an identfy payload to the gateway."""
 
-        await self.send(
-            {
-                "op": GatewayOps.IDENTIFY,
-                "d": {
-                    "token": self._parent._http._token,
-                    "properties": {
-                        "$os": platform,
-                        "$browser": "Ablaze",
-                        "$device": "Ablaze",
-                    },
-                    "intents": self._parent._intents,
-                    "shard": [self.id, self._parent._shard_count],
-                },
-            }
-        )
+        self.metrics.counters["identifies"] += 1
+
+        d = {
+            "token": self._parent._http._token,
+            "properties": {
+                "$os": platform,
+                "$browser": "Ablaze",
+                "$device": "Ablaze",
+            },
+            "intents": self._parent._intents,
+            "shard": [self.id, self._parent._shard_count],
+        }
+
+        if self.presence is not None:
+            d["presence"] = self.presence
+            self._presence_pending = False
+
+        await self.send({"op": GatewayOps.IDENTIFY, "d": d}, SendPriority.CRITICAL)
 
     async def resume(self) -> None:
         """Resume an existing connection with the gateway."""
 
+        self.metrics.counters["resumes"] += 1
+
         await self.send(
             {
                 "op": GatewayOps.RESUME,
@@ -122,7 +381,8 @@ class Shard:
                     "session_id": self._session,
                     "seq": self._seq,
                 },
-            }
+            },
+            SendPriority.CRITICAL,
         )
 
     async def heartbeat(self) -> None:
@@ -130,30 +390,72 @@ class Shard:
 
         self._last_heartbeat_send = time()
 
-        await self.send({"op": GatewayOps.HEARTBEAT, "d": self._seq})
+        await self.send(
+            {"op": GatewayOps.HEARTBEAT, "d": self._seq}, SendPriority.CRITICAL
+        )
 
-        if self._seq:
-            self._seq += 1
-        else:
-            self._seq = 1
+        await self.save_session()
 
-    async def dispatch(self, data: dict) -> None:
+    async def dispatch(self, data: Mapping[str, Any]) -> None:
         """Dispatch events."""
 
-        await self._parent.dispatch(self, "inbound", data)
+        if self._handed_off:
+            return
+
+        if self._handoff:
+            await self._call_parent(self._handoff.handle(self, data))
+        else:
+            await self._forward(data)
 
         op = data["op"]
 
         if op == GatewayOps.HELLO:
+            self._recieved_ack = True
             self._pacemaker = self._loop.create_task(
                 self.start_pacemaker(data["d"]["heartbeat_interval"])
             )
-            await self.identify()
+
+            if self._session:
+                self.state = ShardState.RESUMING
+                await self.resume()
+            else:
+                self.state = ShardState.IDENTIFYING
+                await self.identify()
+        elif op == GatewayOps.DISPATCH and data["t"] == "READY":
+            self._session = data["d"]["session_id"]
+            self._resume_url = data["d"].get("resume_gateway_url")
+
+            self._mark_ready()
+            await self.save_session()
+        elif op == GatewayOps.DISPATCH and data["t"] == "RESUMED":
+            self._mark_ready()
+        elif op == GatewayOps.INVALID_SESSION:
+            if not data["d"]:
+                await self.invalidate_session()
+
+            await self._disconnect()
         elif op == GatewayOps.ACK:
-            self.latency = time() - self._last_heartbeat_send  # type: ignore
+            self._last_ack = time()
+            self.latency = self._last_ack - self._last_heartbeat_send  # type: ignore
+            self.metrics.latency.record(self.latency)
             self._recieved_ack = True
         elif op == GatewayOps.RECONNECT:
-            await self.close()
+            await self._disconnect()
+
+    def _mark_ready(self) -> None:
+        if self.state is not ShardState.CLOSED:
+            self.state = ShardState.READY
+
+        self._backoff.reset()
+
+        if self._presence_pending:
+            self._schedule_presence()
+
+    async def _forward(self, data: Mapping[str, Any]) -> None:
+        if s := data.get("s"):
+            self._dispatched_seq = s
+
+        await self._call_parent(self._parent.dispatch(self, "inbound", data))
 
     async def handle_disconnect(self, code: int) -> None:
         """Handle the gateway disconnecting correctly."""
@@ -165,21 +467,20 @@ class Shard:
             CloseCodes.INVALID_INTENTS,
             CloseCodes.DISALLOWED_INTENTS,
         ]:
-            await self._parent.panic(code)
+            self.state = ShardState.CLOSED
+            await self._call_parent(self._parent.panic(code))
 
         if code in [
             CloseCodes.INVALID_SEQ,
             CloseCodes.RATE_LIMITED,
             CloseCodes.SESSION_TIMEOUT,
         ]:
-            self._session = None
+            await self.invalidate_session()
 
             if code == CloseCodes.RATE_LIMITED:
                 self._url = None
 
-        self._seq = None
-
-        await self.close()
+        await self._disconnect()
 
     async def start_reader(self) -> None:
         """Start a loop constantly reading from the gateway."""
@@ -188,15 +489,88 @@ class Shard:
             message: WSMessage
 
             if message.type == WSMsgType.TEXT:
-                message_data = message.json()
+                if self._should_stream(message.data):
+                    await self._stream_guild_create(message.data)
+                    continue
+
+                started = perf_counter()
+                decoder = self._parent._decoder
+
+                # Frames are decoded one at a time, so offloading keeps them in order.
+                if self._parent._lazy_payloads and not decoder.offloads(message.data):
+                    message_data = LazyPayload(message.data)
+                else:
+                    message_data = await decoder.loads(message.data)
+
+                decoded = perf_counter()
 
-                if s := message_data.get("s"):
-                    self._ws_seq = s
+                await self._receive(message_data)
 
-                await self.dispatch(message_data)
+                self.metrics.frame(
+                    len(message.data), decoded - started, perf_counter() - decoded
+                )
 
         await self.handle_disconnect(self._ws.close_code)  # type: ignore
 
+    async def _receive(self, data: Mapping[str, Any]) -> None:
+        if s := data.get("s"):
+            self._seq = s
+            self._last_event = time()
+
+        if name := data.get("t"):
+            self.metrics.events.record(name)
+
+        await self.dispatch(data)
+
+    def _should_stream(self, raw: str) -> bool:
+        threshold = self._parent._stream_threshold
+
+        if not threshold or len(raw) <= threshold:
+            return False
+
+        return GuildCreateStream.matches(raw)
+
+    async def _stream_guild_create(self, raw: str) -> None:
+        """Dispatch an oversized GUILD_CREATE as GUILD_CREATE_CHUNK batches, then the rest of it."""
+
+        stream = GuildCreateStream(raw, self._parent._stream_batch_size)
+        batches = iter(stream)
+
+        decode_time = dispatch_time = 0.0
+
+        while True:
+            started = perf_counter()
+            batch = next(batches, None)
+            decoded = perf_counter()
+
+            decode_time += decoded - started
+
+            if batch is None:
+                break
+
+            key, items = batch
+
+            await self.dispatch(
+                {
+                    "op": GatewayOps.DISPATCH,
+                    "t": "GUILD_CREATE_CHUNK",
+                    "s": None,
+                    "d": {"guild_id": stream.guild_id, "type": key, "items": items},
+                }
+            )
+
+            dispatch_time += perf_counter() - decoded
+
+            # Let other shards and tasks run between batches.
+            await sleep(0)
+
+        started = perf_counter()
+        await self._receive(stream.payload)  # type: ignore
+
+        self.metrics.frame(
+            len(raw), decode_time, dispatch_time + perf_counter() - started
+        )
+
     async def start_pacemaker(self, delay: float) -> None:
         """A loop to constantly heartbeat at an interval given by the gateway."""
 
@@ -204,9 +578,27 @@ class Shard:
 
         while True:
             if not self._recieved_ack:
-                return await self.close()
+                logger.warning(f"Shard {self.id} missed a heartbeat ACK, reconnecting")
+                return await self._disconnect()
+
+            stall_timeout = self._parent._stall_timeout
+
+            if (
+                stall_timeout
+                and self.state is ShardState.READY
+                and self._last_event
+                and time() - self._last_event > stall_timeout
+            ):
+                logger.warning(
+                    f"Shard {self.id} received no events for {stall_timeout}s, reconnecting"
+                )
+                return await self._disconnect()
+
+            try:
+                await self.heartbeat()
+            except ConnectionError:
+                return
 
-            await self.heartbeat()
             self._recieved_ack = False
 
             await sleep(delay)
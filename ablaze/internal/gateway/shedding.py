@@ -0,0 +1,73 @@
+from collections import Counter
+from random import random
+from typing import Dict, Iterable, Optional
+
+DEFAULT_SHED_EVENTS = {
+    "TYPING_START": 0.0,
+    "PRESENCE_UPDATE": 0.0,
+}
+
+CRITICAL_EVENTS = frozenset(
+    {
+        "READY",
+        "RESUMED",
+        "GUILD_CREATE",
+        "GUILD_DELETE",
+        "MESSAGE_CREATE",
+        "INTERACTION_CREATE",
+    }
+)
+
+
+class SheddingPolicy:
+    def __init__(
+        self,
+        threshold: int = 1000,
+        events: Optional[Dict[str, float]] = None,
+        critical: Iterable[str] = (),
+    ) -> None:
+        """A policy deciding which low priority events to shed under backpressure.
+
+        Events are only shed while a shard's backlog is at or above the threshold.
+        Critical events are never shed, even when they are listed in ``events``.
+
+        :param threshold: The per-shard backlog at which shedding starts, defaults to 1000
+        :type threshold: int, optional
+        :param events: The fraction of each sheddable event to keep under backpressure, defaults to dropping all typing and presence updates
+        :type events: Dict[str, float], optional
+        :param critical: Extra event names that must never be shed, defaults to ()
+        :type critical: Iterable[str], optional
+        """
+
+        self.threshold = threshold
+        self.events = {
+            name.upper(): rate
+            for name, rate in (
+                DEFAULT_SHED_EVENTS if events is None else events
+            ).items()
+        }
+        self.critical = CRITICAL_EVENTS | {name.upper() for name in critical}
+
+        self.shed: Counter = Counter()
+
+    def should_shed(self, name: str, backlog: int) -> bool:
+        """Decide whether to shed an event, counting it if it is shed.
+
+        :param name: The name of the event.
+        :type name: str
+        :param backlog: The current backlog of the shard the event came from.
+        :type backlog: int
+        :return: Whether the event should be dropped.
+        :rtype: bool
+        """
+
+        if backlog < self.threshold or name in self.critical:
+            return False
+
+        rate = self.events.get(name)
+
+        if rate is None or random() < rate:
+            return False
+
+        self.shed[name] += 1
+        return True
@@ -0,0 +1,177 @@
+from json import JSONDecodeError, JSONDecoder
+from re import compile
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+from .payload import _HEADER
+
+_DECODER = JSONDecoder()
+_WHITESPACE = compile(r"[ \t\n\r]*")
+
+# The arrays of a GUILD_CREATE which grow with the size of the guild.
+STREAMED_KEYS = frozenset(
+    ("members", "presences", "channels", "threads", "voice_states")
+)
+
+
+class _Reader:
+    def __init__(self, raw: str, pos: int) -> None:
+        self.raw = raw
+        self.pos = pos
+
+    def _skip_whitespace(self) -> None:
+        self.pos = _WHITESPACE.match(self.raw, self.pos).end()  # type: ignore
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.raw[self.pos : self.pos + 1]
+
+    def take(self, char: str) -> bool:
+        if self.peek() != char:
+            return False
+
+        self.pos += 1
+        return True
+
+    def expect(self, char: str) -> None:
+        if not self.take(char):
+            raise JSONDecodeError(f"Expecting '{char}'", self.raw, self.pos)
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        value, self.pos = _DECODER.raw_decode(self.raw, self.pos)
+
+        return value
+
+    def keys(self) -> Iterator[str]:
+        """Iterate an object's keys, the caller reads each value before continuing."""
+
+        self.expect("{")
+
+        if self.take("}"):
+            return
+
+        while True:
+            key = self.value()
+            self.expect(":")
+
+            yield key
+
+            if self.take("}"):
+                return
+
+            self.expect(",")
+
+    def items(self) -> Iterator[Any]:
+        """Decode an array one item at a time."""
+
+        self.expect("[")
+
+        if self.take("]"):
+            return
+
+        while True:
+            yield self.value()
+
+            if self.take("]"):
+                return
+
+            self.expect(",")
+
+
+class GuildCreateStream:
+    def __init__(
+        self,
+        raw: str,
+        batch_size: int = 1000,
+        keys: Collection[str] = STREAMED_KEYS,
+    ) -> None:
+        """Decodes a GUILD_CREATE frame piecewise, so its largest arrays are never fully built.
+
+        Iterating yields ``(key, items)`` batches of each streamed array. Once iteration
+        is done, :attr:`payload` holds the rest of the frame, with the keys which were
+        streamed listed under ``"streamed"``.
+
+        :param raw: The raw text of the gateway frame.
+        :type raw: str
+        :param batch_size: The maximum number of items in each batch, defaults to 1000
+        :type batch_size: int, optional
+        :param keys: The arrays to stream, defaults to STREAMED_KEYS
+        :type keys: Collection[str], optional
+        :raises ValueError: The frame is not a GUILD_CREATE.
+        """
+
+        header = _HEADER.match(raw)
+
+        if header is None or header.group(1) != '"GUILD_CREATE"':
+            raise ValueError("Only GUILD_CREATE frames can be streamed.")
+
+        self.batch_size = batch_size
+        self.keys = keys
+
+        self.guild_id: Optional[str] = None
+        self.payload: Optional[Dict[str, Any]] = None
+
+        self._s = int(header.group(2)) if header.group(2) != "null" else None
+        self._op = int(header.group(3))
+        self._reader = _Reader(raw, header.end())
+
+    @staticmethod
+    def matches(raw: str) -> bool:
+        """Check whether a frame is a GUILD_CREATE which can be streamed."""
+
+        header = _HEADER.match(raw)
+        return header is not None and header.group(1) == '"GUILD_CREATE"'
+
+    def _batches(self, key: str) -> Iterator[Tuple[str, List[Any]]]:
+        batch = []
+
+        for item in self._reader.items():
+            batch.append(item)
+
+            if len(batch) >= self.batch_size:
+                yield key, batch
+                batch = []
+
+        if batch:
+            yield key, batch
+
+    def __iter__(self) -> Iterator[Tuple[str, List[Any]]]:
+        reader = self._reader
+
+        guild: Dict[str, Any] = {}
+        streamed = []
+        deferred = []
+
+        for key in reader.keys():
+            if key not in self.keys or reader.peek() != "[":
+                guild[key] = reader.value()
+
+                if key == "id":
+                    self.guild_id = guild[key]
+
+                continue
+
+            streamed.append(key)
+
+            if self.guild_id is not None:
+                yield from self._batches(key)
+                continue
+
+            # Batches are only useful with the guild's ID, so come back to this array
+            # once it has been read. Skipping still decodes one item at a time.
+            deferred.append((key, reader.pos))
+
+            for _ in reader.items():
+                pass
+
+        for key, pos in deferred:
+            reader.pos = pos
+            yield from self._batches(key)
+
+        self.payload = {
+            "t": "GUILD_CREATE",
+            "s": self._s,
+            "op": self._op,
+            "d": guild,
+            "streamed": streamed,
+        }
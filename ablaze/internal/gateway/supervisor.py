@@ -0,0 +1,40 @@
+from enum import Enum
+from random import uniform
+
+
+class ShardState(Enum):
+    CONNECTING = "connecting"
+    IDENTIFYING = "identifying"
+    RESUMING = "resuming"
+    READY = "ready"
+    BACKOFF = "backoff"
+    CLOSED = "closed"
+
+
+class Backoff:
+    def __init__(self, base: float = 1, maximum: float = 60) -> None:
+        """Exponential reconnect delays with full jitter, so shards don't reconnect in lockstep.
+
+        :param base: The upper bound of the first delay, defaults to 1
+        :type base: float, optional
+        :param maximum: The largest upper bound a delay can have, defaults to 60
+        :type maximum: float, optional
+        """
+
+        self.base = base
+        self.maximum = maximum
+
+        self.attempts = 0
+
+    def next(self) -> float:
+        """Get the next delay to wait, in seconds."""
+
+        delay = uniform(0, min(self.maximum, self.base * 2**self.attempts))
+        self.attempts += 1
+
+        return delay
+
+    def reset(self) -> None:
+        """Start again from the smallest delay, after a healthy connection."""
+
+        self.attempts = 0
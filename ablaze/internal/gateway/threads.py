@@ -0,0 +1,69 @@
+from asyncio import (
+    AbstractEventLoop,
+    get_running_loop,
+    new_event_loop,
+    run_coroutine_threadsafe,
+    set_event_loop,
+    wrap_future,
+)
+from threading import Event, Thread
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from aiohttp import ClientSession
+
+_T = TypeVar("_T")
+
+
+async def run_on(loop: AbstractEventLoop, coro: Awaitable[_T]) -> _T:
+    """Await a coroutine on a specific event loop, which may run in another thread."""
+
+    if get_running_loop() is loop:
+        return await coro
+
+    return await wrap_future(run_coroutine_threadsafe(coro, loop))  # type: ignore
+
+
+class ShardThread(Thread):
+    def __init__(self, index: int) -> None:
+        """A thread running its own event loop and websocket connector for a group of shards.
+
+        :param index: The index of the thread, used in its name.
+        :type index: int
+        """
+
+        super().__init__(name=f"ablaze-shards-{index}", daemon=True)
+
+        self.loop = new_event_loop()
+        self.session: Optional[ClientSession] = None
+
+        self._started = Event()
+
+    def run(self) -> None:
+        set_event_loop(self.loop)
+        self._started.set()
+
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        """Start the thread and create its websocket connector."""
+
+        super().start()
+        self._started.wait()
+
+        self.session = self.call(ClientSession)
+
+    def call(self, fn: Callable[..., _T], *args: Any) -> _T:
+        """Call a function on the thread's event loop and wait for its result."""
+
+        async def wrapper() -> _T:
+            return fn(*args)
+
+        return run_coroutine_threadsafe(wrapper(), self.loop).result()
+
+    async def stop(self) -> None:
+        """Close the thread's connector and stop its event loop."""
+
+        if self.session and not self.session.closed:
+            await run_on(self.loop, self.session.close())
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
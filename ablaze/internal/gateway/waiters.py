@@ -0,0 +1,142 @@
+from asyncio import Future
+from collections import defaultdict
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+Check = Callable[[Mapping[str, Any]], bool]
+
+# Waiters are indexed by the first of these they set, in order of selectivity.
+WAITER_KEYS = ("channel_id", "author_id")
+
+_Bucket = Optional[Tuple[str, int]]
+
+
+class Waiter:
+    __slots__ = ("future", "check", "filters", "bucket")
+
+    def __init__(
+        self, future: Future, check: Optional[Check], filters: Dict[str, int]
+    ) -> None:
+        """A pending wait for a single gateway event.
+
+        :param future: The future to resolve with the event.
+        :type future: Future
+        :param check: A predicate the event must pass, defaults to None
+        :type check: Check, optional
+        :param filters: The channel or author IDs the event must match.
+        :type filters: Dict[str, int]
+        """
+
+        self.future = future
+        self.check = check
+        self.filters = filters
+
+        self.bucket: _Bucket = None
+
+        for name in WAITER_KEYS:
+            if name in filters:
+                self.bucket = (name, filters[name])
+                break
+
+    def matches(self, keys: Mapping[str, int], event: Mapping[str, Any]) -> bool:
+        if any(keys.get(name) != value for name, value in self.filters.items()):
+            return False
+
+        return self.check is None or self.check(event)
+
+
+class WaiterIndex:
+    def __init__(self) -> None:
+        """Pending waiters indexed by event name and routing key."""
+
+        self._waiters: Dict[str, Dict[_Bucket, Dict[Waiter, None]]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+
+    def __len__(self) -> int:
+        return sum(
+            len(bucket)
+            for buckets in self._waiters.values()
+            for bucket in buckets.values()
+        )
+
+    def pending(self, name: str) -> bool:
+        """Check whether there are any waiters for an event."""
+
+        return name in self._waiters
+
+    def add(self, name: str, waiter: Waiter) -> None:
+        """Add a waiter for an event.
+
+        :param name: The name of the event.
+        :type name: str
+        :param waiter: The waiter to add.
+        :type waiter: Waiter
+        """
+
+        self._waiters[name][waiter.bucket][waiter] = None
+
+    def remove(self, name: str, waiter: Waiter) -> None:
+        """Remove a waiter, if it is still pending.
+
+        :param name: The name of the event.
+        :type name: str
+        :param waiter: The waiter to remove.
+        :type waiter: Waiter
+        """
+
+        buckets = self._waiters.get(name)
+
+        if buckets is None:
+            return
+
+        bucket = buckets.get(waiter.bucket)
+
+        if bucket is None:
+            return
+
+        bucket.pop(waiter, None)
+
+        if not bucket:
+            del buckets[waiter.bucket]
+
+            if not buckets:
+                del self._waiters[name]
+
+    def resolve(
+        self, name: str, keys: Mapping[str, int], event: Mapping[str, Any]
+    ) -> None:
+        """Resolve every waiter an event satisfies.
+
+        :param name: The name of the event.
+        :type name: str
+        :param keys: The routing keys of the event.
+        :type keys: Mapping[str, int]
+        :param event: The event to resolve waiters with.
+        :type event: Mapping[str, Any]
+        """
+
+        buckets = self._waiters.get(name)
+
+        if buckets is None:
+            return
+
+        candidates = [None, *((key, keys[key]) for key in WAITER_KEYS if key in keys)]
+
+        for bucket_key in candidates:
+            bucket = buckets.get(bucket_key)
+
+            if not bucket:
+                continue
+
+            for waiter in list(bucket):
+                if waiter.future.done():
+                    continue
+
+                try:
+                    matched = waiter.matches(keys, event)
+                except Exception as e:
+                    waiter.future.set_exception(e)
+                    continue
+
+                if matched:
+                    waiter.future.set_result(event)
@@ -15,7 +15,7 @@ from typing import (
     overload,
 )
 
-from aiohttp import ClientResponse, ClientSession, FormData
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, FormData
 from attr import dataclass
 
 from ...errors import (
@@ -32,6 +32,7 @@ from ...errors import (
     Unauthorized,
     UnprocessableEntity,
 )
+from ..decoding import Decoder
 from ..utils import _UNSET, UNSET
 from .file import File
 from .ratelimiting import BucketLock, RateLimitManager
@@ -45,34 +46,52 @@ ResponseFormat = Literal["bytes", "text", "json", "none"]
 
 
 @overload
-async def response_as(response: ClientResponse, format: Literal["bytes"]) -> bytes:
+async def response_as(
+    response: ClientResponse, format: Literal["bytes"], decoder: Decoder = None
+) -> bytes:
     ...
 
 
 @overload
-async def response_as(response: ClientResponse, format: Literal["text"]) -> str:
+async def response_as(
+    response: ClientResponse, format: Literal["text"], decoder: Decoder = None
+) -> str:
     ...
 
 
 @overload
-async def response_as(response: ClientResponse, format: Literal["json"]) -> JSON:
+async def response_as(
+    response: ClientResponse, format: Literal["json"], decoder: Decoder = None
+) -> JSON:
     ...
 
 
 @overload
-async def response_as(response: ClientResponse, format: Literal["none"]) -> None:
+async def response_as(
+    response: ClientResponse, format: Literal["none"], decoder: Decoder = None
+) -> None:
     ...
 
 
-async def response_as(response: ClientResponse, format: ResponseFormat) -> Any:
-    """Get the response as a specific format, and close the response."""
+async def response_as(
+    response: ClientResponse, format: ResponseFormat, decoder: Decoder = None
+) -> Any:
+    """Get the response as a specific format, and close the response.
+
+    JSON is decoded with the decoder when one is given, so large bodies can be
+    decoded off the event loop.
+    """
 
     if format == "bytes":
         data = await response.read()
     elif format == "text":
         data = await response.text()
     elif format == "json":
-        data = await response.json()
+        if decoder:
+            body = await response.read()
+            data = await decoder.loads(body) if body.strip() else None
+        else:
+            data = await response.json()
     elif format == "none":
         data = None
 
@@ -98,16 +117,23 @@ class _Response:
 
 
 class RESTClient:
-    def __init__(self, token: str) -> None:
+    def __init__(
+        self, token: str, limiter: RateLimitManager = None, decoder: Decoder = None
+    ) -> None:
         """An HTTP client to make Discord API calls.
 
         :param token: The API token to use.
         :type token: str
+        :param limiter: The ratelimit manager to use, defaults to None
+        :type limiter: RateLimitManager, optional
+        :param decoder: The decoder for JSON responses and gateway frames, defaults to decoding on the event loop
+        :type decoder: Decoder, optional
         """
 
         self._token = token
+        self.decoder = decoder or Decoder()
 
-        self._limiter = RateLimitManager()
+        self._limiter = limiter or RateLimitManager()
         self._session: Optional[ClientSession] = None
 
         self._status_to_error_type: Mapping[int, Type[HTTPError]] = defaultdict(
@@ -256,7 +282,7 @@ class RESTClient:
             resp = await self._attempt_request(req)
 
             if resp.successful:
-                return await response_as(resp.raw, format)
+                return await response_as(resp.raw, format, self.decoder)
 
             if attempt == ATTEMPT_COUNT - 1:
                 raise self._status_to_error_type[resp.raw.status](resp.raw)
@@ -330,7 +356,25 @@ class RESTClient:
 
         return _Response(response, successful=False)
 
-    async def spawn_ws(self, url: str):
+    async def prewarm(self, url: str, session: Optional[ClientSession] = None) -> None:
+        """Resolve a host and open a TLS connection to it, for a later connection to reuse.
+
+        :param url: The URL of the host, websocket URLs are warmed over HTTPS.
+        :type url: str
+        :param session: The session whose connector should keep the connection, defaults to the client's session
+        :type session: ClientSession, optional
+        """
+
+        url = url.replace("wss://", "https://", 1).replace("ws://", "http://", 1)
+
+        async with (session or self.session).head(
+            url,
+            headers={"User-Agent": self._headers["User-Agent"]},
+            timeout=ClientTimeout(total=10),
+        ) as response:
+            await response.read()
+
+    async def spawn_ws(self, url: str, session: Optional[ClientSession] = None):
         args = {
             "max_msg_size": 0,
             "timeout": 60,
@@ -338,4 +382,4 @@ class RESTClient:
             "headers": {"User-Agent": self._headers["User-Agent"]},
         }
 
-        return await self.session.ws_connect(url, **args)
+        return await (session or self.session).ws_connect(url, **args)
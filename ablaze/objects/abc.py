@@ -2,6 +2,8 @@ from datetime import datetime
 
 
 class Snowflake:
+    __slots__ = ("id",)
+
     def __init__(self, id: int) -> None:
         self.id = id
 
@@ -6,6 +6,8 @@ CDN_URL = "https://cdn.discordapp.com/"
 
 
 class Emoji(Snowflake):
+    __slots__ = ("name", "animated")
+
     def __init__(self, id: int, name: str, animated: bool) -> None:
         self.id = id
         self.name = name
@@ -16,6 +18,8 @@ class Emoji(Snowflake):
 
 
 class IDHashAsset:
+    __slots__ = ("id", "hash")
+
     resource: str
 
     def __init__(self, id: int, hash: str) -> None:
@@ -27,6 +31,8 @@ class IDHashAsset:
 
 
 class GuildIcon(IDHashAsset):
+    __slots__ = ()
+
     resource = "icons"
 
     def url_as(self, format: Literal["jpg", "png", "webp", "gif"]) -> str:
@@ -34,29 +40,43 @@ class GuildIcon(IDHashAsset):
 
 
 class GuildSplash(IDHashAsset):
+    __slots__ = ()
+
     resource = "splashes"
 
 
 class GuildDiscoverySplash(IDHashAsset):
+    __slots__ = ()
+
     resource = "discovery-splashes"
 
 
 class GuildBanner(IDHashAsset):
+    __slots__ = ()
+
     resource = "banners"
 
 
 class UserBanner(IDHashAsset):
+    __slots__ = ()
+
     resource = "banners"
 
 
 class DefaultUserAvatar:
+    __slots__ = ("discriminator",)
+
     def __init__(self, discriminator: int) -> None:
         self.discriminator = discriminator
 
-        self.url = CDN_URL + f"/embed/avatars/{self.discriminator % 5}.png"
+    @property
+    def url(self) -> str:
+        return CDN_URL + f"/embed/avatars/{self.discriminator % 5}.png"
 
 
 class UserAvatar(IDHashAsset):
+    __slots__ = ()
+
     resource = "avatars"
 
     def url_as(self, format: Literal["jpg", "png", "webp", "gif"]) -> str:
@@ -64,14 +84,20 @@ class UserAvatar(IDHashAsset):
 
 
 class ApplicationIcon(IDHashAsset):
+    __slots__ = ()
+
     resource = "app-icons"
 
 
 class ApplicationCover(IDHashAsset):
+    __slots__ = ()
+
     resource = "app-icons"
 
 
 class ApplicationAsset:
+    __slots__ = ("application_id", "asset_id")
+
     def __init__(self, application_id: int, asset_id: int) -> None:
         self.application_id = application_id
         self.asset_id = asset_id
@@ -81,6 +107,8 @@ class ApplicationAsset:
 
 
 class AchievementIcon:
+    __slots__ = ("application_id", "achievement_id", "hash")
+
     def __init__(self, application_id: int, achievement_id: int, hash: str) -> None:
         self.application_id = application_id
         self.achievement_id = achievement_id
@@ -94,6 +122,8 @@ class AchievementIcon:
 
 
 class StickerPackBanner:
+    __slots__ = ("asset_id",)
+
     def __init__(self, asset_id: int) -> None:
         self.asset_id = asset_id
 
@@ -102,6 +132,8 @@ class StickerPackBanner:
 
 
 class TeamIcon(IDHashAsset):
+    __slots__ = ()
+
     def __init__(self, id: int, hash: str) -> None:
         self.id = id
         self.hash = hash
@@ -111,6 +143,8 @@ class TeamIcon(IDHashAsset):
 
 
 class Sticker:
+    __slots__ = ("id",)
+
     def __init__(self, id: int) -> None:
         self.id = id
 
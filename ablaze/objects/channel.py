@@ -113,6 +113,8 @@ class PermissionOverwrite:
     Reference: https://discord.com/developers/docs/topics/permissions#permission-overwrites
     """
 
+    __slots__ = ("id", "type", "allow", "deny")
+
     id: int
     type: OverwriteType
     allow: PermissionFlags
@@ -138,6 +140,8 @@ class Channel(ABC, Snowflake):
     This class is abstract -- you can't instantiate it.
     """
 
+    __slots__ = ("_state",)
+
     id: int
     _state: State
 
@@ -191,6 +195,8 @@ class TextChannel(Channel):
     This class is abstract -- you can't instantiate it.
     """
 
+    __slots__ = ()
+
     messages_module = (
         messages  # we have to do this because we have a method called `messages`
     )
@@ -288,6 +294,8 @@ class DMChannel(TextChannel):
     Pseudo-channel representing the direct message communication with a user.
     """
 
+    __slots__ = ("recipient",)
+
     recipient: User
 
     async def close(self, *, reason: Optional[str] = None):
@@ -313,6 +321,8 @@ class GuildChannel(Channel):
     This class is abstract -- you can't instantiate it.
     """
 
+    __slots__ = ("guild_id", "name")
+
     guild_id: int
     name: str
 
@@ -370,6 +380,9 @@ class HasPosition(Channel):
     Mixin signalling that a channel has a position in some ordered list
     """
 
+    # Mixins can't have non-empty slots, so subclasses add a "position" slot.
+    __slots__ = ()
+
     position: int
 
 
@@ -379,6 +392,8 @@ class GuildTextChannel(TextChannel, GuildChannel, HasPosition):
     Ordinary text channel in a guild, denoted in Discord as #<name>.
     """
 
+    __slots__ = ("position", "category_id", "topic", "slowmode_seconds")
+
     category_id: Optional[int]
     topic: Optional[str]
     slowmode_seconds: int
@@ -470,6 +485,8 @@ class NewsChannel(TextChannel, GuildChannel, HasPosition):
       In that case, this message is executed on all follower webhooks.
     """
 
+    __slots__ = ("position", "category_id", "topic")
+
     # TODO: following
 
     category_id: Optional[int]
@@ -529,7 +546,7 @@ class NewsChannel(TextChannel, GuildChannel, HasPosition):
             name=json["name"],
             guild_id=int(json["guild_id"]),
             category_id=nullmap(json.get("parent_id"), int),
-            topic=json.get("toic"),
+            topic=json.get("topic"),
         )
 
 
@@ -539,6 +556,8 @@ class VoiceChannel(GuildChannel):
     Either a 'normal' voice channel or a stage channel.
     """
 
+    __slots__ = ("bitrate", "user_limit", "rtc_region")
+
     bitrate: int
     user_limit: int
     rtc_region: Optional[str]
@@ -550,6 +569,8 @@ class NormalVoiceChannel(VoiceChannel, HasPosition):
     Channel where users can communicate via voice and/or video.
     """
 
+    __slots__ = ("position", "video_quality_mode")
+
     video_quality_mode: Optional[VideoQualityMode]
 
     async def edit(
@@ -584,7 +605,7 @@ class NormalVoiceChannel(VoiceChannel, HasPosition):
     @classmethod
     def from_json(cls, state: State, json: dict) -> "NormalVoiceChannel":
         return NormalVoiceChannel(
-            id=int(json["int"]),
+            id=int(json["id"]),
             _state=state,
             name=json["name"],
             position=json["position"],
@@ -592,7 +613,7 @@ class NormalVoiceChannel(VoiceChannel, HasPosition):
             bitrate=json["bitrate"],
             user_limit=json["user_limit"],
             rtc_region=json.get("rtc_region"),
-            video_quality_mode=VideoQualityMode(json["video_qualify_mode"]),
+            video_quality_mode=VideoQualityMode(json.get("video_quality_mode", 1)),
         )
 
 
@@ -602,12 +623,14 @@ class Stage(VoiceChannel, HasPosition):
     Stage channel for one-to-many communication.
     """
 
+    __slots__ = ("position", "topic")
+
     topic: Optional[str]
 
     @classmethod
     def from_json(cls, state: State, json: dict) -> "Stage":
         return Stage(
-            id=int(json["int"]),
+            id=int(json["id"]),
             _state=state,
             name=json["name"],
             position=json["position"],
@@ -624,9 +647,10 @@ _TC = TypeVar("_TC", bound="Thread")
 
 def _parse_thread_metadata(json: dict):
     return {
-        **json,
-        "auto_archive_duration ": AutoArchiveDuration(json["auto_archive_duration"]),
+        "archived": json["archived"],
+        "auto_archive_duration": AutoArchiveDuration(json["auto_archive_duration"]),
         "archive_timestamp": datetime.fromisoformat(json["archive_timestamp"]),
+        "locked": json.get("locked", False),
     }
 
 
@@ -685,6 +709,17 @@ class Thread(TextChannel, GuildChannel):
     Temporary sub-channel inside a text channel.
     """
 
+    __slots__ = (
+        "parent_channel_id",
+        "slowmode_seconds",
+        "owner_id",
+        "joined_at",
+        "archived",
+        "auto_archive_duration",
+        "archive_timestamp",
+        "locked",
+    )
+
     parent_channel_id: int
     slowmode_seconds: int
     owner_id: int
@@ -692,7 +727,7 @@ class Thread(TextChannel, GuildChannel):
 
     archived: bool
     auto_archive_duration: AutoArchiveDuration
-    archive_timestamp: bool
+    archive_timestamp: datetime
     locked: bool
 
     async def join(self):
@@ -730,19 +765,23 @@ class Thread(TextChannel, GuildChannel):
 
     @classmethod
     def from_json(cls: Type[_TC], state: State, json: dict) -> _TC:
-        return cls(
+        return cls(**Thread._fields_from_json(state, json))
+
+    @staticmethod
+    def _fields_from_json(state: State, json: dict) -> Dict[str, Any]:
+        return dict(
             id=int(json["id"]),
             _state=state,
             guild_id=int(json["guild_id"]),
-            parent_channel_id=int(json["parent_channel_id"]),
+            parent_channel_id=int(json["parent_id"]),
             name=json["name"],
-            slowmode_seconds=json["rate_limit_per_user"],
+            slowmode_seconds=json.get("rate_limit_per_user", 0),
             owner_id=int(json["owner_id"]),
             joined_at=nullmap(
                 json.get("member"),
                 lambda member_obj: datetime.fromisoformat(member_obj["join_timestamp"]),
             ),
-            **_parse_thread_metadata(json),
+            **_parse_thread_metadata(json["thread_metadata"]),
         )
 
 
@@ -751,6 +790,8 @@ class PublicThread(Thread):
     Public thread created on a guild text channel
     """
 
+    __slots__ = ()
+
 
 @dataclass
 class PrivateThread(Thread):
@@ -758,14 +799,25 @@ class PrivateThread(Thread):
     Private thread created on a guild text channel
     """
 
+    __slots__ = ("invitable",)
+
     invitable: bool
 
+    @classmethod
+    def from_json(cls, state: State, json: dict) -> "PrivateThread":
+        return cls(
+            **Thread._fields_from_json(state, json),
+            invitable=json["thread_metadata"].get("invitable", True),
+        )
+
 
 class NewsChannelThread(Thread):
     """
     Public thread created on a news channel
     """
 
+    __slots__ = ()
+
 
 @dataclass
 class Category(GuildChannel, HasPosition):
@@ -776,6 +828,8 @@ class Category(GuildChannel, HasPosition):
     channels and news chanenls.
     """
 
+    __slots__ = ("position",)
+
     @classmethod
     def from_json(cls, state: State, json: dict) -> "Category":
         return Category(
@@ -789,6 +843,8 @@ class Category(GuildChannel, HasPosition):
 
 @dataclass
 class StoreChannel(GuildChannel, HasPosition):
+    __slots__ = ("position",)
+
     # Store channels are out of scope for now because they're not
     # easily available for testing
 
@@ -1,4 +1,6 @@
 class BitField:
+    __slots__ = ("value",)
+
     def __init__(self, value: int) -> None:
         self.value = value
 
@@ -16,6 +18,8 @@ class BitField:
 
 
 class PublicUserFlags(BitField):
+    __slots__ = ()
+
     @property
     def DISCORD_EMPLOYEE(self) -> bool:
         return bool(self[0])
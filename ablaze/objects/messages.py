@@ -72,6 +72,8 @@ class MessageContentWithReference(BaseMessageContent):
 
 @dataclass
 class Message(Snowflake):
+    __slots__ = ("text",)
+
     id: int
     text: Optional[str]
 
@@ -8,6 +8,17 @@ from .flags import PublicUserFlags
 
 @dataclass
 class User(Snowflake):
+    __slots__ = (
+        "username",
+        "discriminator",
+        "avatar",
+        "default_avatar",
+        "banner",
+        "bot",
+        "public_flags",
+        "accent_colour",
+    )
+
     id: int
     username: str
     discriminator: int
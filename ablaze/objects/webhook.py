@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, Optional, Type, TypeVar, Union
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Type, TypeVar, Union
 
 import ablaze.internal.http.resources.webhook as res
 import ablaze.objects.messages as messages
@@ -17,8 +17,22 @@ def webhook_from_json(client: RESTClient, json: dict) -> "Webhook":
 _W = TypeVar("_W", bound="Webhook")
 
 
+def _webhook_fields(webhook: "Webhook") -> Dict[str, Any]:
+    # Webhooks have slots, so their fields can't be read from __dict__.
+    return {field.name: getattr(webhook, field.name) for field in fields(Webhook)}
+
+
 @dataclass
 class Webhook(Snowflake):
+    __slots__ = (
+        "_http",
+        "name",
+        "application_id",
+        "avatar_hash",
+        "channel_id",
+        "guild_id",
+    )
+
     id: int
     _http: RESTClient
     name: str
@@ -62,6 +76,8 @@ class Webhook(Snowflake):
 
 @dataclass
 class SourceChannel(Snowflake):
+    __slots__ = ("name",)
+
     id: int
     name: str
 
@@ -72,6 +88,8 @@ class SourceChannel(Snowflake):
 
 @dataclass
 class SourceGuild(Snowflake):
+    __slots__ = ("name", "icon_hash")
+
     id: int
     name: str
     icon_hash: Optional[str]
@@ -89,6 +107,8 @@ class IncomingWebhook(Webhook):
     'Normal' webhook created in the 'manage channel' screen.
     """
 
+    __slots__ = ("token",)
+
     token: str
 
     async def send(
@@ -146,7 +166,7 @@ class IncomingWebhook(Webhook):
     @staticmethod
     def from_json(client: RESTClient, json: dict) -> "IncomingWebhook":
         return IncomingWebhook(
-            **super().from_json(client, json).__dict__, token=json["token"]
+            **_webhook_fields(Webhook.from_json(client, json)), token=json["token"]
         )
 
 
@@ -154,6 +174,8 @@ class IncomingWebhook(Webhook):
 class ChannelFollowerWebhook(Webhook):
     """Internal webhook that Discord uses to implement following a news channel"""
 
+    __slots__ = ("source_channel", "source_guild")
+
     channel_id: int
     guild_id: int
     source_channel: SourceChannel
@@ -162,7 +184,7 @@ class ChannelFollowerWebhook(Webhook):
     @staticmethod
     def from_json(client: RESTClient, json: dict) -> "ChannelFollowerWebhook":
         return ChannelFollowerWebhook(
-            **super().from_json(client, json).__dict__,
+            **_webhook_fields(Webhook.from_json(client, json)),
             source_channel=SourceChannel.from_json(json["source_channel"]),
             source_guild=SourceGuild.from_json(json["source_guild"]),
         )
@@ -172,12 +194,14 @@ class ChannelFollowerWebhook(Webhook):
 class ApplicationWebhook(Webhook):
     """Application webhooks are webhooks used with Interactions."""
 
+    __slots__ = ()
+
     application_id: int  # should always be non-None
 
     @staticmethod
     def from_json(client: RESTClient, json: dict) -> "ApplicationWebhook":
         return ApplicationWebhook(
-            **super().from_json(client, json).__dict__,
+            **_webhook_fields(Webhook.from_json(client, json)),
         )
 
 
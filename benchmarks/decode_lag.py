@@ -0,0 +1,92 @@
+"""Measure how long decoding large payloads stalls the event loop with each executor.
+
+Run from the repository root::
+
+    python benchmarks/decode_lag.py --sizes 65536 1048576 8388608
+"""
+
+from argparse import ArgumentParser
+from asyncio import create_task, run, sleep
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from json import dumps
+from time import perf_counter
+from typing import Optional, Tuple
+
+from ablaze.internal import Decoder
+
+TICK = 0.001
+
+
+def payload(size: int) -> str:
+    """Build a GUILD_CREATE style payload of roughly ``size`` characters."""
+
+    member = {
+        "user": {"id": "881118111967884295", "username": "user", "avatar": None},
+        "roles": ["881118111967883296", "881118111967883297"],
+        "joined_at": "2021-09-02T10:41:25.471000+00:00",
+        "nick": None,
+        "deaf": False,
+        "mute": False,
+    }
+    count = max(size // len(dumps(member)), 1)
+
+    return dumps({"t": "GUILD_CREATE", "d": {"members": [member] * count}})
+
+
+async def measure(raw: str, executor: Optional[Executor]) -> Tuple[float, float]:
+    """Get the time taken to decode, and the longest the loop went without a tick."""
+
+    decoder = Decoder(0 if executor else None, executor)
+    lag = 0.0
+    running = True
+
+    async def tick() -> None:
+        nonlocal lag
+
+        while running:
+            before = perf_counter()
+            await sleep(TICK)
+            lag = max(lag, perf_counter() - before - TICK)
+
+    ticker = create_task(tick())
+    await sleep(TICK * 5)
+
+    # Warm the executor up, so starting its workers isn't measured.
+    await decoder.loads("{}")
+    lag = 0.0
+
+    start = perf_counter()
+    await decoder.loads(raw)
+    elapsed = perf_counter() - start
+
+    await sleep(TICK * 5)
+    running = False
+    await ticker
+
+    return elapsed, lag
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1 << 16, 1 << 20])
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(1) as threads, ProcessPoolExecutor(1) as processes:
+        for size in args.sizes:
+            raw = payload(size)
+            print(f"{len(raw)} characters")
+
+            for name, executor in (
+                ("inline", None),
+                ("threads", threads),
+                ("processes", processes),
+            ):
+                elapsed, lag = run(measure(raw, executor))
+                print(
+                    f"{name:>12}: {elapsed * 1000:8.1f} ms to decode, "
+                    f"{lag * 1000:8.1f} ms longest loop stall"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Measure the memory each cached member takes in each kind of member storage.
+
+Run from the repository root::
+
+    python benchmarks/member_storage.py --members 200000
+"""
+
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import datetime
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ablaze.cache import MemberStore, TypeCache
+
+GUILD_ID = 881118111967883295
+
+
+@dataclass
+class DataclassMember:
+    id: int
+    roles: List[int]
+    joined_at: datetime
+    premium_since: Optional[datetime]
+    nick: Optional[str]
+    avatar: Optional[str]
+    flags: int
+    deaf: bool
+    mute: bool
+    pending: bool
+
+
+def payloads(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate GUILD_MEMBERS_CHUNK style members, each built from new objects."""
+
+    random = Random(seed)
+    roles = [str(GUILD_ID + i) for i in range(1, 40)]
+
+    for i in range(count):
+        joined = 1500000000 + random.randrange(200000000)
+
+        yield {
+            "user": {"id": str(GUILD_ID + 1000 + i)},
+            "roles": [str(role) for role in random.sample(roles, random.randrange(5))],
+            "joined_at": datetime.utcfromtimestamp(joined).isoformat() + "+00:00",
+            "premium_since": None,
+            "nick": f"nick {i}" if random.random() < 0.2 else None,
+            "avatar": None,
+            "communication_disabled_until": None,
+            "flags": 0,
+            "deaf": False,
+            "mute": False,
+            "pending": False,
+        }
+
+
+def store_json(count: int) -> object:
+    # The same as EntityCache, which caches the member without its user.
+    cache: TypeCache = TypeCache("members")
+
+    for payload in payloads(count):
+        user_id = int(payload.pop("user")["id"])
+        cache.set(user_id, {**payload, "id": user_id})
+
+    return cache
+
+
+def store_dataclasses(count: int) -> object:
+    cache: TypeCache = TypeCache("members")
+
+    for payload in payloads(count):
+        user_id = int(payload["user"]["id"])
+        premium_since = payload["premium_since"]
+
+        cache.set(
+            user_id,
+            DataclassMember(
+                id=user_id,
+                roles=[int(role) for role in payload["roles"]],
+                joined_at=datetime.fromisoformat(payload["joined_at"]),
+                premium_since=premium_since and datetime.fromisoformat(premium_since),
+                nick=payload["nick"],
+                avatar=payload["avatar"],
+                flags=payload["flags"],
+                deaf=payload["deaf"],
+                mute=payload["mute"],
+                pending=payload["pending"],
+            ),
+        )
+
+    return cache
+
+
+def store_columns(count: int) -> object:
+    store = MemberStore(GUILD_ID)
+
+    for payload in payloads(count):
+        store.set(int(payload["user"]["id"]), payload)
+
+    return store
+
+
+def measure(build: Callable[[int], object], count: int) -> float:
+    """Get the bytes per member which stay allocated once the storage is built."""
+
+    gc.collect()
+    tracemalloc.start()
+
+    storage = build(count)
+    gc.collect()
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del storage
+    return size / count
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = {
+        "json dicts": measure(store_json, args.members),
+        "dataclasses": measure(store_dataclasses, args.members),
+        "columns": measure(store_columns, args.members),
+    }
+
+    print(f"{args.members} members")
+
+    for name, size in results.items():
+        ratio = results["json dicts"] / size
+        print(f"{name:>12}: {size:8.1f} bytes per member ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
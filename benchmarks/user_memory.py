@@ -0,0 +1,69 @@
+"""Measure the memory each cached user takes, including its assets and flags.
+
+Run from the repository root::
+
+    python benchmarks/user_memory.py --users 1000000
+"""
+
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random
+from typing import Any, Dict, Iterator
+
+from ablaze.cache import TypeCache
+from ablaze.objects import User
+
+
+def payloads(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate user JSON, each built from new objects."""
+
+    random = Random(seed)
+
+    for i in range(count):
+        yield {
+            "id": str(80351110224678912 + i),
+            "username": f"user {i}",
+            "discriminator": f"{random.randrange(10000):04}",
+            "avatar": f"{random.getrandbits(128):032x}"
+            if random.random() < 0.7
+            else None,
+            "bot": False,
+            "public_flags": random.choice((0, 0, 0, 64, 128, 256)),
+        }
+
+
+def measure(count: int) -> float:
+    """Get the bytes per user which stay allocated once the users are cached."""
+
+    gc.collect()
+    tracemalloc.start()
+
+    cache: TypeCache[User] = TypeCache("users")
+
+    for payload in payloads(count):
+        user = User.from_json(payload)
+        cache.set(user.id, user)
+
+    gc.collect()
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size / count
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000000)
+    args = parser.parse_args()
+
+    size = measure(args.users)
+
+    print(
+        f"{args.users} users: {size:.1f} bytes per user, {size * args.users / 2**20:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
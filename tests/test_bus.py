@@ -0,0 +1,36 @@
+from asyncio import Event, run, start_unix_server, wait_for
+
+from ablaze.internal.gateway.bus import WorkerClient, _encode
+
+
+def test_worker_reconnects_after_a_bad_frame(tmp_path) -> None:
+    path = str(tmp_path / "bus.sock")
+
+    async def main() -> list:
+        frames = [b"not json\n", _encode({"shard_id": 0, "event": {"t": "A", "op": 0}})]
+        received = []
+        done = Event()
+
+        async def serve(reader, writer) -> None:
+            writer.write(frames.pop(0))
+            await writer.drain()
+
+        async def listener(shard, event) -> None:
+            received.append((shard.id, event["t"]))
+            done.set()
+
+        server = await start_unix_server(serve, path)
+        worker = WorkerClient(path, reconnect_delay=0.01)
+        worker.add_listener("A", listener)
+
+        task = worker._loop.create_task(worker.run())
+
+        try:
+            await wait_for(done.wait(), 1)
+        finally:
+            task.cancel()
+            server.close()
+
+        return received
+
+    assert run(main()) == [(0, "A")]
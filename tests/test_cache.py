@@ -0,0 +1,185 @@
+from asyncio import run
+
+from ablaze.cache import CachePolicy, EntityCache
+from ablaze.internal import RESTClient
+from ablaze.internal.gateway.constants import GatewayIntents
+from ablaze.objects.channel import NormalVoiceChannel, PrivateThread, Stage
+
+GUILD_ID = 881118111967883295
+
+THREAD_METADATA = {
+    "archived": False,
+    "auto_archive_duration": 1440,
+    "archive_timestamp": "2021-09-02T10:41:25.471000+00:00",
+    "locked": False,
+}
+
+
+def _guild_create() -> dict:
+    return {
+        "op": 0,
+        "t": "GUILD_CREATE",
+        "s": 1,
+        "d": {
+            "id": str(GUILD_ID),
+            "name": "guild",
+            "roles": [],
+            "emojis": [],
+            "members": [],
+            "channels": [
+                {
+                    "id": "1",
+                    "type": 2,
+                    "name": "voice",
+                    "position": 0,
+                    "bitrate": 64000,
+                    "user_limit": 0,
+                    "rtc_region": None,
+                },
+                {
+                    "id": "2",
+                    "type": 13,
+                    "name": "stage",
+                    "position": 1,
+                    "bitrate": 64000,
+                    "user_limit": 0,
+                    "topic": None,
+                },
+            ],
+            "threads": [
+                {
+                    "id": "3",
+                    "type": 12,
+                    "name": "thread",
+                    "guild_id": str(GUILD_ID),
+                    "parent_id": "4",
+                    "owner_id": "5",
+                    "rate_limit_per_user": 0,
+                    "thread_metadata": {**THREAD_METADATA, "invitable": False},
+                },
+            ],
+        },
+    }
+
+
+async def _cache(*events: dict) -> EntityCache:
+    # The REST client needs a running loop to be created on.
+    cache = EntityCache(RESTClient("token"))
+
+    for event in events:
+        await cache.handle(None, event)
+
+    return cache
+
+
+def test_guild_create_caches_voice_channels_and_threads() -> None:
+    cache = run(_cache(_guild_create()))
+
+    voice = cache.get_channel(1)
+    stage = cache.get_channel(2)
+    thread = cache.get_thread(3)
+
+    assert isinstance(voice, NormalVoiceChannel)
+    assert voice.guild_id == GUILD_ID
+
+    assert isinstance(stage, Stage)
+
+    assert isinstance(thread, PrivateThread)
+    assert thread.parent_channel_id == 4
+    assert thread.invitable is False
+    assert cache.get_channel(3) is thread
+
+
+def test_guild_delete_removes_channels_and_threads() -> None:
+    guild_delete = {"op": 0, "t": "GUILD_DELETE", "d": {"id": str(GUILD_ID)}}
+    cache = run(_cache(_guild_create(), guild_delete))
+
+    assert cache.get_channel(1) is None
+    assert cache.get_thread(3) is None
+
+
+def _member_add(guild_id: int, user_id: int) -> dict:
+    return {
+        "op": 0,
+        "t": "GUILD_MEMBER_ADD",
+        "d": {
+            "guild_id": str(guild_id),
+            "user": {
+                "id": str(user_id),
+                "username": "user",
+                "discriminator": "0001",
+                "avatar": None,
+            },
+            "roles": [],
+            "joined_at": "2021-09-02T10:41:25.471000+00:00",
+            "deaf": False,
+            "mute": False,
+        },
+    }
+
+
+async def _member_cache(policy: CachePolicy, *events: dict) -> EntityCache:
+    cache = EntityCache(RESTClient("token"), {"members": policy})
+
+    for event in events:
+        await cache.handle(None, event)
+
+    return cache
+
+
+def test_member_limit_applies_across_guilds() -> None:
+    cache = run(
+        _member_cache(
+            CachePolicy.lru(2),
+            _member_add(1, 10),
+            _member_add(2, 20),
+            _member_add(3, 30),
+        )
+    )
+
+    assert cache.get_member(1, 10) is None
+    assert cache.get_member(2, 20)["id"] == 20
+    assert cache.get_member(3, 30)["id"] == 30
+
+    assert list(cache.members(1)) == []
+    assert list(cache.members(2)) == [20]
+    assert cache.stats()["members"]["size"] == 2
+
+
+def test_members_of_guilds_outside_the_allowlist_are_not_cached() -> None:
+    cache = run(
+        _member_cache(
+            CachePolicy.allowlist(guild_ids=[1]), _member_add(1, 10), _member_add(2, 20)
+        )
+    )
+
+    assert cache.get_member(1, 10)["id"] == 10
+    assert cache.get_member(2, 20) is None
+    assert cache.members(2) is None
+    assert cache.stats()["members"]["rejected"] == 1
+
+
+class _Gateway:
+    def __init__(self, intents: int) -> None:
+        self._intents = intents
+        self.events = []
+
+    def add_listener(self, event: str, listener) -> None:
+        self.events.append(event)
+
+
+async def _listened_events(policies: dict) -> list:
+    gateway = _Gateway(GatewayIntents.GUILDS | GatewayIntents.GUILD_MEMBERS)
+    EntityCache(RESTClient("token"), policies).listen(gateway)
+
+    return gateway.events
+
+
+def test_disabled_members_policy_skips_member_events() -> None:
+    events = run(_listened_events({"members": CachePolicy.disabled()}))
+
+    assert "GUILD_CREATE" in events
+    assert "GUILD_MEMBER_ADD" not in events
+    assert "GUILD_MEMBERS_CHUNK" not in events
+
+    assert "GUILD_MEMBER_ADD" in run(_listened_events({}))
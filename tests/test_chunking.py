@@ -0,0 +1,66 @@
+from asyncio import run, sleep
+
+from ablaze import GatewayClient
+from ablaze.internal import RESTClient
+from ablaze.internal.gateway import MemberChunker
+from ablaze.internal.gateway.constants import GatewayIntents
+
+
+async def _advised_intents(presences: bool) -> GatewayIntents:
+    gateway = GatewayClient(
+        RESTClient("token"),
+        GatewayIntents.GUILDS
+        | GatewayIntents.GUILD_MEMBERS
+        | GatewayIntents.GUILD_PRESENCES,
+        auto_intents=True,
+    )
+    gateway.add_listener("GUILD_CREATE", lambda shard, event: None)
+    gateway.chunker.consume(presences)
+    gateway._advise_intents()
+
+    return gateway._intents
+
+
+def test_chunker_keeps_member_intents() -> None:
+    intents = run(_advised_intents(presences=False))
+
+    assert intents & GatewayIntents.GUILD_MEMBERS
+    assert not intents & GatewayIntents.GUILD_PRESENCES
+
+
+def test_chunker_keeps_presence_intents_when_requesting_presences() -> None:
+    intents = run(_advised_intents(presences=True))
+
+    assert intents & GatewayIntents.GUILD_MEMBERS
+    assert intents & GatewayIntents.GUILD_PRESENCES
+
+
+class _Shard:
+    id = 0
+
+    async def send(self, data: dict) -> None:
+        pass
+
+
+class _Gateway:
+    _shard_count = 1
+    shards = [_Shard()]
+
+    def consume(self, *events: str) -> None:
+        pass
+
+
+def test_unanswered_member_requests_expire() -> None:
+    async def main() -> None:
+        chunker = MemberChunker(_Gateway())
+
+        await chunker.request(1, timeout=0.01)
+        answered = await chunker.request(2, timeout=0.01)
+
+        chunker.feed({"nonce": answered.nonce, "chunk_count": 1, "members": []})
+        assert len(chunker._requests) == 1
+
+        await sleep(0.05)
+        assert not chunker._requests
+
+    run(main())
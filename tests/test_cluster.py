@@ -0,0 +1,68 @@
+from asyncio import run
+from time import perf_counter
+
+from ablaze import cluster
+from ablaze.cluster import (
+    FATAL_EXIT_CODE,
+    ClusterLauncher,
+    SharedRateLimitManager,
+    SharedState,
+)
+
+SESSION_START_LIMIT = {"total": 1000, "remaining": 1000, "reset_after": 0}
+
+
+class _Process:
+    def __init__(self, exitcode: int) -> None:
+        self.exitcode = exitcode
+
+    def is_alive(self) -> bool:
+        return False
+
+
+def _launcher(**options) -> ClusterLauncher:
+    return ClusterLauncher("token", 0, print, clusters=1, restart_delay=0, **options)
+
+
+def test_fatal_exits_are_not_restarted(monkeypatch) -> None:
+    monkeypatch.setattr(cluster, "blocking_sleep", lambda delay: None)
+
+    launcher = _launcher()
+    launcher.processes = {0: _Process(FATAL_EXIT_CODE)}
+    launcher._supervise()
+
+    assert launcher.restarts == {}
+
+
+def test_restarts_are_capped(monkeypatch) -> None:
+    monkeypatch.setattr(cluster, "blocking_sleep", lambda delay: None)
+
+    launcher = _launcher(max_restarts=2)
+    monkeypatch.setattr(
+        launcher,
+        "_spawn",
+        lambda cluster_id: launcher.processes.update({cluster_id: _Process(1)}),
+    )
+
+    launcher.processes = {0: _Process(1)}
+    launcher._supervise()
+
+    assert launcher.restarts == {0: 2}
+
+
+def test_bucket_resets_are_shared_between_processes() -> None:
+    async def main() -> float:
+        state = SharedState(1, SESSION_START_LIMIT)
+        first = SharedRateLimitManager(state)
+        second = SharedRateLimitManager(state)
+
+        # The first process used up the bucket, which resets in 0.2 seconds.
+        async with await first.get_lock("bucket"):
+            (await first.get_lock("bucket")).defer(0.2)
+
+        started = perf_counter()
+
+        async with await second.get_lock("bucket"):
+            return perf_counter() - started
+
+    assert run(main()) >= 0.15
@@ -0,0 +1,85 @@
+from asyncio import open_unix_connection, run, sleep, start_unix_server, wait_for
+
+from ablaze import GatewayClient
+from ablaze.internal import RESTClient
+from ablaze.internal.gateway.constants import GatewayIntents
+from ablaze.internal.gateway.handoff import HandoffClient, HandoffServer, _encode
+from ablaze.internal.gateway.supervisor import ShardState
+
+
+def _client() -> GatewayClient:
+    return GatewayClient(RESTClient("token"), GatewayIntents.GUILDS, shard_ids=[0])
+
+
+def test_prepare_returns_false_when_the_old_process_hangs_up(tmp_path) -> None:
+    path = str(tmp_path / "handoff.sock")
+
+    async def main() -> bool:
+        server = await start_unix_server(lambda reader, writer: writer.close(), path)
+
+        async with server:
+            return await HandoffClient(_client(), path).prepare(timeout=1)
+
+    assert run(main()) is False
+
+
+def test_prepare_returns_false_when_the_old_process_doesnt_answer(tmp_path) -> None:
+    path = str(tmp_path / "handoff.sock")
+
+    async def main() -> bool:
+        async def ignore(reader, writer) -> None:
+            await reader.read()
+
+        server = await start_unix_server(ignore, path)
+
+        async with server:
+            return await HandoffClient(_client(), path).prepare(timeout=0.05)
+
+    assert run(main()) is False
+
+
+def test_shard_stops_reconnecting_once_its_session_is_given_out(tmp_path) -> None:
+    path = str(tmp_path / "handoff.sock")
+
+    async def main() -> None:
+        gateway = _client()
+        shard = gateway.shards[0]
+        shard._session = "session"
+
+        server = HandoffServer(gateway, path)
+        await server.start()
+
+        reader, writer = await open_unix_connection(path)
+        writer.write(_encode({"op": "request", "shard_id": 0}))
+        await writer.drain()
+        await reader.readline()
+
+        assert shard._handing_off
+
+        # The new process going away before it is live gives the session back.
+        writer.close()
+        await sleep(0.05)
+
+        assert not shard._handing_off
+        await server.close()
+
+    run(main())
+
+
+def test_shard_being_handed_off_doesnt_reconnect() -> None:
+    async def main() -> ShardState:
+        shard = _client().shards[0]
+        shard._session = "session"
+        shard._handing_off = True
+
+        async def no_op() -> None:
+            pass
+
+        # The connection ends at once, as when Discord closes it for the new process.
+        shard.spawn_ws = no_op
+        shard.start_reader = no_op
+
+        await wait_for(shard.connect(), 1)
+        return shard.state
+
+    assert run(main()) is ShardState.CLOSED
@@ -0,0 +1,89 @@
+from asyncio import run
+
+from ablaze import GatewayClient
+from ablaze.internal import RESTClient
+from ablaze.internal.gateway import IdentifyScheduler, MemorySessionStore
+from ablaze.internal.gateway.constants import GatewayIntents
+from ablaze.internal.gateway.identify import IDENTIFY_INTERVAL
+from ablaze.internal.gateway.sessions import SessionState
+from ablaze.internal.http.resources import gateway as gateway_resource
+
+SESSION_START_LIMIT = {
+    "max_concurrency": 2,
+    "remaining": 1000,
+    "reset_after": 0,
+    "total": 1000,
+}
+
+
+async def _no_op() -> None:
+    pass
+
+
+def test_restored_shards_dont_wait_to_identify(monkeypatch) -> None:
+    async def get_gateway_bot(http: RESTClient) -> dict:
+        return {"url": "wss://gateway", "shards": 3, "session_start_limit": {}}
+
+    monkeypatch.setattr(gateway_resource, "get_gateway_bot", get_gateway_bot)
+
+    async def main() -> IdentifyScheduler:
+        store = MemorySessionStore()
+
+        # Shards 0 and 2 share a bucket, only shard 4 has no session to resume.
+        await store.set(0, SessionState("a", 1, None))
+        await store.set(2, SessionState("b", 1, None))
+
+        scheduler = IdentifyScheduler.from_gateway(SESSION_START_LIMIT)
+        client = GatewayClient(
+            RESTClient("token"),
+            GatewayIntents.GUILDS,
+            shard_ids=[0, 2, 4],
+            shard_count=6,
+            session_store=store,
+            identify_scheduler=scheduler,
+        )
+
+        for shard in client.shards:
+            shard.connect = _no_op
+
+        await client.start()
+        return scheduler
+
+    scheduler = run(main())
+
+    assert scheduler._pending == {4}
+    assert scheduler.expected_turn_in(4) == 0
+    assert scheduler.expected_ready_in() == 0
+
+
+def test_expected_turns_count_shards_ahead_in_the_same_bucket() -> None:
+    async def main() -> None:
+        scheduler = IdentifyScheduler(2, 1000, 0, 1000)
+        scheduler.register(range(8))
+
+        assert scheduler.bucket(5) == 1
+        assert scheduler.expected_turn_in(0) == 0
+        assert scheduler.expected_turn_in(6) == 3 * IDENTIFY_INTERVAL
+        assert scheduler.expected_ready_in() == 3 * IDENTIFY_INTERVAL
+        assert scheduler.expected_ready_in([1, 3]) == IDENTIFY_INTERVAL
+
+        await scheduler.acquire(0)
+
+        # Shard 2 now waits for shard 0's interval to pass, rather than for shard 0.
+        assert 0 not in scheduler._pending
+        assert 4.9 < scheduler.expected_turn_in(2) <= IDENTIFY_INTERVAL
+        assert scheduler.expected_turn_in(1) == 0
+
+    run(main())
+
+
+def test_expected_ready_waits_for_session_starts_to_reset() -> None:
+    async def main() -> None:
+        scheduler = IdentifyScheduler(0, 1, 60_000, 1000)
+        scheduler.register([0, 1])
+
+        # A max concurrency of zero still leaves a single bucket.
+        assert scheduler.max_concurrency == 1
+        assert scheduler.expected_ready_in() > 59
+
+    run(main())
@@ -0,0 +1,24 @@
+from asyncio import TimeoutError, run
+
+import pytest
+
+from ablaze import GatewayClient
+from ablaze.internal import RESTClient
+from ablaze.internal.gateway.constants import GatewayIntents
+from ablaze.internal.gateway.intents import required_intents
+
+
+def test_thread_members_update_only_needs_guilds() -> None:
+    assert required_intents(["THREAD_MEMBERS_UPDATE"]) == GatewayIntents.GUILDS
+
+
+def test_waited_for_events_count_towards_required_intents() -> None:
+    async def main() -> GatewayIntents:
+        gateway = GatewayClient(RESTClient("token"), GatewayIntents.GUILD_MESSAGES)
+
+        with pytest.raises(TimeoutError):
+            await gateway.wait_for("message_delete", timeout=0)
+
+        return gateway.required_intents()
+
+    assert run(main()) & GatewayIntents.GUILD_MESSAGES
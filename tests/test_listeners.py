@@ -0,0 +1,58 @@
+from asyncio import Event, run, sleep
+from typing import List
+
+import pytest
+
+from ablaze.internal.gateway.listeners import Listener, OverflowPolicy
+
+
+async def _handled(overflow: OverflowPolicy) -> List[int]:
+    release = Event()
+    handled = []
+    done = []
+
+    async def callback(shard, event: dict) -> None:
+        await release.wait()
+        handled.append(event["n"])
+
+    listener = Listener(callback, max_concurrency=1, queue_size=1, overflow=overflow)
+
+    await listener.submit(None, {"n": 0}, lambda: done.append(0))
+    await listener.submit(None, {"n": 1}, lambda: done.append(1))
+
+    if overflow == "block":
+        blocked = listener._loop.create_task(
+            listener.submit(None, {"n": 2}, lambda: done.append(2))
+        )
+        await sleep(0)
+        assert not blocked.done()
+    else:
+        await listener.submit(None, {"n": 2}, lambda: done.append(2))
+        assert listener.dropped == 1
+
+    release.set()
+    await sleep(0)
+    await listener.drain()
+
+    assert sorted(done) == [0, 1, 2]
+    return handled
+
+
+def test_block_waits_for_space_in_the_queue() -> None:
+    assert run(_handled("block")) == [0, 1, 2]
+
+
+def test_drop_oldest_drops_the_longest_queued_event() -> None:
+    assert run(_handled("drop_oldest")) == [0, 2]
+
+
+def test_drop_newest_drops_the_incoming_event() -> None:
+    assert run(_handled("drop_newest")) == [0, 1]
+
+
+def test_unknown_overflow_policies_are_rejected() -> None:
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            Listener(lambda shard, event: None, overflow="drop_all")
+
+    run(main())
@@ -0,0 +1,42 @@
+from json import dumps
+
+from ablaze.internal.gateway import LazyPayload
+
+FRAME = dumps(
+    {
+        "t": "MESSAGE_CREATE",
+        "s": 42,
+        "op": 0,
+        "d": {"guild_id": "1", "embeds": [{"title": "embed"}], "mentions": []},
+    }
+)
+
+
+def test_envelope_is_read_without_decoding_the_data() -> None:
+    payload = LazyPayload(FRAME)
+
+    assert payload["t"] == "MESSAGE_CREATE"
+    assert payload["s"] == 42
+    assert payload["op"] == 0
+    assert "d" in payload
+    assert list(payload) == ["t", "s", "op", "d"]
+
+    assert not payload.decoded
+
+
+def test_reading_the_data_decodes_all_of_it() -> None:
+    payload = LazyPayload(FRAME)
+
+    data = payload["d"]
+
+    assert payload.decoded
+    assert data["guild_id"] == "1"
+    assert data["embeds"] == [{"title": "embed"}]
+    assert payload["t"] == "MESSAGE_CREATE"
+
+
+def test_frames_in_another_order_are_decoded_up_front() -> None:
+    payload = LazyPayload(dumps({"op": 11, "d": None, "t": None, "s": None}))
+
+    assert payload.decoded
+    assert payload["op"] == 11
@@ -0,0 +1,94 @@
+from asyncio import CancelledError, run, sleep
+
+import pytest
+
+from ablaze.internal.gateway.ratelimiter import PriorityRatelimiter, SendPriority
+
+
+def test_rate_must_leave_slots_for_low_priority_sends() -> None:
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            PriorityRatelimiter(10, 60)
+
+        PriorityRatelimiter(11, 60)
+
+    run(main())
+
+
+def test_reserved_slots_are_only_used_by_more_urgent_sends() -> None:
+    async def main() -> None:
+        limiter = PriorityRatelimiter(3, 60, reserved=1)
+
+        await limiter.wait(SendPriority.LOW)
+
+        low = limiter.loop.create_task(limiter.wait(SendPriority.LOW))
+        await sleep(0)
+        assert not low.done()
+
+        # Normal sends can use the slot low priority sends leave free, and critical
+        # sends the one reserved for them.
+        await limiter.wait(SendPriority.NORMAL)
+        await limiter.wait(SendPriority.CRITICAL)
+        assert limiter.tokens == 0
+
+        low.cancel()
+
+    run(main())
+
+
+def test_sends_are_woken_in_priority_order() -> None:
+    async def main() -> list:
+        limiter = PriorityRatelimiter(3, 0.01, reserved=1)
+        order = []
+
+        for _ in range(3):
+            await limiter.wait(SendPriority.CRITICAL)
+
+        async def send(priority: SendPriority) -> None:
+            await limiter.wait(priority)
+            order.append(priority)
+
+        tasks = [
+            limiter.loop.create_task(send(priority))
+            for priority in (
+                SendPriority.LOW,
+                SendPriority.NORMAL,
+                SendPriority.CRITICAL,
+            )
+        ]
+
+        for task in tasks:
+            await task
+
+        return order
+
+    assert run(main()) == [SendPriority.CRITICAL, SendPriority.NORMAL, SendPriority.LOW]
+
+
+def test_cancelled_sends_give_up_their_slot() -> None:
+    async def main() -> None:
+        limiter = PriorityRatelimiter(3, 60, reserved=1)
+
+        for _ in range(3):
+            await limiter.wait(SendPriority.CRITICAL)
+
+        waiting = limiter.loop.create_task(limiter.wait(SendPriority.CRITICAL))
+        cancelled = limiter.loop.create_task(limiter.wait(SendPriority.CRITICAL))
+        await sleep(0)
+
+        # Cancelled while queued, it no longer counts as waiting.
+        cancelled.cancel()
+        await sleep(0)
+        assert limiter.queued == 1
+
+        # Cancelled after being given a slot, the slot goes back to the bucket.
+        limiter._release()
+        waiting.cancel()
+
+        with pytest.raises(CancelledError):
+            await waiting
+
+        assert limiter.tokens == 1
+        assert limiter.queued == 0
+
+    run(main())
@@ -0,0 +1,51 @@
+from asyncio import run, sleep
+from json import loads
+
+from ablaze.internal.gateway import FileSessionStore
+from ablaze.internal.gateway.sessions import SessionState
+
+
+def _saved(path) -> dict:
+    return {int(id): state["seq"] for id, state in loads(path.read_text()).items()}
+
+
+def test_file_session_store_writes_once_per_interval(tmp_path) -> None:
+    path = tmp_path / "sessions.json"
+
+    async def main() -> None:
+        store = FileSessionStore(str(path), interval=60)
+
+        await store.set(0, SessionState("a", 1, None))
+        await sleep(0.05)
+        assert _saved(path) == {0: 1}
+
+        await store.set(0, SessionState("a", 2, None))
+        await sleep(0.05)
+        assert _saved(path) == {0: 1}
+
+        await store.flush()
+        assert _saved(path) == {0: 2}
+
+    run(main())
+
+
+def test_file_session_stores_can_share_a_file(tmp_path) -> None:
+    path = str(tmp_path / "sessions.json")
+
+    async def main() -> None:
+        first = FileSessionStore(path)
+        second = FileSessionStore(path)
+
+        await first.get(0)
+        await second.get(1)
+
+        await first.set(0, SessionState("a", 1, None))
+        await second.set(1, SessionState("b", 2, None))
+
+        await first.flush()
+        await second.flush()
+
+        assert (await FileSessionStore(path).get(0)).session_id == "a"
+        assert (await FileSessionStore(path).get(1)).session_id == "b"
+
+    run(main())
@@ -0,0 +1,118 @@
+from ablaze.cache import CachePolicy, TypeCache, store
+
+
+def test_contains_leaves_stats_and_order_alone() -> None:
+    cache: TypeCache[str] = TypeCache("users", CachePolicy.lru(2))
+    cache.set(1, "a")
+    cache.set(2, "b")
+
+    assert 1 in cache
+    assert 3 not in cache
+    assert cache.hits == cache.misses == 0
+
+    # 1 was not marked as used, so it is still the least recently used entry.
+    cache.set(3, "c")
+
+    assert list(cache) == [2, 3]
+
+
+def test_contains_treats_expired_entries_as_missing(monkeypatch) -> None:
+    now = 100.0
+    monkeypatch.setattr(store, "monotonic", lambda: now)
+
+    expired = []
+    cache: TypeCache[str] = TypeCache(
+        "users",
+        CachePolicy.expiring(10),
+        on_evict=lambda key, value: expired.append((key, value)),
+    )
+    cache.set(1, "a")
+
+    now = 110.0
+
+    assert 1 not in cache
+    assert len(cache) == 1
+    assert cache.expired == 0
+    assert expired == []
+
+
+def test_rejected_replacements_evict_the_cached_entry() -> None:
+    evicted = []
+    cache: TypeCache[dict] = TypeCache(
+        "channels",
+        CachePolicy.allowlist(guild_ids=[1]),
+        key_field="channel_id",
+        on_evict=lambda key, value: evicted.append((key, value)),
+    )
+
+    assert cache.set(5, {"guild_id": 1})
+    # Moved to a guild outside the allowlist.
+    assert not cache.set(5, {"guild_id": 2})
+
+    assert 5 not in cache
+    assert evicted == [(5, {"guild_id": 1})]
+
+
+def test_lru_evicts_the_least_recently_used_entry() -> None:
+    evicted = []
+    cache: TypeCache[str] = TypeCache(
+        "users",
+        CachePolicy.lru(2),
+        on_evict=lambda key, value: evicted.append((key, value)),
+    )
+    cache.set(1, "a")
+    cache.set(2, "b")
+
+    assert cache.get(1) == "a"
+
+    cache.set(3, "c")
+
+    assert list(cache) == [1, 3]
+    assert evicted == [(2, "b")]
+    assert cache.evicted == 1
+
+
+def test_expired_entries_are_dropped_when_read_or_swept(monkeypatch) -> None:
+    now = 100.0
+    monkeypatch.setattr(store, "monotonic", lambda: now)
+
+    expired = []
+    cache: TypeCache[str] = TypeCache(
+        "users",
+        CachePolicy.expiring(10),
+        on_evict=lambda key, value: expired.append((key, value)),
+    )
+    cache.set(1, "a")
+    cache.set(2, "b")
+
+    now = 105.0
+    # Setting an entry again restarts its time to live.
+    cache.set(2, "c")
+
+    now = 111.0
+
+    assert cache.get(1) is None
+    assert cache.get(2) == "c"
+
+    now = 116.0
+    cache.set(3, "d")
+
+    assert list(cache) == [3]
+    assert expired == [(1, "a"), (2, "c")]
+    assert cache.expired == 2
+
+
+def test_expiring_lru_evicts_by_recency(monkeypatch) -> None:
+    now = 100.0
+    monkeypatch.setattr(store, "monotonic", lambda: now)
+
+    cache: TypeCache[str] = TypeCache("users", CachePolicy.expiring(10, max_size=2))
+    cache.set(1, "a")
+    cache.set(2, "b")
+
+    assert cache.get(1) == "a"
+
+    cache.set(3, "c")
+
+    assert list(cache) == [1, 3]
+    assert cache.get(1) == "a"
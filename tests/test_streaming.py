@@ -0,0 +1,52 @@
+from json import dumps
+
+import pytest
+
+from ablaze.internal.gateway import GuildCreateStream
+
+
+def _frame(guild: dict) -> str:
+    return dumps({"t": "GUILD_CREATE", "s": 4, "op": 0, "d": guild})
+
+
+def test_arrays_are_streamed_in_batches() -> None:
+    members = [{"user": {"id": str(n)}} for n in range(5)]
+    stream = GuildCreateStream(
+        _frame({"id": "1", "members": members, "roles": [{"id": "1"}]}), batch_size=2
+    )
+
+    assert list(stream) == [
+        ("members", members[0:2]),
+        ("members", members[2:4]),
+        ("members", members[4:]),
+    ]
+    assert stream.guild_id == "1"
+    assert stream.payload == {
+        "t": "GUILD_CREATE",
+        "s": 4,
+        "op": 0,
+        "d": {"id": "1", "roles": [{"id": "1"}]},
+        "streamed": ["members"],
+    }
+
+
+def test_arrays_before_the_guild_id_are_streamed_once_it_is_read() -> None:
+    stream = GuildCreateStream(
+        _frame({"channels": [{"id": "2"}], "id": "1", "members": []})
+    )
+
+    # The channels are only yielded once the ID is known, empty arrays yield nothing.
+    assert list(stream) == [("channels", [{"id": "2"}])]
+    assert stream.guild_id == "1"
+    assert stream.payload["d"] == {"id": "1"}
+    assert stream.payload["streamed"] == ["channels", "members"]
+
+
+def test_only_guild_create_frames_are_streamed() -> None:
+    raw = dumps({"t": "GUILD_UPDATE", "s": 4, "op": 0, "d": {"id": "1"}})
+
+    assert not GuildCreateStream.matches(raw)
+    assert GuildCreateStream.matches(_frame({"id": "1"}))
+
+    with pytest.raises(ValueError):
+        GuildCreateStream(raw)
@@ -0,0 +1,70 @@
+from asyncio import get_running_loop, run
+
+from ablaze.internal.gateway.waiters import Waiter, WaiterIndex
+
+
+def test_waiters_are_resolved_by_their_filters() -> None:
+    async def main() -> None:
+        loop = get_running_loop()
+        index = WaiterIndex()
+
+        any_channel = Waiter(loop.create_future(), None, {})
+        channel = Waiter(loop.create_future(), None, {"channel_id": 1})
+        other_channel = Waiter(loop.create_future(), None, {"channel_id": 2})
+        author = Waiter(loop.create_future(), None, {"channel_id": 1, "author_id": 4})
+
+        for waiter in (any_channel, channel, other_channel, author):
+            index.add("MESSAGE_CREATE", waiter)
+
+        event = {"t": "MESSAGE_CREATE"}
+        index.resolve("MESSAGE_CREATE", {"channel_id": 1, "author_id": 3}, event)
+
+        assert any_channel.future.result() is event
+        assert channel.future.result() is event
+        assert not other_channel.future.done()
+        assert not author.future.done()
+
+    run(main())
+
+
+def test_failing_checks_fail_their_waiter() -> None:
+    async def main() -> None:
+        loop = get_running_loop()
+        index = WaiterIndex()
+
+        def check(event: dict) -> bool:
+            raise KeyError("d")
+
+        failing = Waiter(loop.create_future(), check, {})
+        passing = Waiter(loop.create_future(), lambda event: True, {})
+        index.add("TYPING_START", failing)
+        index.add("TYPING_START", passing)
+
+        index.resolve("TYPING_START", {}, {})
+
+        assert isinstance(failing.future.exception(), KeyError)
+        assert passing.future.result() == {}
+
+    run(main())
+
+
+def test_removing_the_last_waiter_drops_the_event() -> None:
+    async def main() -> None:
+        loop = get_running_loop()
+        index = WaiterIndex()
+
+        first = Waiter(loop.create_future(), None, {"author_id": 3})
+        second = Waiter(loop.create_future(), None, {})
+        index.add("MESSAGE_CREATE", first)
+        index.add("MESSAGE_CREATE", second)
+
+        index.remove("MESSAGE_CREATE", first)
+        assert index.pending("MESSAGE_CREATE")
+        assert len(index) == 1
+
+        index.remove("MESSAGE_CREATE", second)
+        index.remove("MESSAGE_CREATE", second)
+        assert not index.pending("MESSAGE_CREATE")
+        assert len(index) == 0
+
+    run(main())